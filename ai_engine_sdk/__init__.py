@@ -1,4 +1,111 @@
-from .api_models.agents_json_messages import is_agent_json_confirmation_message as is_confirmation_message, \
-    is_task_selection_message, TaskSelectionMessage, is_agent_message
-from .api_models.api_message import is_ai_engine_message, is_stop_message, ApiBaseMessage
-from .client import AiEngine, FunctionGroup
\ No newline at end of file
+"""
+The public names of the SDK are imported lazily (PEP 562): `import ai_engine_sdk` is cheap, and each submodule
+(with pydantic models, aiohttp...) is only loaded when one of its names is first used. Keeps short-lived CLI jobs
+and serverless cold starts fast, see `benchmarks/bench_import_time.py`.
+"""
+import importlib
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple
+
+if TYPE_CHECKING:
+    from .api_models.agents_json_messages import is_agent_json_confirmation_message as is_confirmation_message, \
+        is_task_selection_message, TaskSelectionMessage, is_agent_message
+    from .api_models.api_message import is_ai_engine_message, is_stop_message, ApiBaseMessage
+    from .client import AiEngine, FunctionGroup
+    from .session_history import MessageRetention
+    from .errors import (
+        AiEngineError,
+        ApiError,
+        ApiClientError,
+        ApiConnectionError,
+        ApiServerError,
+        InsufficientCreditsError,
+        AuthenticationError,
+        NotFoundError,
+        RateLimitedError
+    )
+    from .retry import EndpointClass, RetryPolicy
+    from .rate_limiting import AdaptiveConcurrencyLimiter, RateLimiter
+    from .bulk import BulkItemResult, BulkOperation, BulkOperationError, BulkReport
+    from .credit_guard import CreditGuard
+    from .instrumentation import Instrumentation, MetricsCollector, OpenTelemetryInstrumentation
+    from .session_store import FileSessionStore, MemorySessionStore, SessionSnapshot, SessionStore, SQLiteSessionStore
+    from .transport import AiohttpTransport, HttpxTransport, InMemoryTransport, Transport
+    from .cassette import Cassette, CassetteError, RecordingTransport, ReplayTransport
+    from .session_pool import SessionPool
+    from .session_lifecycle import SessionLeakReport, SessionLifecycleManager
+    from .fan_out import ExecutionJob, ExecutionResult, FanOutExecution
+
+# Public name -> (submodule, name in the submodule). Keep in sync with the TYPE_CHECKING imports above.
+_LAZY_ATTRIBUTES: Dict[str, Tuple[str, str]] = {
+    "is_confirmation_message": (".api_models.agents_json_messages", "is_agent_json_confirmation_message"),
+    "is_task_selection_message": (".api_models.agents_json_messages", "is_task_selection_message"),
+    "TaskSelectionMessage": (".api_models.agents_json_messages", "TaskSelectionMessage"),
+    "is_agent_message": (".api_models.agents_json_messages", "is_agent_message"),
+    "is_ai_engine_message": (".api_models.api_message", "is_ai_engine_message"),
+    "is_stop_message": (".api_models.api_message", "is_stop_message"),
+    "ApiBaseMessage": (".api_models.api_message", "ApiBaseMessage"),
+    "AiEngine": (".client", "AiEngine"),
+    "FunctionGroup": (".client", "FunctionGroup"),
+    "MessageRetention": (".session_history", "MessageRetention"),
+    **{
+        name: (".errors", name) for name in (
+            "AiEngineError",
+            "ApiError",
+            "ApiClientError",
+            "ApiConnectionError",
+            "ApiServerError",
+            "InsufficientCreditsError",
+            "AuthenticationError",
+            "NotFoundError",
+            "RateLimitedError",
+        )
+    },
+    "EndpointClass": (".retry", "EndpointClass"),
+    "RetryPolicy": (".retry", "RetryPolicy"),
+    "AdaptiveConcurrencyLimiter": (".rate_limiting", "AdaptiveConcurrencyLimiter"),
+    "RateLimiter": (".rate_limiting", "RateLimiter"),
+    "BulkItemResult": (".bulk", "BulkItemResult"),
+    "BulkOperation": (".bulk", "BulkOperation"),
+    "BulkOperationError": (".bulk", "BulkOperationError"),
+    "BulkReport": (".bulk", "BulkReport"),
+    "CreditGuard": (".credit_guard", "CreditGuard"),
+    "Instrumentation": (".instrumentation", "Instrumentation"),
+    "MetricsCollector": (".instrumentation", "MetricsCollector"),
+    "OpenTelemetryInstrumentation": (".instrumentation", "OpenTelemetryInstrumentation"),
+    "FileSessionStore": (".session_store", "FileSessionStore"),
+    "MemorySessionStore": (".session_store", "MemorySessionStore"),
+    "SessionSnapshot": (".session_store", "SessionSnapshot"),
+    "SessionStore": (".session_store", "SessionStore"),
+    "SQLiteSessionStore": (".session_store", "SQLiteSessionStore"),
+    "AiohttpTransport": (".transport", "AiohttpTransport"),
+    "HttpxTransport": (".transport", "HttpxTransport"),
+    "InMemoryTransport": (".transport", "InMemoryTransport"),
+    "Transport": (".transport", "Transport"),
+    "Cassette": (".cassette", "Cassette"),
+    "CassetteError": (".cassette", "CassetteError"),
+    "RecordingTransport": (".cassette", "RecordingTransport"),
+    "ReplayTransport": (".cassette", "ReplayTransport"),
+    "SessionPool": (".session_pool", "SessionPool"),
+    "SessionLeakReport": (".session_lifecycle", "SessionLeakReport"),
+    "SessionLifecycleManager": (".session_lifecycle", "SessionLifecycleManager"),
+    "ExecutionJob": (".fan_out", "ExecutionJob"),
+    "ExecutionResult": (".fan_out", "ExecutionResult"),
+    "FanOutExecution": (".fan_out", "FanOutExecution"),
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name: str) -> Any:
+    try:
+        module_name, attribute = _LAZY_ATTRIBUTES[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(importlib.import_module(module_name, __name__), attribute)
+    # Cache it: the next lookups don't go through __getattr__ anymore.
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted({*globals(), *__all__})
@@ -66,22 +66,25 @@ def is_agent_json_confirmation_message(message_type: str) -> bool:
     return message_type == AgentJsonMessageTypes.CONFIRMATION
 
 
+def _literal_values(union_of_type) -> frozenset[str]:
+    if get_origin(union_of_type) is Literal:
+        literals = get_args(union_of_type)
+    else:
+        literals = [literal for lit in get_args(union_of_type) for literal in get_args(lit)]
+    return frozenset(literal.value if isinstance(literal, Enum) else literal for literal in literals)
+
+
+# Computed once, the checkers below are called for every received message.
+TASK_SELECTION_TYPES: frozenset[str] = _literal_values(TaskSelectionTypes)
+DATA_REQUEST_TYPES: frozenset[str] = _literal_values(DataRequestTypes)
+
+
 def is_task_selection_message(message_type: str) -> bool:
-    union_of_type = TaskSelectionTypes
-    allowed_values = [literal for lit in get_args(
-        union_of_type) for literal in get_args(lit)]
-    return message_type.upper() in allowed_values
+    return message_type.upper() in TASK_SELECTION_TYPES
 
 
 def is_data_request_message(message_type: str) -> bool:
-    union_of_type = DataRequestTypes
-    if get_origin(union_of_type) is Union:
-        allowed_values = [literal for lit in get_args(
-            union_of_type) for literal in get_args(lit)]
-    elif get_origin(union_of_type) is Literal:
-        allowed_values = get_args(union_of_type)
-
-    return message_type.upper() in allowed_values
+    return message_type.upper() in DATA_REQUEST_TYPES
 
 
 def is_agent_message(m: ApiBaseMessage) -> bool:
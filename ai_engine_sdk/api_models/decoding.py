@@ -0,0 +1,135 @@
+"""
+Decoding of the raw messages returned by the `new-messages` endpoint into SDK messages.
+
+Each raw message is dispatched through a table keyed by `(type, agent_json.type)`, built once at import time.
+
+Every message is validated: there is no unvalidated ("trusted") mode. Building the pydantic models without
+validation saves about 10% of the CPU per message (the cost is creating the model instances, not validating them),
+and compact `__slots__` objects can't stand in for the message classes, since pydantic doesn't support virtual
+subclasses in `isinstance` checks. See `benchmarks/bench_message_decoding.py`.
+"""
+import logging
+from types import MappingProxyType
+from typing import Callable, Iterable, List, Mapping, Optional, Tuple, Union
+
+from .. import json_backend
+from .agents_json_messages import (
+    AgentJsonMessageTypes,
+    ConfirmationMessage,
+    DataRequestMessage,
+    TaskSelectionMessage,
+    TASK_SELECTION_TYPES,
+)
+from .api_message import AgentMessage, AiEngineMessage, ApiBaseMessage, ApiMessageType, StopMessage
+from .parsing_utils import get_indexed_task_options_from_raw_api_response
+
+logger = logging.getLogger(__name__)
+
+MessageDecoder = Callable[[dict], ApiBaseMessage]
+DecoderKey = Tuple[str, Optional[str]]
+
+# agent_json messages of these kinds are not tagged by the API, they are recognised by their text.
+CONTEXT_JSON_TYPE = "CONTEXT_JSON"
+CONFIRMATION_TEXT_MARKER = "Please confirm"
+
+
+def _decode_task_selection(message: dict) -> TaskSelectionMessage:
+    agent_json: dict = message['agent_json']
+    return TaskSelectionMessage.model_validate({
+        'type': agent_json['type'].upper(),
+        'id': message['message_id'],
+        'timestamp': message['timestamp'],
+        'text': agent_json['text'],
+        'options': get_indexed_task_options_from_raw_api_response(raw_api_response=message)
+    })
+
+
+def _decode_confirmation(message: dict) -> ConfirmationMessage:
+    agent_json: dict = message['agent_json']
+    return ConfirmationMessage.model_validate({
+        'id': message['message_id'],
+        'timestamp': message['timestamp'],
+        'text': agent_json['text'],
+        'payload': agent_json['context_json'],
+    })
+
+
+def _decode_data_request(message: dict) -> DataRequestMessage:
+    agent_json: dict = message['agent_json']
+    return DataRequestMessage.model_validate({
+        'id': message['message_id'],
+        'text': agent_json['text'],
+        'type': agent_json['type'].upper(),
+        'options': agent_json['options'],
+        'timestamp': message['timestamp']
+    })
+
+
+def _decode_agent_info(message: dict) -> AiEngineMessage:
+    return AiEngineMessage.model_validate({
+        'id': message['message_id'],
+        'type': 'ai-engine',
+        'timestamp': message['timestamp'],
+        'text': message['agent_info'],
+    })
+
+
+def _decode_agent_message(message: dict) -> AgentMessage:
+    return AgentMessage.model_validate({
+        'id': message['message_id'],
+        'type': 'agent',
+        'timestamp': message['timestamp'],
+        'text': message['agent_message'],
+    })
+
+
+def _decode_stop(message: dict) -> StopMessage:
+    return StopMessage.model_validate({
+        'id': message['message_id'],
+        'timestamp': message['timestamp'],
+        'type': 'stop',
+    })
+
+
+DECODERS: Mapping[DecoderKey, MessageDecoder] = MappingProxyType({
+    **{(ApiMessageType.AGENT_JSON.value, t): _decode_task_selection for t in TASK_SELECTION_TYPES},
+    (ApiMessageType.AGENT_JSON.value, CONTEXT_JSON_TYPE): _decode_confirmation,
+    (ApiMessageType.AGENT_JSON.value, AgentJsonMessageTypes.DATE.value): _decode_data_request,
+    (ApiMessageType.AGENT_INFO.value, None): _decode_agent_info,
+    (ApiMessageType.AGENT_MESSAGE.value, None): _decode_agent_message,
+    (ApiMessageType.AGENT_STOP.value, None): _decode_stop,
+})
+
+
+def get_decoder_key(message: dict) -> DecoderKey:
+    """
+    Returns the `(type, agent_json.type)` key used to dispatch a raw message.
+    """
+    message_type: str = message['type']
+    if message_type != ApiMessageType.AGENT_JSON.value:
+        return message_type, None
+    agent_json: dict = message['agent_json']
+    agent_json_type: str = agent_json['type'].upper()
+    if agent_json_type not in TASK_SELECTION_TYPES and CONFIRMATION_TEXT_MARKER in agent_json['text']:
+        return message_type, CONTEXT_JSON_TYPE
+    return message_type, agent_json_type
+
+
+def decode_message(message: dict) -> Optional[ApiBaseMessage]:
+    """
+    Decodes one raw (already JSON decoded) message. Returns None for unknown message kinds.
+    """
+    key = get_decoder_key(message)
+    decoder = DECODERS.get(key)
+    if decoder is None:
+        logger.warning(f"Unknown message {key}: {message}")
+        return None
+    return decoder(message)
+
+
+def load_raw_messages(agent_response: Iterable[Union[str, bytes]]) -> List[dict]:
+    """
+    Decodes the JSON encoded messages of the `agent_response` list of a `new-messages` response.
+    """
+    loads = json_backend.loads
+    return [loads(item) for item in agent_response]
@@ -0,0 +1,133 @@
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Generator, Generic, Iterable, List, Optional, TypeVar
+
+from .errors import AiEngineError
+
+logger = logging.getLogger(__name__)
+
+I = TypeVar('I')
+R = TypeVar('R')
+
+
+@dataclass
+class BulkItemResult(Generic[I, R]):
+    """
+    The outcome of one item of a bulk operation.
+
+    Attributes:
+        index (int): Position of the item in the input.
+        item (I): The input item (a group name, a `(function_group_id, email)` pair...).
+        result (Optional[R]): What the operation returned, when it succeeded.
+        error (Optional[Exception]): What the operation raised, when it failed.
+    """
+    index: int
+    item: I
+    result: Optional[R] = None
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class BulkReport(Generic[I, R]):
+    """
+    The outcome of a whole bulk operation, in input order.
+    """
+    results: List[BulkItemResult[I, R]] = field(default_factory=list)
+
+    @property
+    def succeeded(self) -> List[BulkItemResult[I, R]]:
+        return [result for result in self.results if result.ok]
+
+    @property
+    def failed(self) -> List[BulkItemResult[I, R]]:
+        return [result for result in self.results if not result.ok]
+
+    @property
+    def ok(self) -> bool:
+        return all(result.ok for result in self.results)
+
+    def raise_for_failures(self):
+        """
+        Raises `BulkOperationError` if any item failed.
+        """
+        if not self.ok:
+            raise BulkOperationError(self)
+
+
+class BulkOperationError(AiEngineError):
+    """
+    Some items of a bulk operation failed, see `report`.
+    """
+    def __init__(self, report: BulkReport):
+        failed = report.failed
+        super().__init__(
+            f"{len(failed)} of {len(report.results)} items failed, first error: {failed[0].error!r}"
+        )
+        self.report = report
+
+
+class BulkOperation(Generic[I, R]):
+    """
+    Runs an async operation on many items with at most `concurrency` of them in flight.
+
+    Iterate over it to get every item result as soon as it's done, or await it to get the full report:
+
+        async for item_result in ai_engine.share_function_groups(group_ids, emails):
+            print(item_result.item, item_result.ok)
+
+        report = await ai_engine.create_function_groups(names)
+
+    A failing item never stops the others, its exception is stored in its `BulkItemResult`. Leaving the iteration
+    early cancels the items still running.
+    """
+    def __init__(self, items: Iterable[I], operation: Callable[[I], Awaitable[R]], concurrency: int = 16):
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self._items = list(items)
+        self._operation = operation
+        self._concurrency = concurrency
+        self._started = False
+        self.report: BulkReport[I, R] = BulkReport(results=[None] * len(self._items))
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    async def __aiter__(self) -> AsyncIterator[BulkItemResult[I, R]]:
+        if self._started:
+            raise RuntimeError("A bulk operation can only be run once")
+        self._started = True
+
+        pending = iter(enumerate(self._items))
+        done: asyncio.Queue = asyncio.Queue()
+
+        async def worker():
+            for index, item in pending:
+                try:
+                    item_result = BulkItemResult(index=index, item=item, result=await self._operation(item))
+                except Exception as error:
+                    logger.debug(f"Bulk operation failed for {item!r}: {error}")
+                    item_result = BulkItemResult(index=index, item=item, error=error)
+                self.report.results[index] = item_result
+                done.put_nowait(item_result)
+
+        workers = [asyncio.ensure_future(worker()) for _ in range(min(self._concurrency, len(self._items)))]
+        try:
+            for _ in range(len(self._items)):
+                yield await done.get()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def run(self) -> BulkReport[I, R]:
+        async for _ in self:
+            pass
+        return self.report
+
+    def __await__(self) -> Generator[Any, None, BulkReport[I, R]]:
+        return self.run().__await__()
@@ -0,0 +1,206 @@
+"""
+Record/replay of the API traffic, for reproducible offline benchmarks of `AiEngine` and `Session`.
+
+A cassette is a JSON Lines file (gzipped when its name ends with `.gz`) with one line per request/response
+exchange. The response bodies are kept verbatim, including the JSON encoded `agent_response` strings of
+`/new-messages`, so a replayed conversation decodes exactly what was received in production.
+
+    ai_engine = AiEngine(api_key, options={"record_cassette": "conversation.jsonl.gz"})
+    ...
+    ai_engine = AiEngine(api_key, options={"transport": ReplayTransport("conversation.jsonl.gz", speed=10)})
+"""
+import asyncio
+import gzip
+import json
+import logging
+import time
+from collections import defaultdict, deque
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import IO, Deque, Dict, List, Mapping, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+from .errors import AiEngineError
+from .transport import Transport, TransportResponse
+
+logger = logging.getLogger(__name__)
+
+CASSETTE_VERSION = 1
+
+
+class CassetteError(AiEngineError):
+    """
+    Raised when a replayed request has no matching exchange left in the cassette.
+    """
+
+
+@dataclass
+class Interaction:
+    """
+    One recorded request and its response.
+
+    Attributes:
+        method (str): The HTTP method.
+        url (str): The path and query string of the request, without the scheme and the host.
+        request_body (Optional[str]): The body sent.
+        status (int): The HTTP status code received.
+        headers (Dict[str, str]): The response headers.
+        body (str): The response body, decoded as UTF-8.
+        started_at (float): Seconds between the first recorded request and this one.
+        duration (float): Seconds the response took.
+    """
+    method: str
+    url: str
+    request_body: Optional[str]
+    status: int
+    headers: Dict[str, str] = field(default_factory=dict)
+    body: str = ""
+    started_at: float = 0.0
+    duration: float = 0.0
+
+    @property
+    def key(self) -> Tuple[str, str]:
+        return self.method, self.url
+
+    def to_response(self) -> TransportResponse:
+        return TransportResponse(status=self.status, headers=dict(self.headers), body=self.body.encode())
+
+
+def _relative_url(url: str) -> str:
+    split_url = urlsplit(url)
+    return f"{split_url.path}?{split_url.query}" if split_url.query else split_url.path
+
+
+def _open(path: Path, mode: str, compressed: bool) -> IO[str]:
+    if compressed:
+        return gzip.open(path, f"{mode}t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class Cassette:
+    """
+    The exchanges recorded in a cassette file, in the order the requests were sent.
+    """
+    def __init__(self, interactions: Optional[List[Interaction]] = None):
+        self.interactions: List[Interaction] = interactions if interactions is not None else []
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "Cassette":
+        path = Path(path)
+        with _open(path, "r", compressed=path.suffix == ".gz") as file:
+            header = json.loads(file.readline())
+            if header.get("version") != CASSETTE_VERSION:
+                raise CassetteError(f"Unsupported cassette version {header.get('version')} in {path}")
+            return cls([Interaction(**json.loads(line)) for line in file if line.strip()])
+
+    def save(self, path: Union[str, Path]):
+        path = Path(path)
+        temporary_path = path.with_name(f".{path.name}.tmp")
+        with _open(temporary_path, "w", compressed=path.suffix == ".gz") as file:
+            file.write(json.dumps({"version": CASSETTE_VERSION}) + "\n")
+            for interaction in self.interactions:
+                file.write(json.dumps(asdict(interaction), separators=(",", ":")) + "\n")
+        temporary_path.replace(path)
+
+
+class RecordingTransport(Transport):
+    """
+    Sends the requests through another transport and records every exchange. The cassette is written when the
+    transport is closed (`AiEngine.aclose` closes it), or with `save`.
+
+    The request headers, which carry the API key, are not recorded.
+    """
+    def __init__(self, transport: Transport, path: Union[str, Path]):
+        """
+        Args:
+            transport (Transport): The transport actually sending the requests.
+            path (Union[str, Path]): The cassette file, gzipped when its name ends with `.gz`.
+        """
+        self.transport = transport
+        self.path = Path(path)
+        self.cassette = Cassette()
+        self._started_at: Optional[float] = None
+
+    async def request(
+            self,
+            method: str,
+            url: str,
+            headers: Optional[Mapping[str, str]] = None,
+            data: Optional[str] = None
+    ) -> TransportResponse:
+        started_at = time.monotonic()
+        if self._started_at is None:
+            self._started_at = started_at
+        response = await self.transport.request(method, url, headers=headers, data=data)
+        self.cassette.interactions.append(Interaction(
+            method=method,
+            url=_relative_url(url),
+            request_body=data,
+            status=response.status,
+            headers=dict(response.headers),
+            body=response.body.decode("utf-8", errors="replace"),
+            started_at=round(started_at - self._started_at, 6),
+            duration=round(time.monotonic() - started_at, 6),
+        ))
+        return response
+
+    def save(self):
+        self.cassette.save(self.path)
+        logger.debug(f"{len(self.cassette.interactions)} exchanges recorded in {self.path}")
+
+    async def aclose(self):
+        await asyncio.to_thread(self.save)
+        await self.transport.aclose()
+
+
+class ReplayTransport(Transport):
+    """
+    Serves the responses of a cassette instead of sending the requests.
+
+    Every request gets the next unplayed response recorded for the same method, path and query string (request
+    bodies aren't compared: they carry fresh message IDs). Sessions created while replaying get the recorded
+    session IDs, so the following requests match the recording as long as the SDK sends the same requests.
+
+    With a `speed`, the responses follow the recorded timeline: each one is served at its recorded offset from the
+    first request (`started_at + duration`) divided by `speed`, and never sooner than its recorded `duration`
+    divided by `speed` after its request.
+    """
+    def __init__(self, cassette: Union[Cassette, str, Path], speed: Optional[float] = None):
+        """
+        Args:
+            cassette (Union[Cassette, str, Path]): The cassette, or the path of its file.
+            speed (Optional[float]): Replay timing: 1 follows the recorded timeline, 10 runs it ten times faster...
+                None (default) answers immediately.
+        """
+        self.cassette = cassette if isinstance(cassette, Cassette) else Cassette.load(cassette)
+        self.speed = speed
+        self._unplayed: Dict[Tuple[str, str], Deque[Interaction]] = defaultdict(deque)
+        for interaction in self.cassette.interactions:
+            self._unplayed[interaction.key].append(interaction)
+        self.played = 0
+        self._started_at: Optional[float] = None
+
+    @property
+    def unplayed(self) -> int:
+        return sum(len(interactions) for interactions in self._unplayed.values())
+
+    async def request(
+            self,
+            method: str,
+            url: str,
+            headers: Optional[Mapping[str, str]] = None,
+            data: Optional[str] = None
+    ) -> TransportResponse:
+        key = (method, _relative_url(url))
+        interactions = self._unplayed.get(key)
+        if not interactions:
+            raise CassetteError(f"No recorded response left for {method} {key[1]}")
+        interaction = interactions.popleft()
+        self.played += 1
+        if self.speed:
+            now = time.monotonic()
+            if self._started_at is None:
+                self._started_at = now
+            due_at = self._started_at + (interaction.started_at + interaction.duration) / self.speed
+            await asyncio.sleep(max(due_at - now, interaction.duration / self.speed))
+        return interaction.to_response()
@@ -0,0 +1,113 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogCacheEntry:
+    """
+    A cached catalog (function groups, functions...) with the validators needed to revalidate it.
+
+    Attributes:
+        value (Any): The parsed catalog.
+        etag (Optional[str]): The `ETag` header of the response it came from.
+        last_modified (Optional[str]): The `Last-Modified` header of the response it came from.
+        fetched_at (float): `time.monotonic()` of the last time the entry was fetched or revalidated.
+    """
+    def __init__(self, value: Any, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        self.value = value
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = time.monotonic()
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.fetched_at
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+# Receives the current entry (None if there is none) and returns a new entry, or None if the catalog didn't change.
+CatalogFetcher = Callable[[Optional[CatalogCacheEntry]], Awaitable[Optional[CatalogCacheEntry]]]
+
+
+class CatalogCache:
+    """
+    TTL cache with stale-while-revalidate for the catalog endpoints.
+
+    - Entries younger than `ttl` seconds are served without any request.
+    - Entries older than `ttl` but younger than `ttl + stale_while_revalidate` are served right away while they
+      are revalidated in the background.
+    - Older entries are revalidated before being served. Revalidation sends the `ETag`/`Last-Modified` validators,
+      so an unchanged catalog costs a small `304 Not Modified` response.
+
+    Concurrent requests for the same key share a single in-flight request.
+    """
+    def __init__(self, ttl: float = 0.0, stale_while_revalidate: float = 0.0):
+        """
+        Args:
+            ttl (float): Seconds an entry is served without revalidation.
+            stale_while_revalidate (float): Extra seconds a stale entry is served while it's revalidated in background.
+        """
+        self.ttl = ttl
+        self.stale_while_revalidate = stale_while_revalidate
+        self._entries: Dict[str, CatalogCacheEntry] = {}
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+    async def get(self, key: str, fetch: CatalogFetcher) -> Any:
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry.age < self.ttl:
+                return entry.value
+            if entry.age < self.ttl + self.stale_while_revalidate:
+                if key not in self._in_flight:
+                    background = self._revalidate(key, fetch)
+                    background.add_done_callback(self._log_background_failure)
+                return entry.value
+        return (await self._revalidate(key, fetch)).value
+
+    def invalidate(self, *keys: str):
+        """
+        Drops the given entries, or all of them when no key is given.
+        """
+        for key in keys or list(self._entries):
+            self._entries.pop(key, None)
+            # A request that started before the invalidation may return outdated data, don't keep its result.
+            self._in_flight.pop(key, None)
+
+    def _revalidate(self, key: str, fetch: CatalogFetcher) -> asyncio.Future:
+        if key in self._in_flight:
+            return self._in_flight[key]
+        future = asyncio.ensure_future(self._fetch(key, fetch))
+        self._in_flight[key] = future
+        return future
+
+    async def _fetch(self, key: str, fetch: CatalogFetcher) -> CatalogCacheEntry:
+        current = self._entries.get(key)
+        try:
+            entry = await fetch(current)
+            if entry is None:
+                # Not modified.
+                current.fetched_at = time.monotonic()
+                entry = current
+            else:
+                logger.debug(f"Catalog {key} refreshed")
+            if self._in_flight.get(key) is asyncio.current_task():
+                self._entries[key] = entry
+            return entry
+        finally:
+            if self._in_flight.get(key) is asyncio.current_task():
+                del self._in_flight[key]
+
+    @staticmethod
+    def _log_background_failure(future: asyncio.Future):
+        if not future.cancelled() and future.exception() is not None:
+            logger.warning(f"Background catalog revalidation failed: {future.exception()}")
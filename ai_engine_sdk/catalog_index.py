@@ -0,0 +1,154 @@
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional
+
+from .client import Function, FunctionGroup, FunctionGroupFunctions
+
+if TYPE_CHECKING:
+    from .client import AiEngine
+
+logger = logging.getLogger(__name__)
+
+
+class FunctionCatalogIndex:
+    """
+    In-memory index of the function groups and functions visible to the user.
+
+    Built from the catalog endpoints, it answers lookups without any request:
+
+        index = await FunctionCatalogIndex.build(ai_engine)
+        public_group = index.group_by_name("Fetch Verified")
+        groups = index.groups_of_function("Flight Finder")
+
+    `refresh()` updates it incrementally: the group list is fetched again (cheap with the catalog cache), the functions
+    of new groups are fetched and removed groups are dropped.
+    """
+    def __init__(self, ai_engine: "AiEngine", include_functions: bool = True, concurrency: int = 8):
+        """
+        Args:
+            ai_engine (AiEngine): The client used to fetch the catalogs.
+            include_functions (bool): Whether to index the functions of every group (one request per group).
+            concurrency (int): Maximum number of group function lists fetched at the same time.
+        """
+        self._ai_engine = ai_engine
+        self._include_functions = include_functions
+        self._concurrency = concurrency
+
+        self._groups_by_uuid: Dict[str, FunctionGroup] = {}
+        self._groups_by_name: Dict[str, List[FunctionGroup]] = {}
+        self._functions_by_uuid: Dict[str, Function] = {}
+        self._functions_by_name: Dict[str, Function] = {}
+        self._group_functions: Dict[str, List[FunctionGroupFunctions]] = {}
+        self._function_groups: Dict[str, List[str]] = {}
+
+    @classmethod
+    async def build(cls, ai_engine: "AiEngine", include_functions: bool = True, concurrency: int = 8) -> "FunctionCatalogIndex":
+        index = cls(ai_engine=ai_engine, include_functions=include_functions, concurrency=concurrency)
+        await index.refresh()
+        return index
+
+    ####
+    # Lookups
+    ####
+    def group_by_uuid(self, uuid: str) -> Optional[FunctionGroup]:
+        return self._groups_by_uuid.get(uuid)
+
+    def group_by_name(self, name: str) -> Optional[FunctionGroup]:
+        """
+        Returns the group with the given name, private groups first (as in `AiEngine.get_function_groups`).
+        """
+        groups = self._groups_by_name.get(name)
+        return groups[0] if groups else None
+
+    def groups_by_name(self, name: str) -> List[FunctionGroup]:
+        return list(self._groups_by_name.get(name, []))
+
+    def function_by_uuid(self, uuid: str) -> Optional[Function]:
+        return self._functions_by_uuid.get(uuid)
+
+    def function_by_name(self, name: str) -> Optional[Function]:
+        return self._functions_by_name.get(name)
+
+    def functions_of_group(self, group_uuid: str) -> List[FunctionGroupFunctions]:
+        return list(self._group_functions.get(group_uuid, []))
+
+    def groups_of_function(self, function: str) -> List[FunctionGroup]:
+        """
+        Returns the groups containing a function, given its name or its uuid.
+        """
+        known_function = self._functions_by_uuid.get(function)
+        name = known_function.name if known_function is not None else function
+        return [self._groups_by_uuid[uuid] for uuid in self._function_groups.get(name, []) if uuid in self._groups_by_uuid]
+
+    @property
+    def groups(self) -> List[FunctionGroup]:
+        return list(self._groups_by_uuid.values())
+
+    @property
+    def functions(self) -> List[Function]:
+        return list(self._functions_by_uuid.values())
+
+    def __len__(self) -> int:
+        return len(self._groups_by_uuid)
+
+    ####
+    # Refresh
+    ####
+    async def refresh(self, full: bool = False):
+        """
+        Updates the index.
+
+        Args:
+            full (bool): Fetch again the functions of every group, not only of the new ones.
+        """
+        groups, functions = await asyncio.gather(
+            self._ai_engine.get_function_groups(),
+            self._ai_engine.get_functions()
+        )
+
+        self._functions_by_uuid = {f.uuid: f for f in functions}
+        self._functions_by_name = {f.name: f for f in functions}
+
+        previous_uuids = set(self._groups_by_uuid)
+        self._groups_by_uuid = {}
+        self._groups_by_name = {}
+        for group in groups:
+            self._index_group(group)
+
+        for removed_uuid in previous_uuids - set(self._groups_by_uuid):
+            self._unindex_group_functions(removed_uuid)
+
+        if self._include_functions:
+            to_fetch = self._groups_by_uuid.keys() if full else self._groups_by_uuid.keys() - previous_uuids
+            await self._fetch_group_functions(list(to_fetch))
+
+    async def refresh_group(self, group_uuid: str):
+        """
+        Fetches again the functions of a single group.
+        """
+        await self._fetch_group_functions([group_uuid])
+
+    def _index_group(self, group: FunctionGroup):
+        self._groups_by_uuid[group.uuid] = group
+        self._groups_by_name.setdefault(group.name, []).append(group)
+
+    def _unindex_group_functions(self, group_uuid: str):
+        for function in self._group_functions.pop(group_uuid, []):
+            group_uuids = self._function_groups.get(function.name, [])
+            if group_uuid in group_uuids:
+                group_uuids.remove(group_uuid)
+            if not group_uuids:
+                self._function_groups.pop(function.name, None)
+
+    async def _fetch_group_functions(self, group_uuids: Iterable[str]):
+        semaphore = asyncio.Semaphore(self._concurrency)
+
+        async def fetch(group_uuid: str):
+            async with semaphore:
+                group_functions = await self._ai_engine.get_functions_by_function_group(group_uuid)
+            self._unindex_group_functions(group_uuid)
+            self._group_functions[group_uuid] = group_functions
+            for function in group_functions:
+                self._function_groups.setdefault(function.name, []).append(group_uuid)
+
+        await asyncio.gather(*(fetch(uuid) for uuid in group_uuids))
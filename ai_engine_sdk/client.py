@@ -2,34 +2,30 @@ import asyncio
 import json
 import logging
 import re
+import time
 from pprint import pformat
-from typing import Optional, List, Union
+from typing import (
+    TYPE_CHECKING, Any, AsyncIterator, Callable, Deque, Dict, Iterable, Mapping, Optional, List, Tuple, TypeVar, Union
+)
+from urllib.parse import urlencode
 from uuid import uuid4
 
-import aiohttp
 from pydantic import BaseModel, Field
 
 from .api_models.agents_json_messages import (
     ConfirmationMessage,
     TaskOption,
     TaskSelectionMessage,
-    is_task_selection_message,
-    is_data_request_message,
-    DataRequestMessage
 )
 from .api_models.api_message import (
-    is_api_agent_json_message,
-    is_api_agent_info_message,
-    is_api_agent_message_message,
-    is_api_stop_message,
-    ApiBaseMessage, AgentMessage, AiEngineMessage, StopMessage
+    is_stop_message,
+    ApiBaseMessage, AgentMessage
 )
 from .api_models.api_models import (
     ApiNewSessionRequest,
-    is_api_context_json,
     ApiStartMessage, ApiMessagePayload, ApiUserJsonMessage, ApiUserMessageMessage, ApiUserMessageExecuteFunctions
 )
-from .api_models.parsing_utils import get_indexed_task_options_from_raw_api_response
+from .api_models.decoding import decode_message, load_raw_messages
 from .llm_models import (
     CustomModel,
     DefaultModelId,
@@ -38,11 +34,36 @@ from .llm_models import (
     get_model_name,
     KnownModelId
 )
+from .catalog_cache import CatalogCache, CatalogCacheEntry
+from .errors import AiEngineError, ApiClientError, ApiConnectionError, ApiError, api_error_from_response
+from .polling import PollBackoff
+from .rate_limiting import RateLimiter, make_rate_limiter
+from .retry import EndpointClass, NO_RETRY, RetryPolicy, classify_endpoint, resolve_retry_policies
+from .session_history import MessageRetention, RecentIds, make_message_history
+from .transport import AiohttpTransport, Transport, TransportResponse, make_transport
+
+# The optional features are imported where they are used, so that they don't weigh on `import AiEngine`.
+if TYPE_CHECKING:
+    from .bulk import BulkOperation
+    from .credit_guard import CreditGuard
+    from .fan_out import ExecutionJob, FanOutExecution, MessageResponder
+    from .instrumentation import Instrumentation
+    from .session_lifecycle import SessionLifecycleManager
+    from .session_pool import SessionPool
+    from .session_store import SessionSnapshot, SessionStore
 
 logger = logging.getLogger(__name__)
 
 default_api_base_url = "https://agentverse.ai"
 
+PUBLIC_FUNCTION_GROUPS_ENDPOINT = "/v1beta1/function-groups/public/"
+PRIVATE_FUNCTION_GROUPS_ENDPOINT = "/v1beta1/function-groups/"
+FUNCTIONS_ENDPOINT = "/v1beta1/functions/"
+# Models per `remaining_tokens` request in `AiEngine.get_model_credits_bulk`, to keep URLs short.
+MAX_MODELS_PER_CREDIT_REQUEST = 50
+
+T = TypeVar("T")
+
 
 class CreditBalance(BaseModel):
     totalCredits: int
@@ -77,43 +98,191 @@ class CreateFunctionGroupSchema(BaseModel):
     is_private: bool = Field(serialization_alias="isPrivate")
 
 
-async def make_api_request(
+async def make_raw_api_request(
         api_base_url: str,
         api_key: str,
         method: str,
         endpoint: str,
-        payload: Optional[dict] = None
-) -> dict:
+        payload: Optional[dict] = None,
+        transport: Optional[Transport] = None,
+        headers: Optional[dict] = None,
+        retry_policies: Optional[Mapping[EndpointClass, RetryPolicy]] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        instrumentation: Optional["Instrumentation"] = None
+) -> TransportResponse:
+    """
+    Sends a request to the API and returns the whole response (status, headers and body).
+
+    Failed requests are retried according to the policy of their endpoint class (see `retry.EndpointClass`), none
+    by default. Submits are only retried when their payload carries a `message_id`, so the API can recognise a
+    message it already received.
+
+    Every attempt goes through `rate_limiter`, when given, which can delay it and learns from its outcome, and is
+    reported to `instrumentation`.
+
+    Raises:
+        ApiError: (or one of its subclasses) for any non-2xx status, except 304 (Not Modified) which answers
+            conditional requests.
+        ApiConnectionError: when the request could not be completed.
+    """
     body = json.dumps(payload) if payload else None
 
-    headers = {
+    request_headers = {
         "Content-Type": "application/json",
-        "Authorization": f"Bearer {api_key}"
+        "Authorization": f"Bearer {api_key}",
+        **(headers or {})
     }
 
-    async with aiohttp.ClientSession() as session:
+    if transport is None:
+        # No shared pool provided: behave as a one-shot request.
+        async with AiohttpTransport() as one_shot_transport:
+            return await make_raw_api_request(
+                api_base_url, api_key, method, endpoint, payload, one_shot_transport, headers, retry_policies,
+                rate_limiter, instrumentation
+            )
+
+    endpoint_class = classify_endpoint(method, endpoint)
+    retry_policy = (retry_policies or {}).get(endpoint_class, NO_RETRY)
+    if endpoint_class == EndpointClass.SUBMIT and not (payload or {}).get('payload', {}).get('message_id'):
+        retry_policy = NO_RETRY
+
+    if instrumentation is not None:
+        from .instrumentation import RequestEndEvent, RequestStartEvent, RetryEvent
+    if instrumentation is not None or rate_limiter is not None:
+        from .instrumentation import endpoint_template
+        template = endpoint_template(endpoint)
+    else:
+        template = endpoint
+    bytes_out = len(body.encode()) if body and instrumentation is not None else 0
+
+    attempt = 1
+    while True:
         logger.debug(f"\n\n 📤 Request triggered : {method} {api_base_url}{endpoint}")
         logger.debug(f"{body=}")
         logger.debug("---------------------------\n\n")
-        async with session.request(method, f"{api_base_url}{endpoint}", headers=headers, data=body) as response:
-            if not bool(re.search(pattern="^2..$", string=str(response.status))):
-                raise Exception(f"Request failed with status {response.status} to {method}: {endpoint}")
-            return await response.json()
+        response: Optional[TransportResponse] = None
+        error: Optional[AiEngineError] = None
+        if rate_limiter is not None:
+            await rate_limiter.acquire()
+        if instrumentation is not None:
+            instrumentation.on_request_start(RequestStartEvent(
+                method=method, endpoint=endpoint, template=template, attempt=attempt, bytes_out=bytes_out
+            ))
+        started_at = time.monotonic()
+        try:
+            response = await transport.request(method, f"{api_base_url}{endpoint}", headers=request_headers, data=body)
+            if not (response.status == 304 or bool(re.search(pattern="^2..$", string=str(response.status)))):
+                error = api_error_from_response(response.status, method, endpoint, response.body, response.headers)
+        except ApiConnectionError as connection_error:
+            error = connection_error
+        finally:
+            duration = time.monotonic() - started_at
+            if instrumentation is not None:
+                instrumentation.on_request_end(RequestEndEvent(
+                    method=method,
+                    endpoint=endpoint,
+                    template=template,
+                    attempt=attempt,
+                    duration=duration,
+                    status=response.status if response is not None else None,
+                    bytes_out=bytes_out,
+                    bytes_in=len(response.body) if response is not None else 0,
+                    error=error
+                ))
+            if rate_limiter is not None:
+                await rate_limiter.release(
+                    latency=duration if response is not None else None,
+                    endpoint=f"{method} {template}",
+                    status=response.status if response is not None else None,
+                    retry_after=error.retry_after if isinstance(error, ApiError) else None,
+                    connection_failed=isinstance(error, ApiConnectionError)
+                )
+
+        if error is None:
+            return response
+        if attempt >= retry_policy.max_attempts or not retry_policy.is_retriable(error):
+            raise error
+        delay = retry_policy.get_delay(attempt, error)
+        logger.info(f"{method} {endpoint} failed ({error}), retrying in {delay:.2f}s (attempt {attempt + 1})")
+        if instrumentation is not None:
+            instrumentation.on_retry(RetryEvent(
+                method=method, endpoint=endpoint, template=template, attempt=attempt, delay=delay, error=error
+            ))
+        await asyncio.sleep(delay)
+        attempt += 1
+
+
+async def make_api_request(
+        api_base_url: str,
+        api_key: str,
+        method: str,
+        endpoint: str,
+        payload: Optional[dict] = None,
+        transport: Optional[Transport] = None,
+        retry_policies: Optional[Mapping[EndpointClass, RetryPolicy]] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        instrumentation: Optional["Instrumentation"] = None
+) -> dict:
+    response = await make_raw_api_request(
+        api_base_url, api_key, method, endpoint, payload, transport,
+        retry_policies=retry_policies, rate_limiter=rate_limiter, instrumentation=instrumentation
+    )
+    return response.json()
+
+
+def _read_catalog_page(raw_response: Any, items_key: Optional[str], offset: int, page_size: int) -> Tuple[list, bool]:
+    """
+    Returns the entries of a catalog page and whether there are more pages.
+    """
+    if isinstance(raw_response, list):
+        items = raw_response
+    else:
+        items = raw_response.get(items_key or 'items', raw_response.get('results', []))
+        if 'has_more' in raw_response:
+            return items, bool(raw_response['has_more'])
+        if 'next' in raw_response:
+            return items, raw_response['next'] is not None
+        if 'total' in raw_response:
+            return items, offset + len(items) < raw_response['total']
+    # No pagination metadata: a full page may be followed by another one, anything else is the whole catalog.
+    return items, len(items) == page_size
 
 
 class Session:
     """
     Represents a session with an API, managing messages and interactions within a specific function group or functions.
 
+    Used as an async context manager, the session is deleted on exit:
+
+        async with await ai_engine.create_session(function_group) as session:
+            ...
+
     Attributes:
         _api_base_url (str): The base URL for the API.
         _api_key (str): The AGENTVERSE API key used for authentication.
         session_id (str): The unique identifier for the session.
         function_group (str): The function group associated with this session.
-        _messages (List[ApiBaseMessage]): A list to store messages associated with the session.
-        _message_ids (set[str]): A set to store unique message IDs to prevent duplication.
+        _messages (Union[list[dict], deque[dict]]): The raw messages received, as many as the retention policy keeps.
+        _message_ids (RecentIds): The IDs of the most recent messages, to prevent duplication.
+        _last_message_id (Optional[str]): The ID of the last message received, the cursor for fetching newer messages.
+        _transport (Optional[Transport]): The pooled transport shared with the `AiEngine` that created the session.
     """
-    def __init__(self, api_base_url: str, api_key: str, session_id: str, function_group: str):
+    def __init__(
+            self,
+            api_base_url: str,
+            api_key: str,
+            session_id: str,
+            function_group: str,
+            transport: Optional[Transport] = None,
+            retry_policies: Optional[Mapping[EndpointClass, RetryPolicy]] = None,
+            rate_limiter: Optional[RateLimiter] = None,
+            credit_guard: Optional["CreditGuard"] = None,
+            instrumentation: Optional["Instrumentation"] = None,
+            session_store: Optional["SessionStore"] = None,
+            retention: Union[MessageRetention, str] = MessageRetention.FULL,
+            history_size: int = 100,
+            dedup_window: int = 1024
+    ):
         """
         Initializes a new session with the given parameters.
 
@@ -122,13 +291,111 @@ class Session:
             api_key (str): The AGENTVERSE API key used for authentication.
             session_id (str): The unique identifier for the session.
             function_group (str): The function-group associated with this session.
+            transport (Optional[Transport]): Connection pool used for the requests. When omitted every
+                request opens (and closes) its own connection.
+            retry_policies (Optional[Mapping[EndpointClass, RetryPolicy]]): How failed requests are retried, per
+                endpoint class. No retries when omitted.
+            rate_limiter (Optional[RateLimiter]): Limiter shared with the `AiEngine` that created the session.
+            credit_guard (Optional[CreditGuard]): Cached credit checked before starting the conversation.
+            instrumentation (Optional[Instrumentation]): Hooks notified of the requests and of the messages decoded.
+            session_store (Optional[SessionStore]): Where the snapshot of the session is saved once its messages are
+                processed (see `commit`), so that it can be resumed after a restart.
+            retention (Union[MessageRetention, str]): Which raw messages are kept: only the cursor, a ring buffer
+                of the last `history_size` messages or the full history.
+            history_size (int): Number of raw messages kept with the `ring_buffer` retention.
+            dedup_window (int): Number of recent message IDs remembered to skip duplicated messages.
         """
         self._api_base_url = api_base_url
         self._api_key = api_key
         self.session_id = session_id
         self.function_group = function_group
-        self._messages: List[ApiBaseMessage] = []
-        self._message_ids: set[str] = set()
+        self._messages: Union[List[dict], Deque[dict]] = make_message_history(retention, history_size)
+        self._message_ids: RecentIds = RecentIds(max_size=dedup_window)
+        self._last_message_id: Optional[str] = None
+        # The model requested when the session was created (None when resumed), charged by the credit guard.
+        self._model: Optional[str] = None
+        # The cursor last saved in the session store.
+        self._committed_message_id: Optional[str] = None
+        self._transport = transport
+        self._retry_policies = retry_policies
+        self._rate_limiter = rate_limiter
+        self._credit_guard = credit_guard
+        self._instrumentation = instrumentation
+        self._session_store = session_store
+        self._submitted = asyncio.Event()
+        self._submit_listeners: List[Callable[["Session"], None]] = []
+        self._delete_listeners: List[Callable[["Session"], None]] = []
+        self._deleted = False
+        self._last_used_at = time.monotonic()
+
+    async def __aenter__(self) -> "Session":
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if not self._deleted:
+            await self.delete()
+
+    async def _request(self, method: str, endpoint: str, payload: Optional[dict] = None) -> dict:
+        self._last_used_at = time.monotonic()
+        return await make_api_request(
+            api_base_url=self._api_base_url,
+            api_key=self._api_key,
+            method=method,
+            endpoint=endpoint,
+            payload=payload,
+            transport=self._transport,
+            retry_policies=self._retry_policies,
+            rate_limiter=self._rate_limiter,
+            instrumentation=self._instrumentation
+        )
+
+    @property
+    def last_message_id(self) -> Optional[str]:
+        """
+        The ID of the last message received, used as cursor to fetch newer messages.
+        """
+        return self._last_message_id
+
+    @property
+    def deleted(self) -> bool:
+        return self._deleted
+
+    @property
+    def idle_time(self) -> float:
+        """
+        Seconds since the session last sent a request.
+        """
+        return time.monotonic() - self._last_used_at
+
+    @property
+    def history(self) -> List[dict]:
+        """
+        The raw messages kept according to the session retention policy, oldest first.
+        """
+        return list(self._messages)
+
+    def snapshot(self) -> "SessionSnapshot":
+        """
+        Returns the state needed to resume the session elsewhere with `AiEngine.resume_session`.
+        """
+        from .session_store import SessionSnapshot
+        return SessionSnapshot(
+            session_id=self.session_id,
+            function_group=self.function_group,
+            last_message_id=self._last_message_id
+        )
+
+    async def commit(self):
+        """
+        Saves the snapshot of the session in the session store, marking every message returned so far as processed:
+        a session resumed from the store won't fetch them again.
+
+        `get_messages` (hence `stream`) commits the messages of the previous poll before polling again, so after a
+        crash only the messages of the last poll are fetched again. Call it to acknowledge messages earlier.
+        """
+        if self._session_store is not None and self._last_message_id != self._committed_message_id:
+            await self._session_store.save(self.snapshot())
+            self._committed_message_id = self._last_message_id
 
     async def _submit_message(self, payload: ApiMessagePayload):
         """
@@ -140,13 +407,32 @@ class Session:
         Returns:
             None
         """
-        await make_api_request(
-            api_base_url=self._api_base_url,
-            api_key=self._api_key,
+        await self._request(
             method='POST',
             endpoint=f"/v1beta1/engine/chat/sessions/{self.session_id}/submit",
             payload={'payload': payload.model_dump()}
         )
+        # Wake up any `stream()` waiting between polls: a reply is likely on its way.
+        self._submitted.set()
+        for listener in self._submit_listeners:
+            listener(self)
+
+    def add_submit_listener(self, listener: Callable[["Session"], None]):
+        """
+        Registers a callback invoked (synchronously) every time a message is submitted in this session.
+        Used by pollers to speed up polling when a reply is expected.
+        """
+        self._submit_listeners.append(listener)
+
+    def remove_submit_listener(self, listener: Callable[["Session"], None]):
+        if listener in self._submit_listeners:
+            self._submit_listeners.remove(listener)
+
+    def add_delete_listener(self, listener: Callable[["Session"], None]):
+        """
+        Registers a callback invoked (synchronously) once the session is deleted. Used to track live sessions.
+        """
+        self._delete_listeners.append(listener)
 
     async def start(self, objective: str, context: Optional[str] = None):
         """
@@ -155,7 +441,12 @@ class Session:
         Args:
             objective (str): The primary objective or goal of the actor (user, program, whatever...).
             context (Optional[str]): Additional context for the session, if any.
+
+        Raises:
+            InsufficientCreditsError: when the session has a credit guard and the account has no credit left.
         """
+        if self._credit_guard is not None:
+            await self._credit_guard.ensure_credits()
         await self._submit_message(
             payload=ApiStartMessage.model_validate({
                 'session_id': self.session_id,
@@ -254,102 +545,107 @@ class Session:
 
             Each message type has a different purpose as the name indicates.
         """
-        queryParams = f"?last_message_id={self._messages[-1]['message_id']}" if self._messages else ""
-        response = await make_api_request(
-            api_base_url=self._api_base_url,
-            api_key=self._api_key,
+        # The caller is polling again: the messages returned by the previous call are processed.
+        await self.commit()
+        queryParams = f"?last_message_id={self._last_message_id}" if self._last_message_id else ""
+        response = await self._request(
             method='GET',
             endpoint=f"/v1beta1/engine/chat/sessions/{self.session_id}/new-messages{queryParams}"
         )
 
         newMessages: List[ApiBaseMessage] = []
-        for item in response['agent_response']:
-            message: dict = json.loads(item)
+        for message in load_raw_messages(response['agent_response']):
             if message['message_id'] in self._message_ids:
                 continue
-            logger.debug(f"\n 📥 Message received: {pformat(message)} \n")
-            logger.debug(f"----------------- \n")
-            if is_api_agent_json_message(message):
-                agent_json: dict = message['agent_json']
-                agent_json_type: str = agent_json['type'].upper()
-                if is_task_selection_message(message_type=agent_json_type):
-                    indexed_task_options: dict = get_indexed_task_options_from_raw_api_response(raw_api_response=message)
-                    newMessages.append(
-                        TaskSelectionMessage.model_validate({
-                            'type': agent_json_type,
-                            'id': message['message_id'],
-                            'timestamp': message['timestamp'],
-                            'text': agent_json['text'],
-                            'options': indexed_task_options
-                        })
-                    )
-                elif is_api_context_json(message_type=agent_json_type, agent_json_text=agent_json['text']):
-                    newMessages.append(
-                        ConfirmationMessage.model_validate({
-                            'id': message['message_id'],
-                            'timestamp': message['timestamp'],
-                            'text': agent_json['text'],
-                            'payload': agent_json['context_json'],
-                        })
-                    )
-                elif is_data_request_message(message_type=agent_json_type):
-                    newMessages.append(
-                        DataRequestMessage.model_validate({
-                            "id": message['message_id'],
-                            "text": agent_json['text'],
-                            "type": agent_json_type,
-                            "options": agent_json['options'],
-                            "timestamp": message['timestamp']
-                        })
-                    )
-                else:
-                    print(f"UNKNOWN-JSON: {message}")
-            elif is_api_agent_info_message(message):
-                newMessages.append(
-                    AiEngineMessage.model_validate({
-                        'id': message['message_id'],
-                        'type': 'ai-engine',
-                        'timestamp': message['timestamp'],
-                        'text': message['agent_info'],
-                    })
-                )
-            elif is_api_agent_message_message(message):
-                newMessages.append(
-                    AgentMessage.model_validate({
-                        'id': message['message_id'],
-                        'type': 'agent',
-                        'timestamp': message['timestamp'],
-                        'text': message['agent_message'],
-                    })
-                )
-            elif is_api_stop_message(message):
-                print(f"STOP: {message}")
-                newMessages.append(
-                    StopMessage.model_validate({
-                        'id': message['message_id'],
-                        'timestamp': message['timestamp'],
-                        'type': 'stop',
-                    })
-                )
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"\n 📥 Message received: {pformat(message)} \n")
+                logger.debug(f"----------------- \n")
+            if self._instrumentation is None:
+                decoded_message = decode_message(message)
             else:
-                print(f"UNKNOWN: {message}")
-
-            if message['message_id'] not in self._message_ids:
-                self._messages.append(message)
-                self._message_ids.add(message['message_id'])
+                from .instrumentation import MessageParsedEvent
+                decoding_started_at = time.perf_counter()
+                decoded_message = decode_message(message)
+                self._instrumentation.on_message_parsed(MessageParsedEvent(
+                    session_id=self.session_id,
+                    message_type=type(decoded_message).__name__ if decoded_message is not None else "unknown",
+                    duration=time.perf_counter() - decoding_started_at
+                ))
+            if decoded_message is not None:
+                newMessages.append(decoded_message)
+
+            self._messages.append(message)
+            self._message_ids.add(message['message_id'])
+            self._last_message_id = message['message_id']
 
         return newMessages
 
+    async def stream(
+            self,
+            min_interval: float = 0.25,
+            max_interval: float = 5.0,
+            backoff_factor: float = 2.0,
+            idle_timeout: Optional[float] = 120.0
+    ) -> AsyncIterator[ApiBaseMessage]:
+        """
+        Yields the new messages of the session as they arrive, polling the ai-engine API with adaptive backoff.
+
+        Polling is fast right after a message is submitted (through any of the `submit_*` methods, even while
+        the stream is waiting) or received, and slows down exponentially while the session is idle, up to
+        `max_interval` seconds between polls.
+
+        The stream ends on its own after yielding a `StopMessage`, or when no message has been received for
+        `idle_timeout` seconds.
+
+            async for message in session.stream():
+                if is_task_selection_message(message_type=message.type):
+                    ...
+
+        Args:
+            min_interval (float): Seconds between polls right after some activity.
+            max_interval (float): Maximum seconds between two polls.
+            backoff_factor (float): Growth factor of the interval after every empty poll.
+            idle_timeout (Optional[float]): Seconds without new messages after which the stream ends. None waits forever.
+        """
+        backoff = PollBackoff(min_interval=min_interval, max_interval=max_interval, multiplier=backoff_factor)
+        last_activity = time.monotonic()
+        while True:
+            # Cleared before polling, so a submit made while the caller handles the messages is not missed.
+            self._submitted.clear()
+            messages = await self.get_messages()
+            if messages:
+                last_activity = time.monotonic()
+                backoff.reset()
+                for message in messages:
+                    yield message
+                    if is_stop_message(message):
+                        # The caller asked for the next message, so it has processed the stop message.
+                        await self.commit()
+                        return
+            elif idle_timeout is not None and time.monotonic() - last_activity >= idle_timeout:
+                logger.debug(f"Session {self.session_id} idle for {idle_timeout}s, ending the stream")
+                return
+
+            try:
+                await asyncio.wait_for(self._submitted.wait(), timeout=backoff.next_interval())
+                last_activity = time.monotonic()
+                backoff.reset()
+            except asyncio.TimeoutError:
+                pass
+
     async def delete(self):
         """
         Deletes the current session associated with the current session_id in the ai-engine API.
         """
-        await make_api_request(
-            api_base_url=self._api_base_url,
-            api_key=self._api_key,
+        await self._request(
             method='DELETE',
             endpoint=f"/v1beta1/engine/chat/sessions/{self.session_id}"
         )
+        self._deleted = True
+        for listener in self._delete_listeners:
+            listener(self)
+        if self._session_store is not None:
+            await self._session_store.delete(self.session_id)
 
     async def execute_function(self, function_ids: list[str], objective: str, context: str | None = None):
         await self._submit_message(
@@ -362,9 +658,272 @@ class Session:
         )
 
 class AiEngine:
+    """
+    Client for the ai-engine API.
+
+    All the requests made by the client, and by the sessions it creates, share one pooled keep-alive
+    connection pool. Close it when done, either with `await ai_engine.aclose()` or by using the client as an
+    async context manager:
+
+        async with AiEngine(api_key) as ai_engine:
+            ...
+
+    Supported options:
+        api_base_url (str): The base URL for the API.
+        transport (Union[Transport, str]): How the requests are sent: `aiohttp` (default), `http2` (multiplexes the
+            concurrent requests over few connections, requires `httpx[http2]`) or a `Transport` instance, e.g. a
+            `transport.InMemoryTransport` calling a handler directly. The pool options below configure the first
+            two.
+        record_cassette (Union[str, Path]): Record every request and response to this cassette file, written on
+            `aclose`. Replay it with a `cassette.ReplayTransport`.
+        max_connections (int): Total number of simultaneous connections in the pool (0 means unlimited).
+        max_connections_per_host (int): Simultaneous connections to the same host (0 means unlimited).
+        keepalive_timeout (float): Seconds an idle connection is kept open for reuse.
+        dns_cache_ttl (Optional[int]): Seconds a DNS resolution is cached.
+        request_timeout (Optional[float]): Total timeout, in seconds, for a single request.
+        message_retention (Union[MessageRetention, str]): Raw messages kept by the sessions: `cursor_only`,
+            `ring_buffer` or `full` (default).
+        message_history_size (int): Raw messages kept per session with the `ring_buffer` retention.
+        dedup_window (int): Recent message IDs remembered per session to skip duplicated messages.
+        catalog_cache_ttl (float): Seconds the function group and function catalogs are served from memory.
+            With the default (0) they are revalidated on every call, which costs a small 304 response when the
+            server supports conditional requests and the catalog didn't change.
+        catalog_cache_stale_while_revalidate (float): Extra seconds an expired catalog is still served while it is
+            refreshed in the background.
+        retry_policies (Mapping[Union[EndpointClass, str], RetryPolicy]): Retry policies overriding the defaults
+            (`retry.DEFAULT_RETRY_POLICIES`) for some endpoint classes: `poll`, `submit`, `catalog_read`, `delete`
+            and `write`. Use `retry.NO_RETRY` to disable the retries of a class.
+        max_requests_per_second (Optional[float]): Average requests per second sent by the client and its sessions
+            (token bucket). Unlimited by default.
+        request_burst (Optional[float]): Requests that may be sent at once above `max_requests_per_second`.
+        adaptive_concurrency (Union[bool, dict]): Adapt the number of requests in flight to the server (AIMD): it
+            shrinks on 429/503 responses, connection errors and rising latency and grows back while responses are
+            healthy. `True` uses the defaults, a dict is passed to `AdaptiveConcurrencyLimiter`. Disabled by default.
+        rate_limiter (RateLimiter): A limiter to use instead of the three options above, e.g. to share the same
+            limits between several clients.
+        credit_guard (Union[bool, dict]): Check the account credit and the model tokens, cached locally, before
+            creating and starting sessions, and route sessions to another model when theirs has no tokens left.
+            `True` uses the defaults, a dict is passed to `CreditGuard`. Disabled by default.
+        instrumentation (Union[Instrumentation, Sequence[Instrumentation]]): Hooks notified of every request attempt,
+            retry and message decoded, e.g. an `instrumentation.MetricsCollector`.
+        session_pool (Union[bool, dict]): Keep idle sessions, created in the background, for every
+            `(function_group, model, email)` in use, so that `create_session` returns without any request. `True` uses
+            the defaults, a dict is passed to `SessionPool`. Disabled by default.
+        session_lifecycle (Union[bool, dict]): Track the live sessions: delete the ones idle for too long, and delete
+            the ones left, concurrently, on `aclose`, reporting them as leaks. `True` uses the defaults, a dict is
+            passed to `SessionLifecycleManager` (`idle_timeout`, `shutdown_timeout`...). Disabled by default: the
+            sessions outlive the client, e.g. to be resumed.
+        session_store (SessionStore): Where the sessions save their cursor once they have processed new messages,
+            see `Session.commit` and `resume_session`.
+    """
     def __init__(self, api_key: str, options: Optional[dict] = None):
-        self._api_base_url = options.get('api_base_url') if options and 'api_base_url' in options else default_api_base_url
+        options = options or {}
+        self._api_base_url = options.get('api_base_url') if 'api_base_url' in options else default_api_base_url
         self._api_key = api_key
+        self._transport: Transport = make_transport(
+            options.get('transport'),
+            max_connections=options.get('max_connections', 100),
+            max_connections_per_host=options.get('max_connections_per_host', 0),
+            keepalive_timeout=options.get('keepalive_timeout', 30.0),
+            dns_cache_ttl=options.get('dns_cache_ttl', 300),
+            request_timeout=options.get('request_timeout'),
+        )
+        if options.get('record_cassette'):
+            from .cassette import RecordingTransport
+            self._transport = RecordingTransport(self._transport, options['record_cassette'])
+        self._retry_policies = resolve_retry_policies(options.get('retry_policies'))
+        self._rate_limiter = options.get('rate_limiter') or make_rate_limiter(
+            requests_per_second=options.get('max_requests_per_second'),
+            burst=options.get('request_burst'),
+            adaptive_concurrency=options.get('adaptive_concurrency', False)
+        )
+        self._instrumentation: Optional["Instrumentation"] = None
+        if options.get('instrumentation') is not None:
+            from .instrumentation import make_instrumentation
+            self._instrumentation = make_instrumentation(options['instrumentation'])
+        self._session_store: Optional["SessionStore"] = options.get('session_store')
+        credit_guard = options.get('credit_guard', False)
+        self._credit_guard: Optional["CreditGuard"] = None
+        if credit_guard:
+            from .credit_guard import CreditGuard
+            self._credit_guard = CreditGuard(self, **(credit_guard if isinstance(credit_guard, dict) else {}))
+        session_lifecycle = options.get('session_lifecycle', False)
+        self._session_lifecycle: Optional["SessionLifecycleManager"] = None
+        if session_lifecycle:
+            from .session_lifecycle import SessionLifecycleManager
+            self._session_lifecycle = SessionLifecycleManager(
+                **(session_lifecycle if isinstance(session_lifecycle, dict) else {})
+            )
+        session_pool = options.get('session_pool', False)
+        self._session_pool: Optional["SessionPool"] = None
+        if session_pool:
+            from .session_pool import SessionPool
+            self._session_pool = SessionPool(self, **(session_pool if isinstance(session_pool, dict) else {}))
+        self._catalog_cache = CatalogCache(
+            ttl=options.get('catalog_cache_ttl', 0.0),
+            stale_while_revalidate=options.get('catalog_cache_stale_while_revalidate', 0.0)
+        )
+        self._session_options = {
+            'retention': options.get('message_retention', MessageRetention.FULL),
+            'history_size': options.get('message_history_size', 100),
+            'dedup_window': options.get('dedup_window', 1024),
+        }
+
+    @property
+    def session_pool(self) -> Optional["SessionPool"]:
+        """
+        The pool of idle sessions, with the `session_pool` option, e.g. to `warm` it at startup.
+        """
+        return self._session_pool
+
+    @property
+    def session_lifecycle(self) -> Optional["SessionLifecycleManager"]:
+        """
+        The tracker of the live sessions, with the `session_lifecycle` option.
+        """
+        return self._session_lifecycle
+
+    async def __aenter__(self) -> "AiEngine":
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+
+    async def aclose(self):
+        """
+        Deletes the idle sessions of the session pool (and, with the `session_lifecycle` option, every session left)
+        and closes the connection pool shared by the client and its sessions.
+        """
+        if self._session_pool is not None:
+            await self._session_pool.aclose()
+        if self._session_lifecycle is not None:
+            await self._session_lifecycle.shutdown()
+        if self._credit_guard is not None:
+            await self._credit_guard.aclose()
+        await self._transport.aclose()
+
+    async def _request(self, method: str, endpoint: str, payload: Optional[dict] = None) -> dict:
+        return await make_api_request(
+            api_base_url=self._api_base_url,
+            api_key=self._api_key,
+            method=method,
+            endpoint=endpoint,
+            payload=payload,
+            transport=self._transport,
+            retry_policies=self._retry_policies,
+            rate_limiter=self._rate_limiter,
+            instrumentation=self._instrumentation
+        )
+
+    ####
+    # Catalog cache
+    ####
+    async def _get_catalog(self, endpoint: str, parse: Callable[[Any], List[T]]) -> List[T]:
+        async def fetch(entry: Optional[CatalogCacheEntry]) -> Optional[CatalogCacheEntry]:
+            response = await make_raw_api_request(
+                api_base_url=self._api_base_url,
+                api_key=self._api_key,
+                method='GET',
+                endpoint=endpoint,
+                transport=self._transport,
+                headers=entry.conditional_headers() if entry else None,
+                retry_policies=self._retry_policies,
+                rate_limiter=self._rate_limiter,
+                instrumentation=self._instrumentation
+            )
+            if response.status == 304:
+                return None
+            return CatalogCacheEntry(
+                value=parse(response.json()),
+                etag=response.header('ETag'),
+                last_modified=response.header('Last-Modified')
+            )
+
+        return list(await self._catalog_cache.get(endpoint, fetch))
+
+    def invalidate_catalog_cache(self, *endpoints: str):
+        """
+        Drops the cached catalogs (function groups and functions), forcing them to be fetched again.
+
+        Args:
+            endpoints (str): The catalog endpoints to drop, all of them when none is given.
+        """
+        self._catalog_cache.invalidate(*endpoints)
+
+    ####
+    # Catalog iteration
+    ####
+    async def _iter_catalog(
+            self,
+            endpoint: str,
+            parse: Callable[[Any], T],
+            page_size: int,
+            items_key: Optional[str] = None
+    ) -> AsyncIterator[T]:
+        """
+        Yields the parsed entries of a catalog, page by page.
+
+        Pages are requested with the `limit` and `offset` query parameters. When the response has no pagination
+        metadata (`has_more`, `next` or `total`), the server is assumed to return the whole catalog at once.
+        """
+        if page_size < 1:
+            raise ValueError("page_size must be at least 1")
+        offset = 0
+        first_item = None
+        while True:
+            raw_response = await self._request(
+                method='GET',
+                endpoint=f"{endpoint}?{urlencode({'offset': offset, 'limit': page_size})}"
+            )
+            items, has_more = _read_catalog_page(raw_response, items_key, offset, page_size)
+            if offset and items and items[0] == first_item:
+                # The server ignores the pagination parameters and sent the same page again.
+                return
+            if not offset and items:
+                first_item = items[0]
+            for item in items:
+                yield parse(item)
+            if not has_more or not items:
+                return
+            offset += len(items)
+
+    def iter_public_function_groups(self, page_size: int = 100) -> AsyncIterator[FunctionGroup]:
+        """
+        Iterates over the public function groups as they are fetched, see `iter_functions`.
+        """
+        return self._iter_catalog(PUBLIC_FUNCTION_GROUPS_ENDPOINT, FunctionGroup.model_validate, page_size)
+
+    def iter_private_function_groups(self, page_size: int = 100) -> AsyncIterator[FunctionGroup]:
+        """
+        Iterates over the private function groups as they are fetched, see `iter_functions`.
+        """
+        return self._iter_catalog(PRIVATE_FUNCTION_GROUPS_ENDPOINT, FunctionGroup.model_validate, page_size)
+
+    def iter_functions(self, page_size: int = 100) -> AsyncIterator[Function]:
+        """
+        Iterates over the functions as they are fetched, `page_size` at a time when the server paginates, and
+        validates each entry only when it is reached. Unlike `get_functions` it doesn't use the catalog cache, so
+        large catalogs are processed with bounded memory:
+
+            async for function in ai_engine.iter_functions():
+                ...
+        """
+        return self._iter_catalog(FUNCTIONS_ENDPOINT, Function.model_validate, page_size)
+
+    def iter_functions_by_function_group(
+            self,
+            function_group_id: str,
+            page_size: int = 100
+    ) -> AsyncIterator[FunctionGroupFunctions]:
+        """
+        Iterates over the functions of a function group as they are fetched, see `iter_functions`.
+        """
+        return self._iter_catalog(
+            endpoint=f"/v1beta1/function-groups/{function_group_id}/functions/",
+            parse=lambda function_name: FunctionGroupFunctions.model_validate({"name": function_name}),
+            page_size=page_size,
+            items_key="functions"
+        )
 
     ####
     # Function groups
@@ -378,31 +937,15 @@ class AiEngine:
         return privateGroups + publicGroups
 
     async def get_public_function_groups(self) -> List[FunctionGroup]:
-        raw_response: dict = await make_api_request(
-            api_base_url=self._api_base_url,
-            api_key=self._api_key,
-            method='GET',
-            endpoint="/v1beta1/function-groups/public/"
-        )
-        return list(
-            map(
-                lambda item: FunctionGroup.model_validate(item),
-                raw_response
-            )
+        return await self._get_catalog(
+            endpoint=PUBLIC_FUNCTION_GROUPS_ENDPOINT,
+            parse=lambda raw_response: [FunctionGroup.model_validate(item) for item in raw_response]
         )
 
     async def get_private_function_groups(self) -> List[FunctionGroup]:
-        raw_response: dict = await make_api_request(
-            api_base_url=self._api_base_url,
-            api_key=self._api_key,
-            method='GET',
-            endpoint="/v1beta1/function-groups/"
-        )
-        return list(
-            map(
-                lambda item: FunctionGroup.model_validate(item),
-                raw_response
-            )
+        return await self._get_catalog(
+            endpoint=PRIVATE_FUNCTION_GROUPS_ENDPOINT,
+            parse=lambda raw_response: [FunctionGroup.model_validate(item) for item in raw_response]
         )
 
     async def create_function_group(
@@ -414,41 +957,30 @@ class AiEngine:
             "isPrivate": is_private,
             "name": name
         }
-        raw_response: dict = await make_api_request(
-            api_base_url=self._api_base_url,
-            api_key=self._api_key,
+        raw_response: dict = await self._request(
             method='POST',
             endpoint="/v1beta1/function-groups/",
             payload=payload
         )
         logger.debug(f"Function group created: {raw_response['uuid']}")
+        self.invalidate_catalog_cache(PUBLIC_FUNCTION_GROUPS_ENDPOINT, PRIVATE_FUNCTION_GROUPS_ENDPOINT)
         return FunctionGroup(**raw_response)
 
     async def delete_function_group(self, function_group_id: str):
-        raw_response: dict = await make_api_request(
-            api_base_url=self._api_base_url,
-            api_key=self._api_key,
+        await self._delete_function_group(function_group_id)
+        return await self.get_public_function_groups()
+
+    async def _delete_function_group(self, function_group_id: str) -> dict:
+        raw_response: dict = await self._request(
             method='DELETE',
             endpoint=f"/v1beta1/function-groups/{function_group_id}/",
         )
         logger.debug(f"Function group deleted: {function_group_id}")
-        raw_response: dict = await make_api_request(
-            api_base_url=self._api_base_url,
-            api_key=self._api_key,
-            method='GET',
-            endpoint="/v1beta1/function-groups/public/"
-        )
-        return list(
-            map(
-                lambda item: FunctionGroup.model_validate(item),
-                raw_response
-            )
-        )
+        self.invalidate_catalog_cache(PUBLIC_FUNCTION_GROUPS_ENDPOINT, PRIVATE_FUNCTION_GROUPS_ENDPOINT)
+        return raw_response
 
     async def get_function_group_by_function(self, function_id: str):
-        raw_response: dict = await make_api_request(
-            api_base_url=self._api_base_url,
-            api_key=self._api_key,
+        raw_response: dict = await self._request(
             method='GET',
             endpoint=f"/v1beta1/function/{function_id}/groups"
         )
@@ -462,15 +994,13 @@ class AiEngine:
     # Functions
     ###
     async def get_functions_by_function_group(self, function_group_id: str) -> list[FunctionGroupFunctions]:
-        raw_response: dict = await make_api_request(
-            api_base_url=self._api_base_url,
-            api_key=self._api_key,
+        raw_response: dict = await self._request(
             method='GET',
             endpoint=f"/v1beta1/function-groups/{function_group_id}/functions/"
         )
         result = []
         if "functions" in raw_response:
-            list(
+            result = list(
                 map(
                     lambda function_name: FunctionGroupFunctions.model_validate({"name": function_name}),
                     raw_response["functions"]
@@ -481,45 +1011,26 @@ class AiEngine:
 
 
     async def get_functions(self) -> list[Function]:
-        raw_response: dict = await make_api_request(
-            api_base_url=self._api_base_url,
-            api_key=self._api_key,
-            method='GET',
-            endpoint=f"/v1beta1/functions/"
-        )
-        return list(
-            map(
-                lambda item: Function.parse_obj(item),
-                raw_response
-            )
+        return await self._get_catalog(
+            endpoint=FUNCTIONS_ENDPOINT,
+            parse=lambda raw_response: [Function.model_validate(item) for item in raw_response]
         )
     ####
     # Model
     ####
     async def get_models(self) -> List[Model]:
-        pending_credits = [self.get_model_credits(model_id) for model_id in DefaultModelIds]
-
-        models = [Model(
+        credits = await self.get_model_credits_bulk(DefaultModelIds)
+        return [Model(
             id=model_id,
             name=get_model_name(model_id),
-            credits=0
+            credits=credits[model_id]
         ) for model_id in DefaultModelIds]
 
-        credits = await asyncio.gather(*pending_credits)
-
-        if len(credits) != len(models):
-            raise Exception("Credit count mismatch")
-
-        for i, credit in enumerate(credits):
-            models[i].credits = credit
-
-        return models
-
     ####
     # Credit
     ####
     async def get_credits(self) -> CreditBalance:
-        response = await make_api_request(self._api_base_url, self._api_key, 'GET', "/v1beta1/engine/credit/info")
+        response = await self._request('GET', "/v1beta1/engine/credit/info")
         return CreditBalance(
             totalCredits=response['total_credit'],
             usedCredits=response['used_credit'],
@@ -528,33 +1039,119 @@ class AiEngine:
 
     async def get_model_credits(self, model: Union[KnownModelId, CustomModel]) -> int:
         model_id = get_model_id(model)
-        response = await make_api_request(
-            api_base_url=self._api_base_url,
-            api_key=self._api_key,
+        response = await self._request(
             method='GET',
             endpoint=f"/v1beta1/engine/credit/remaining_tokens?models={model_id}"
         )
         return response['model_tokens'].get(model_id, 0)
 
+    async def get_model_credits_bulk(
+            self,
+            models: Iterable[Union[KnownModelId, CustomModel]],
+            chunk_size: int = MAX_MODELS_PER_CREDIT_REQUEST
+    ) -> Dict[str, int]:
+        """
+        Returns the remaining tokens of many models, keyed by model id, in one request per `chunk_size` models.
+
+        A chunk rejected because of its URL length (414 or 431) is split in two and retried.
+        """
+        model_ids = list(dict.fromkeys(get_model_id(model) for model in models))
+        chunks = [model_ids[i:i + chunk_size] for i in range(0, len(model_ids), chunk_size)]
+        model_tokens: Dict[str, int] = {}
+        for chunk_tokens in await asyncio.gather(*(self._get_model_tokens(chunk) for chunk in chunks)):
+            model_tokens.update(chunk_tokens)
+        return {model_id: model_tokens.get(model_id, 0) for model_id in model_ids}
+
+    async def _get_model_tokens(self, model_ids: List[str]) -> Dict[str, int]:
+        # The endpoint takes a single `models` parameter with comma-separated ids, not a repeated one.
+        query = urlencode({'models': ','.join(model_ids)}, safe=',')
+        try:
+            response = await self._request('GET', f"/v1beta1/engine/credit/remaining_tokens?{query}")
+        except ApiClientError as error:
+            if error.status not in (414, 431) or len(model_ids) == 1:
+                raise
+            half = len(model_ids) // 2
+            first, second = await asyncio.gather(
+                self._get_model_tokens(model_ids[:half]),
+                self._get_model_tokens(model_ids[half:])
+            )
+            return {**first, **second}
+        return response['model_tokens']
+
     ####
     # Session
     ####
     async def create_session(self, function_group: str, opts: Optional[dict] = None) -> Session:
+        if self._session_pool is not None:
+            return await self._session_pool.acquire(function_group, opts)
+        return await self._create_session(function_group, opts)
+
+    async def _create_session(self, function_group: str, opts: Optional[dict] = None, charge: bool = True) -> Session:
+        """
+        Creates a session. With `charge=False` (pre-warmed sessions) the credit guard checks the credit and picks the
+        model without deducting the estimated cost, charged when the session is handed out.
+        """
+        requested_model = opts.get('model') if opts and 'model' in opts else None
+        if self._credit_guard is not None:
+            requested_model = await self._credit_guard.admit(requested_model, charge=charge)
         request_payload = ApiNewSessionRequest(
             email=opts.get('email') if opts else "",
             functionGroup=function_group,
             preferencesEnabled=False,
-            requestedModel=opts.get('model') if opts and 'model' in opts else DefaultModelId
+            requestedModel=requested_model if requested_model is not None else DefaultModelId
         )
-        response = await make_api_request(
-            api_base_url=self._api_base_url,
-            api_key=self._api_key,
+        response = await self._request(
             method='POST',
             endpoint="/v1beta1/engine/chat/sessions",
             payload=request_payload.model_dump()
         )
 
-        return Session(self._api_base_url, self._api_key, response['session_id'], function_group)
+        session = self._make_session(response['session_id'], function_group)
+        session._model = request_payload.requestedModel
+        if self._session_store is not None:
+            await self._session_store.save(session.snapshot())
+        return session
+
+    async def resume_session(self, snapshot: Union["SessionSnapshot", str]) -> Session:
+        """
+        Recreates a session from a snapshot, e.g. after a restart. Its next `get_messages` only fetches the messages
+        received after the last one processed before the snapshot.
+
+        Args:
+            snapshot (Union[SessionSnapshot, str]): The snapshot, or the id of a session saved in the `session_store`.
+
+        Raises:
+            KeyError: when given a session id that isn't in the session store.
+        """
+        if isinstance(snapshot, str):
+            session_id = snapshot
+            snapshot = await self._session_store.load(session_id) if self._session_store is not None else None
+            if snapshot is None:
+                raise KeyError(f"No snapshot of session {session_id} in the session store")
+        session = self._make_session(snapshot.session_id, snapshot.function_group)
+        if snapshot.last_message_id is not None:
+            session._last_message_id = snapshot.last_message_id
+            session._committed_message_id = snapshot.last_message_id
+            session._message_ids.add(snapshot.last_message_id)
+        return session
+
+    def _make_session(self, session_id: str, function_group: str) -> Session:
+        session = Session(
+            self._api_base_url,
+            self._api_key,
+            session_id,
+            function_group,
+            transport=self._transport,
+            retry_policies=self._retry_policies,
+            rate_limiter=self._rate_limiter,
+            credit_guard=self._credit_guard,
+            instrumentation=self._instrumentation,
+            session_store=self._session_store,
+            **self._session_options
+        )
+        if self._session_lifecycle is not None:
+            self._session_lifecycle.track(session)
+        return session
 
     ####
     # Permissions
@@ -569,12 +1166,98 @@ class AiEngine:
             "user_email_to_add_permission": target_user_email,
             "action": "RETRIEVE"
         }
-        raw_response: dict = await make_api_request(
-            api_base_url=self._api_base_url,
-            api_key=self._api_key,
+        raw_response: dict = await self._request(
             method='PUT',
             endpoint=f"/v1beta1/function-groups/{function_group_id}/permissions/",
             payload=payload
         )
         logger.debug(f"FG successfully shared: {function_group_id} with {target_user_email}")
-        return raw_response
\ No newline at end of file
+        self.invalidate_catalog_cache(PUBLIC_FUNCTION_GROUPS_ENDPOINT, PRIVATE_FUNCTION_GROUPS_ENDPOINT)
+        return raw_response
+
+    ####
+    # Bulk
+    ####
+    def create_function_groups(
+            self,
+            names: Iterable[str],
+            is_private: bool = True,
+            concurrency: int = 16
+    ) -> "BulkOperation[str, FunctionGroup]":
+        """
+        Creates many function groups concurrently.
+
+        Returns a `BulkOperation`: iterate over it to get the results as they finish, or await it for a `BulkReport`.
+        """
+        from .bulk import BulkOperation
+        return BulkOperation(
+            items=names,
+            operation=lambda name: self.create_function_group(is_private=is_private, name=name),
+            concurrency=concurrency
+        )
+
+    def share_function_groups(
+            self,
+            function_group_ids: Iterable[str],
+            target_user_emails: Iterable[str],
+            concurrency: int = 16
+    ) -> "BulkOperation[Tuple[str, str], dict]":
+        """
+        Shares every function group with every user, concurrently. Items are `(function_group_id, email)` pairs.
+        """
+        from .bulk import BulkOperation
+        target_user_emails = list(target_user_emails)
+        return BulkOperation(
+            items=[(group_id, email) for group_id in function_group_ids for email in target_user_emails],
+            operation=lambda pair: self.share_function_group(function_group_id=pair[0], target_user_email=pair[1]),
+            concurrency=concurrency
+        )
+
+    def delete_function_groups(
+            self,
+            function_group_ids: Iterable[str],
+            concurrency: int = 16
+    ) -> "BulkOperation[str, dict]":
+        """
+        Deletes many function groups concurrently. Unlike `delete_function_group`, it doesn't fetch the public groups
+        after every deletion.
+        """
+        from .bulk import BulkOperation
+        return BulkOperation(
+            items=function_group_ids,
+            operation=self._delete_function_group,
+            concurrency=concurrency
+        )
+
+    def execute_functions(
+            self,
+            function_group: str,
+            jobs: Iterable["ExecutionJob"],
+            concurrency: int = 16,
+            timeout: Optional[float] = 120.0,
+            deadline: Optional[float] = None,
+            respond: Optional["MessageResponder"] = None,
+            multiplexer_options: Optional[dict] = None
+    ) -> "FanOutExecution":
+        """
+        Runs many `Session.execute_function` calls concurrently, each in a session of its own, e.g. the same objective
+        against dozens of functions:
+
+            jobs = [ExecutionJob(function_ids=[function.uuid], objective=objective) for function in functions]
+            async for item_result in ai_engine.execute_functions(function_group, jobs, concurrency=8, timeout=60):
+                print(item_result.item.function_ids, item_result.ok)
+
+        Returns a `FanOutExecution`: iterate over it to get the results as the sessions stop, or await it for a
+        `BulkReport`. Every session it creates is deleted once its job is over.
+        """
+        from .fan_out import FanOutExecution
+        return FanOutExecution(
+            self,
+            function_group,
+            jobs,
+            concurrency=concurrency,
+            timeout=timeout,
+            deadline=deadline,
+            respond=respond,
+            multiplexer_options=multiplexer_options
+        )
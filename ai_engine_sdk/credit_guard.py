@@ -0,0 +1,181 @@
+import asyncio
+import logging
+import time
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Union
+
+from .errors import InsufficientCreditsError
+from .llm_models import CustomModel, DefaultModelId, DefaultModelIds, KnownModelId, get_model_id
+
+if TYPE_CHECKING:
+    from .client import AiEngine
+
+logger = logging.getLogger(__name__)
+
+
+class CreditGuard:
+    """
+    Locally cached view of the account credit and of the remaining tokens of the models, used to reject (or route to
+    another model) the sessions that would fail for lack of credit before sending anything.
+
+    The view is fetched on first use, refreshed in the background every `refresh_interval` seconds, and decremented
+    optimistically by the estimated cost of every admitted session so that a burst of sessions doesn't overdraw
+    it between two refreshes. Every refresh replaces the estimates with the figures of the server.
+    """
+    def __init__(
+            self,
+            ai_engine: "AiEngine",
+            models: Optional[Iterable[Union[KnownModelId, CustomModel]]] = None,
+            refresh_interval: float = 60.0,
+            min_credits: int = 1,
+            min_model_tokens: int = 1,
+            estimated_session_credits: int = 1,
+            estimated_session_tokens: int = 1,
+            route_models: bool = True
+    ):
+        """
+        Args:
+            ai_engine (AiEngine): The client used to fetch the credit.
+            models (Optional[Iterable[Union[KnownModelId, CustomModel]]]): Models tracked, and candidates when routing,
+                in order of preference. Defaults to `llm_models.DefaultModelIds` with `DefaultModelId` first.
+            refresh_interval (float): Seconds between two background refreshes.
+            min_credits (int): Account credit needed to admit a session.
+            min_model_tokens (int): Remaining tokens a model needs to be used.
+            estimated_session_credits (int): Credit optimistically deducted for every admitted session.
+            estimated_session_tokens (int): Model tokens optimistically deducted for every admitted session.
+            route_models (bool): Whether a session whose model has no tokens left goes to another tracked model
+                instead of being rejected.
+        """
+        if models is None:
+            models = [DefaultModelId, *(model_id for model_id in DefaultModelIds if model_id != DefaultModelId)]
+        self._ai_engine = ai_engine
+        self.models: List[str] = list(dict.fromkeys(get_model_id(model) for model in models))
+        self.refresh_interval = refresh_interval
+        self.min_credits = min_credits
+        self.min_model_tokens = min_model_tokens
+        self.estimated_session_credits = estimated_session_credits
+        self.estimated_session_tokens = estimated_session_tokens
+        self.route_models = route_models
+
+        self._available_credits: Optional[int] = None
+        self._model_tokens: Dict[str, int] = {}
+        self._refreshed_at: Optional[float] = None
+        self._refreshing: Optional[asyncio.Future] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    @property
+    def available_credits(self) -> Optional[int]:
+        """
+        The account credit, as last fetched minus the estimated cost of the sessions admitted since. None until fetched.
+        """
+        return self._available_credits
+
+    def model_tokens(self, model: Union[KnownModelId, CustomModel]) -> Optional[int]:
+        return self._model_tokens.get(get_model_id(model))
+
+    @property
+    def age(self) -> Optional[float]:
+        return time.monotonic() - self._refreshed_at if self._refreshed_at is not None else None
+
+    ####
+    # Refresh
+    ####
+    async def refresh(self):
+        """
+        Fetches the account credit and the tokens of every tracked model (two requests). Concurrent calls share them.
+        """
+        if self._refreshing is None:
+            self._refreshing = asyncio.ensure_future(self._fetch())
+        refreshing = self._refreshing
+        try:
+            await asyncio.shield(refreshing)
+        finally:
+            if self._refreshing is refreshing and refreshing.done():
+                self._refreshing = None
+
+    async def _fetch(self):
+        balance, model_tokens = await asyncio.gather(
+            self._ai_engine.get_credits(),
+            self._ai_engine.get_model_credits_bulk(self.models)
+        )
+        self._available_credits = balance.availableCredits
+        self._model_tokens = model_tokens
+        self._refreshed_at = time.monotonic()
+        logger.debug(f"Credit refreshed: {self._available_credits} credits, model tokens {self._model_tokens}")
+
+    def start(self):
+        """
+        Starts the background refresh. Called on first admission, needs a running event loop.
+        """
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.ensure_future(self._refresh_periodically())
+
+    async def aclose(self):
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            await asyncio.gather(self._refresh_task, return_exceptions=True)
+            self._refresh_task = None
+
+    async def _refresh_periodically(self):
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except Exception as error:
+                # Keep serving the last known figures, the next refresh may succeed.
+                logger.warning(f"Background credit refresh failed: {error}")
+
+    ####
+    # Admission
+    ####
+    async def ensure_credits(self):
+        """
+        Raises `InsufficientCreditsError` if the account has no credit left.
+        """
+        if self._refreshed_at is None:
+            await self.refresh()
+            self.start()
+        if self._available_credits < self.min_credits:
+            raise InsufficientCreditsError(
+                f"Not enough credit: {self._available_credits} available, {self.min_credits} needed"
+            )
+
+    async def admit(self, model: Optional[Union[KnownModelId, CustomModel]] = None, charge: bool = True) -> str:
+        """
+        Checks there is credit for a new session and returns the id of the model it should use: `model` if it has
+        tokens left, otherwise (or when no model is requested) the first tracked model that does, if routing is
+        enabled. Deducts the estimated cost of the session, unless `charge` is False (see `charge`).
+
+        Raises:
+            InsufficientCreditsError: when the account, or every candidate model, has no credit left.
+        """
+        await self.ensure_credits()
+
+        requested_model_id = get_model_id(model) if model is not None else None
+        candidates = [requested_model_id] if requested_model_id is not None else []
+        if self.route_models or requested_model_id is None:
+            candidates += [model_id for model_id in self.models if model_id != requested_model_id]
+
+        for model_id in candidates:
+            # Untracked models (custom ones...) are let through, the server is the judge.
+            tokens = self._model_tokens.get(model_id)
+            if tokens is None and model_id == requested_model_id and model_id not in self.models:
+                return self.charge(model_id) if charge else model_id
+            if tokens is not None and tokens >= self.min_model_tokens:
+                if model_id != requested_model_id and requested_model_id is not None:
+                    logger.info(f"Model {requested_model_id} has no tokens left, routing the session to {model_id}")
+                return self.charge(model_id) if charge else model_id
+
+        raise InsufficientCreditsError(
+            f"No tokens left for model {requested_model_id}" if requested_model_id is not None and not self.route_models
+            else "No tokens left for any model"
+        )
+
+    def charge(self, model_id: str) -> str:
+        """
+        Deducts the estimated cost of a session of `model_id`, e.g. when a pre-warmed session admitted without being
+        charged is handed out.
+        """
+        self._available_credits -= self.estimated_session_credits
+        if model_id in self._model_tokens:
+            self._model_tokens[model_id] -= self.estimated_session_tokens
+        return model_id
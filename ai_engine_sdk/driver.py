@@ -0,0 +1,181 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, Type
+
+from .api_models.agents_json_messages import ConfirmationMessage, DataRequestMessage, TaskSelectionMessage
+from .api_models.api_message import AgentMessage, AiEngineMessage, ApiBaseMessage, StopMessage
+from .client import Session
+
+logger = logging.getLogger(__name__)
+
+MessageHandler = Callable[[Session, ApiBaseMessage], Awaitable[None]]
+ErrorHandler = Callable[[Session, ApiBaseMessage, Exception], Awaitable[None]]
+
+# Checked in order: the first matching class picks the handler.
+_HANDLED_MESSAGE_CLASSES: Tuple[Type[ApiBaseMessage], ...] = (
+    TaskSelectionMessage,
+    ConfirmationMessage,
+    DataRequestMessage,
+    AgentMessage,
+    AiEngineMessage,
+    StopMessage,
+)
+
+_END_OF_STREAM = None
+
+
+class ConversationDriver:
+    """
+    Drives conversations by dispatching their messages to async handlers registered by the application:
+
+        driver = ConversationDriver(handler_timeout=60)
+
+        @driver.on_task_selection
+        async def select_task(session: Session, message: TaskSelectionMessage):
+            await session.submit_task_selection(message, [message.options["0"]])
+
+        await driver.run(session)
+
+    Every session is polled by its own task while its handlers run, so a slow handler never delays polling nor the
+    other conversations. The messages of a session are handled one at a time, in the order they were received.
+    A handler taking more than `handler_timeout` seconds is cancelled; failures and timeouts go to the `on_error`
+    handler (logged by default) and the conversation goes on with the next message.
+    """
+    def __init__(
+            self,
+            handler_timeout: Optional[float] = 30.0,
+            max_pending_messages: int = 100,
+            stream_options: Optional[dict] = None
+    ):
+        """
+        Args:
+            handler_timeout (Optional[float]): Seconds a handler may run. None for no limit.
+            max_pending_messages (int): Messages received and not yet handled, per session, before polling pauses.
+            stream_options (Optional[dict]): Arguments of `Session.stream` (`min_interval`, `idle_timeout`...).
+        """
+        self.handler_timeout = handler_timeout
+        self.max_pending_messages = max_pending_messages
+        self.stream_options = stream_options or {}
+        self._handlers: Dict[Type[ApiBaseMessage], MessageHandler] = {}
+        self._error_handler: Optional[ErrorHandler] = None
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    ####
+    # Handlers
+    ####
+    def _register(self, message_class: Type[ApiBaseMessage], handler: MessageHandler) -> MessageHandler:
+        self._handlers[message_class] = handler
+        return handler
+
+    def on_task_selection(self, handler: MessageHandler) -> MessageHandler:
+        return self._register(TaskSelectionMessage, handler)
+
+    def on_confirmation(self, handler: MessageHandler) -> MessageHandler:
+        return self._register(ConfirmationMessage, handler)
+
+    def on_data_request(self, handler: MessageHandler) -> MessageHandler:
+        return self._register(DataRequestMessage, handler)
+
+    def on_agent_message(self, handler: MessageHandler) -> MessageHandler:
+        return self._register(AgentMessage, handler)
+
+    def on_ai_engine_message(self, handler: MessageHandler) -> MessageHandler:
+        return self._register(AiEngineMessage, handler)
+
+    def on_stop(self, handler: MessageHandler) -> MessageHandler:
+        return self._register(StopMessage, handler)
+
+    def on_error(self, handler: ErrorHandler) -> ErrorHandler:
+        """
+        Registers the handler called when a message handler fails or times out.
+        """
+        self._error_handler = handler
+        return handler
+
+    def get_handler(self, message: ApiBaseMessage) -> Optional[MessageHandler]:
+        for message_class in _HANDLED_MESSAGE_CLASSES:
+            if isinstance(message, message_class):
+                return self._handlers.get(message_class)
+        return None
+
+    ####
+    # Running
+    ####
+    async def run(self, session: Session):
+        """
+        Drives a session until it stops (or its stream times out), handling every message.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_pending_messages)
+        poller = asyncio.ensure_future(self._poll(session, queue))
+        try:
+            while (message := await queue.get()) is not _END_OF_STREAM:
+                await self._dispatch(session, message)
+        except BaseException:
+            poller.cancel()
+            raise
+        finally:
+            # At the end of the stream, the poller is done or finishing: wait for it to keep its error.
+            await asyncio.gather(poller, return_exceptions=True)
+        # Surface polling failures (the API being down...) to the caller.
+        if not poller.cancelled() and poller.exception() is not None:
+            raise poller.exception()
+
+    async def _poll(self, session: Session, queue: asyncio.Queue):
+        try:
+            async for message in session.stream(**self.stream_options):
+                await queue.put(message)
+        except asyncio.CancelledError:
+            # `run` is leaving: nobody reads the end of the stream.
+            raise
+        except BaseException:
+            # Wake up the dispatcher even when polling failed. It drains the queue until the end of the stream.
+            await queue.put(_END_OF_STREAM)
+            raise
+        await queue.put(_END_OF_STREAM)
+
+    async def _dispatch(self, session: Session, message: ApiBaseMessage):
+        handler = self.get_handler(message)
+        if handler is None:
+            logger.debug(f"No handler for {type(message).__name__} in session {session.session_id}")
+            return
+        try:
+            await asyncio.wait_for(handler(session, message), self.handler_timeout)
+        except Exception as error:
+            if isinstance(error, asyncio.TimeoutError):
+                logger.warning(
+                    f"Handler of {type(message).__name__} timed out after {self.handler_timeout}s "
+                    f"in session {session.session_id}"
+                )
+            if self._error_handler is not None:
+                try:
+                    await self._error_handler(session, message, error)
+                except Exception as error_handler_error:
+                    logger.exception(f"Error handler failed: {error_handler_error}")
+            elif not isinstance(error, asyncio.TimeoutError):
+                logger.exception(f"Handler of {type(message).__name__} failed in session {session.session_id}")
+
+    def drive(self, session: Session) -> asyncio.Task:
+        """
+        Starts driving a session in the background and returns its task.
+        """
+        task = asyncio.ensure_future(self.run(session))
+        self._tasks[session.session_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(session.session_id, None))
+        return task
+
+    async def run_all(self, sessions: Iterable[Session]) -> List[Optional[BaseException]]:
+        """
+        Drives many sessions concurrently until they all stop. Returns, per session, the exception that ended it
+        (None when it ended normally).
+        """
+        results = await asyncio.gather(*(self.drive(session) for session in sessions), return_exceptions=True)
+        return [result if isinstance(result, BaseException) else None for result in results]
+
+    async def aclose(self):
+        """
+        Stops driving every session started with `drive`.
+        """
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,123 @@
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Mapping, Optional
+
+
+class AiEngineError(Exception):
+    """
+    Base class of the errors raised by the SDK.
+    """
+
+
+class ApiConnectionError(AiEngineError):
+    """
+    The request could not be completed: connection refused or reset, DNS failure, timeout...
+    """
+
+
+class ApiError(AiEngineError):
+    """
+    The API answered with a non-2xx status.
+
+    Attributes:
+        status (int): The HTTP status code.
+        method (str): The HTTP method of the request.
+        endpoint (str): The endpoint of the request.
+        body (bytes): The raw response body.
+        headers (Mapping[str, str]): The response headers.
+    """
+    def __init__(
+            self,
+            status: int,
+            method: str,
+            endpoint: str,
+            body: bytes = b"",
+            headers: Optional[Mapping[str, str]] = None
+    ):
+        super().__init__(f"Request failed with status {status} to {method}: {endpoint}")
+        self.status = status
+        self.method = method
+        self.endpoint = endpoint
+        self.body = body
+        self.headers = dict(headers or {})
+
+    @property
+    def text(self) -> str:
+        return self.body.decode(errors="replace")
+
+    @property
+    def retry_after(self) -> Optional[float]:
+        """
+        Seconds to wait before retrying, from the `Retry-After` header (seconds or HTTP date), if any.
+        """
+        value = next((v for k, v in self.headers.items() if k.lower() == "retry-after"), None)
+        if value is None:
+            return None
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class ApiClientError(ApiError):
+    """
+    4xx status: the request itself is wrong and retrying it won't help (except for 408, 425 and 429).
+    """
+
+
+class AuthenticationError(ApiClientError):
+    """
+    401 or 403 status: invalid or insufficient API key.
+    """
+
+
+class NotFoundError(ApiClientError):
+    """
+    404 status.
+    """
+
+
+class RateLimitedError(ApiClientError):
+    """
+    429 status: too many requests, see `retry_after`.
+    """
+
+
+class ApiServerError(ApiError):
+    """
+    5xx status.
+    """
+
+
+class InsufficientCreditsError(AiEngineError):
+    """
+    Raised before sending a request when the cached credit shows it would fail: the account, or the requested model,
+    has no credit left. See `credit_guard.CreditGuard`.
+    """
+
+
+def api_error_from_response(
+        status: int,
+        method: str,
+        endpoint: str,
+        body: bytes = b"",
+        headers: Optional[Mapping[str, str]] = None
+) -> ApiError:
+    if status in (401, 403):
+        error_class = AuthenticationError
+    elif status == 404:
+        error_class = NotFoundError
+    elif status == 429:
+        error_class = RateLimitedError
+    elif 400 <= status < 500:
+        error_class = ApiClientError
+    elif status >= 500:
+        error_class = ApiServerError
+    else:
+        error_class = ApiError
+    return error_class(status=status, method=method, endpoint=endpoint, body=body, headers=headers)
@@ -0,0 +1,154 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, AsyncIterator, Awaitable, Callable, Generator, Iterable, List, Optional
+
+from .api_models.api_message import ApiBaseMessage, is_stop_message
+from .bulk import BulkItemResult, BulkOperation, BulkReport
+from .multiplexer import SessionMultiplexer
+
+if TYPE_CHECKING:
+    from .client import AiEngine, Session
+
+logger = logging.getLogger(__name__)
+
+MessageResponder = Callable[["Session", ApiBaseMessage], Awaitable[None]]
+
+
+@dataclass
+class ExecutionJob:
+    """
+    One `Session.execute_function` call of a fan-out, run in its own session.
+
+    Attributes:
+        function_ids (List[str]): The functions to execute.
+        objective (str): The objective given to the functions.
+        context (Optional[str]): Additional context, if any.
+        opts (Optional[dict]): Options of the session (`email`, `model`...), see `AiEngine.create_session`.
+    """
+    function_ids: List[str]
+    objective: str
+    context: Optional[str] = None
+    opts: Optional[dict] = None
+
+
+@dataclass
+class ExecutionResult:
+    """
+    What the session of a job received.
+
+    Attributes:
+        session_id (str): The session the job ran in (deleted since).
+        messages (List[ApiBaseMessage]): Every message received, in order.
+        stopped (bool): Whether the session ended with a `StopMessage`, rather than going idle.
+    """
+    session_id: str
+    messages: List[ApiBaseMessage] = field(default_factory=list)
+    stopped: bool = False
+
+
+class FanOutExecution:
+    """
+    Runs many `ExecutionJob`s concurrently, each in a session of its own, see `AiEngine.execute_functions`.
+
+    It behaves like a `BulkOperation`: iterate over it to get every job result as soon as its session stops, or await
+    it for the full `BulkReport`. The sessions are polled by a shared `SessionMultiplexer`, and always deleted once
+    their job is done, failed, timed out or was cancelled (by leaving the iteration early).
+    """
+    def __init__(
+            self,
+            ai_engine: "AiEngine",
+            function_group: str,
+            jobs: Iterable[ExecutionJob],
+            concurrency: int = 16,
+            timeout: Optional[float] = 120.0,
+            deadline: Optional[float] = None,
+            respond: Optional[MessageResponder] = None,
+            multiplexer_options: Optional[dict] = None
+    ):
+        """
+        Args:
+            ai_engine (AiEngine): The client creating the sessions.
+            function_group (str): The function group of the sessions.
+            jobs (Iterable[ExecutionJob]): The executions to run.
+            concurrency (int): Jobs (hence sessions) running at once.
+            timeout (Optional[float]): Seconds a job may run, from the creation of its session to its `StopMessage`.
+            deadline (Optional[float]): Seconds the whole fan-out may run. The jobs still running then are cancelled
+                and the ones not started yet fail right away, with `TimeoutError`.
+            respond (Optional[MessageResponder]): Called with every message received, e.g. to answer confirmations.
+            multiplexer_options (Optional[dict]): Arguments of the `SessionMultiplexer` polling the sessions.
+        """
+        self._ai_engine = ai_engine
+        self._function_group = function_group
+        self._timeout = timeout
+        self._deadline = deadline
+        self._deadline_at: Optional[float] = None
+        self._respond = respond
+        self._multiplexer = SessionMultiplexer(**{'max_concurrency': concurrency, **(multiplexer_options or {})})
+        self._operation: BulkOperation[ExecutionJob, ExecutionResult] = BulkOperation(
+            jobs, self._execute, concurrency
+        )
+        self.report: BulkReport[ExecutionJob, ExecutionResult] = self._operation.report
+
+    def __len__(self) -> int:
+        return len(self._operation)
+
+    async def __aiter__(self) -> AsyncIterator[BulkItemResult[ExecutionJob, ExecutionResult]]:
+        if self._deadline is not None:
+            self._deadline_at = time.monotonic() + self._deadline
+        self._multiplexer.start()
+        try:
+            async for item_result in self._operation:
+                yield item_result
+        finally:
+            await self._multiplexer.aclose()
+
+    async def run(self) -> BulkReport[ExecutionJob, ExecutionResult]:
+        async for _ in self:
+            pass
+        return self.report
+
+    def __await__(self) -> Generator[Any, None, BulkReport[ExecutionJob, ExecutionResult]]:
+        return self.run().__await__()
+
+    async def _execute(self, job: ExecutionJob) -> ExecutionResult:
+        timeout = self._timeout
+        if self._deadline_at is not None:
+            remaining = self._deadline_at - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError("The fan-out deadline passed before the job started")
+            timeout = remaining if timeout is None else min(timeout, remaining)
+
+        # Created apart from the job and shielded from its timeout: when the job is cancelled or times out while the
+        # session is being created, the server may create it all the same, and it must be deleted once it exists.
+        creation: Optional[asyncio.Task] = None
+
+        async def run_job() -> ExecutionResult:
+            nonlocal creation
+            creation = asyncio.ensure_future(self._ai_engine.create_session(self._function_group, job.opts))
+            session = await asyncio.shield(creation)
+            self._multiplexer.register(session)
+            await session.execute_function(job.function_ids, job.objective, job.context)
+            result = ExecutionResult(session_id=session.session_id)
+            async for message in self._multiplexer.messages(session.session_id):
+                result.messages.append(message)
+                if self._respond is not None:
+                    await self._respond(session, message)
+            result.stopped = bool(result.messages) and is_stop_message(result.messages[-1])
+            return result
+
+        try:
+            return await asyncio.wait_for(run_job(), timeout)
+        finally:
+            if creation is not None:
+                await asyncio.wait([creation])
+                if not creation.cancelled() and creation.exception() is None:
+                    await self._delete(creation.result())
+
+    async def _delete(self, session: "Session"):
+        self._multiplexer.discard(session.session_id)
+        try:
+            await session.delete()
+        except Exception as error:
+            logger.warning(f"Could not delete the fan-out session {session.session_id}: {error}")
@@ -0,0 +1,335 @@
+import bisect
+import logging
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+_ENDPOINT_ID_SEGMENTS = re.compile(r"/(sessions|function-groups|function)/(?!public/)([^/]+)")
+_ENDPOINT_ID_NAMES = {
+    "sessions": "{session_id}",
+    "function-groups": "{function_group_id}",
+    "function": "{function_id}",
+}
+
+
+def endpoint_template(endpoint: str) -> str:
+    """
+    Returns the endpoint without its query string and with its ids replaced by placeholders, e.g.
+    `/v1beta1/engine/chat/sessions/{session_id}/new-messages`, so that metrics are aggregated per kind of request.
+    """
+    path = endpoint.split("?", 1)[0]
+    return _ENDPOINT_ID_SEGMENTS.sub(lambda match: f"/{match[1]}/{_ENDPOINT_ID_NAMES[match[1]]}", path)
+
+
+@dataclass(frozen=True)
+class RequestStartEvent:
+    """
+    An attempt of a request is about to be sent.
+
+    Attributes:
+        method (str): The HTTP method.
+        endpoint (str): The endpoint, with its ids and query string.
+        template (str): The endpoint template, see `endpoint_template`.
+        attempt (int): 1 for the first attempt, 2 for the first retry...
+        bytes_out (int): Size of the request body.
+    """
+    method: str
+    endpoint: str
+    template: str
+    attempt: int
+    bytes_out: int
+
+
+@dataclass(frozen=True)
+class RequestEndEvent:
+    """
+    An attempt of a request finished.
+
+    Attributes:
+        method (str): The HTTP method.
+        endpoint (str): The endpoint, with its ids and query string.
+        template (str): The endpoint template, see `endpoint_template`.
+        attempt (int): 1 for the first attempt, 2 for the first retry...
+        duration (float): Seconds between the start of the attempt and the response (or the failure).
+        status (Optional[int]): The response status, None when there was no response.
+        bytes_out (int): Size of the request body.
+        bytes_in (int): Size of the response body.
+        error (Optional[Exception]): The error raised for this attempt, if any.
+    """
+    method: str
+    endpoint: str
+    template: str
+    attempt: int
+    duration: float
+    status: Optional[int]
+    bytes_out: int
+    bytes_in: int
+    error: Optional[Exception] = None
+
+
+@dataclass(frozen=True)
+class RetryEvent:
+    """
+    A failed attempt is going to be retried after `delay` seconds.
+    """
+    method: str
+    endpoint: str
+    template: str
+    attempt: int
+    delay: float
+    error: Exception
+
+
+@dataclass(frozen=True)
+class MessageParsedEvent:
+    """
+    A message received from the API was decoded.
+
+    Attributes:
+        session_id (str): The session the message belongs to.
+        message_type (str): The name of the decoded class (`TaskSelectionMessage`...), `unknown` if it wasn't decoded.
+        duration (float): Seconds spent decoding it.
+    """
+    session_id: str
+    message_type: str
+    duration: float
+
+
+class Instrumentation:
+    """
+    Hooks called by the client around every request attempt and message decoded. Every hook does nothing by default,
+    override the ones you need. Hooks run inline, keep them fast.
+    """
+    def on_request_start(self, event: RequestStartEvent):
+        pass
+
+    def on_request_end(self, event: RequestEndEvent):
+        pass
+
+    def on_retry(self, event: RetryEvent):
+        pass
+
+    def on_message_parsed(self, event: MessageParsedEvent):
+        pass
+
+
+class CompositeInstrumentation(Instrumentation):
+    """
+    Calls several instrumentations in turn. A failing hook is logged and doesn't affect the request.
+    """
+    def __init__(self, instrumentations: Iterable[Instrumentation]):
+        self.instrumentations: List[Instrumentation] = list(instrumentations)
+
+    def _call(self, hook: str, event: Any):
+        for instrumentation in self.instrumentations:
+            try:
+                getattr(instrumentation, hook)(event)
+            except Exception as error:
+                logger.warning(f"Instrumentation hook {type(instrumentation).__name__}.{hook} failed: {error!r}")
+
+    def on_request_start(self, event: RequestStartEvent):
+        self._call("on_request_start", event)
+
+    def on_request_end(self, event: RequestEndEvent):
+        self._call("on_request_end", event)
+
+    def on_retry(self, event: RetryEvent):
+        self._call("on_retry", event)
+
+    def on_message_parsed(self, event: MessageParsedEvent):
+        self._call("on_message_parsed", event)
+
+
+def make_instrumentation(
+        instrumentation: Union[None, Instrumentation, Sequence[Instrumentation]]
+) -> Optional[CompositeInstrumentation]:
+    """
+    Wraps the `instrumentation` option of `AiEngine`, or returns None when there is none.
+    """
+    if instrumentation is None:
+        return None
+    if isinstance(instrumentation, Instrumentation):
+        instrumentation = [instrumentation]
+    return CompositeInstrumentation(instrumentation) if instrumentation else None
+
+
+####
+# Metrics
+####
+DEFAULT_LATENCY_BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """
+    Cumulative histogram with fixed bucket upper bounds, as exported to Prometheus.
+    """
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        self.buckets: Tuple[float, ...] = tuple(sorted(buckets))
+        self.bucket_counts: List[int] = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            self.bucket_counts[index] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative_counts(self) -> List[int]:
+        counts, total = [], 0
+        for count in self.bucket_counts:
+            total += count
+            counts.append(total)
+        return counts
+
+
+RequestKey = Tuple[str, str]  # (method, endpoint template)
+
+
+class MetricsCollector(Instrumentation):
+    """
+    Built-in instrumentation aggregating, per method and endpoint template: a latency histogram, the responses per
+    status (`error` when there was no response), the retries and the bytes sent and received; and the messages
+    decoded per type.
+
+        metrics = MetricsCollector()
+        ai_engine = AiEngine(api_key, options={"instrumentation": metrics})
+        ...
+        print(metrics.to_prometheus())
+    """
+    def __init__(self, latency_buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS, namespace: str = "ai_engine_sdk"):
+        self.latency_buckets = tuple(latency_buckets)
+        self.namespace = namespace
+        self.latency: Dict[RequestKey, Histogram] = {}
+        self.responses: Dict[Tuple[str, str, str], int] = {}
+        self.retries: Dict[RequestKey, int] = {}
+        self.bytes_out: Dict[RequestKey, int] = {}
+        self.bytes_in: Dict[RequestKey, int] = {}
+        self.messages_parsed: Dict[str, int] = {}
+        self.message_parse_seconds: Dict[str, float] = {}
+
+    def on_request_end(self, event: RequestEndEvent):
+        key = (event.method, event.template)
+        histogram = self.latency.get(key)
+        if histogram is None:
+            histogram = self.latency[key] = Histogram(self.latency_buckets)
+        histogram.observe(event.duration)
+        status_key = (event.method, event.template, str(event.status) if event.status is not None else "error")
+        self.responses[status_key] = self.responses.get(status_key, 0) + 1
+        self.bytes_out[key] = self.bytes_out.get(key, 0) + event.bytes_out
+        self.bytes_in[key] = self.bytes_in.get(key, 0) + event.bytes_in
+
+    def on_retry(self, event: RetryEvent):
+        key = (event.method, event.template)
+        self.retries[key] = self.retries.get(key, 0) + 1
+
+    def on_message_parsed(self, event: MessageParsedEvent):
+        self.messages_parsed[event.message_type] = self.messages_parsed.get(event.message_type, 0) + 1
+        self.message_parse_seconds[event.message_type] = (
+            self.message_parse_seconds.get(event.message_type, 0.0) + event.duration
+        )
+
+    def to_prometheus(self) -> str:
+        """
+        Returns the metrics in the Prometheus text exposition format.
+        """
+        prefix = self.namespace
+        lines: List[str] = []
+
+        lines += [
+            f"# HELP {prefix}_request_duration_seconds Duration of the API request attempts.",
+            f"# TYPE {prefix}_request_duration_seconds histogram",
+        ]
+        for (method, template), histogram in sorted(self.latency.items()):
+            labels = _labels(method=method, endpoint=template)
+            for bound, count in zip(histogram.buckets, histogram.cumulative_counts()):
+                lines.append(f"{prefix}_request_duration_seconds_bucket{{{labels},le=\"{bound}\"}} {count}")
+            lines.append(f"{prefix}_request_duration_seconds_bucket{{{labels},le=\"+Inf\"}} {histogram.count}")
+            lines.append(f"{prefix}_request_duration_seconds_sum{{{labels}}} {histogram.sum}")
+            lines.append(f"{prefix}_request_duration_seconds_count{{{labels}}} {histogram.count}")
+
+        lines += _counter_lines(
+            f"{prefix}_responses_total", "API responses per status (error when there was no response).",
+            {_labels(method=m, endpoint=t, status=s): v for (m, t, s), v in self.responses.items()}
+        )
+        lines += _counter_lines(
+            f"{prefix}_retries_total", "Retried request attempts.",
+            {_labels(method=m, endpoint=t): v for (m, t), v in self.retries.items()}
+        )
+        lines += _counter_lines(
+            f"{prefix}_request_bytes_total", "Bytes sent in request bodies.",
+            {_labels(method=m, endpoint=t): v for (m, t), v in self.bytes_out.items()}
+        )
+        lines += _counter_lines(
+            f"{prefix}_response_bytes_total", "Bytes received in response bodies.",
+            {_labels(method=m, endpoint=t): v for (m, t), v in self.bytes_in.items()}
+        )
+        lines += _counter_lines(
+            f"{prefix}_messages_parsed_total", "Messages decoded per type.",
+            {_labels(type=message_type): v for message_type, v in self.messages_parsed.items()}
+        )
+        lines += _counter_lines(
+            f"{prefix}_message_parse_seconds_total", "Seconds spent decoding messages, per type.",
+            {_labels(type=message_type): v for message_type, v in self.message_parse_seconds.items()}
+        )
+        return "\n".join(lines) + "\n"
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(**labels: str) -> str:
+    return ",".join(f"{name}=\"{_escape_label_value(value)}\"" for name, value in labels.items())
+
+
+def _counter_lines(name: str, help_text: str, samples: Dict[str, float]) -> List[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+    lines += [f"{name}{{{labels}}} {value}" for labels, value in sorted(samples.items())]
+    return lines
+
+
+class OpenTelemetryInstrumentation(Instrumentation):
+    """
+    Records the same metrics as `MetricsCollector` with OpenTelemetry instruments, to be exported by the
+    OpenTelemetry SDK configured in the application. Requires the `opentelemetry-api` package.
+    """
+    def __init__(self, meter: Optional[Any] = None, namespace: str = "ai_engine_sdk"):
+        """
+        Args:
+            meter (Optional[opentelemetry.metrics.Meter]): The meter creating the instruments. Defaults to the meter
+                `ai_engine_sdk` of the global meter provider.
+            namespace (str): Prefix of the instrument names.
+        """
+        try:
+            from opentelemetry import metrics
+        except ImportError as error:
+            raise ImportError(
+                "OpenTelemetryInstrumentation requires the opentelemetry-api package: pip install opentelemetry-api"
+            ) from error
+        meter = meter or metrics.get_meter("ai_engine_sdk")
+        self._request_duration = meter.create_histogram(
+            f"{namespace}.request.duration", unit="s", description="Duration of the API request attempts."
+        )
+        self._responses = meter.create_counter(f"{namespace}.responses", description="API responses per status.")
+        self._retries = meter.create_counter(f"{namespace}.retries", description="Retried request attempts.")
+        self._bytes_out = meter.create_counter(f"{namespace}.request.bytes", unit="By", description="Bytes sent.")
+        self._bytes_in = meter.create_counter(f"{namespace}.response.bytes", unit="By", description="Bytes received.")
+        self._messages_parsed = meter.create_counter(f"{namespace}.messages.parsed", description="Messages decoded.")
+
+    def on_request_end(self, event: RequestEndEvent):
+        attributes = {"http.request.method": event.method, "url.template": event.template}
+        self._request_duration.record(event.duration, attributes)
+        status = str(event.status) if event.status is not None else "error"
+        self._responses.add(1, {**attributes, "http.response.status_code": status})
+        self._bytes_out.add(event.bytes_out, attributes)
+        self._bytes_in.add(event.bytes_in, attributes)
+
+    def on_retry(self, event: RetryEvent):
+        self._retries.add(1, {"http.request.method": event.method, "url.template": event.template})
+
+    def on_message_parsed(self, event: MessageParsedEvent):
+        self._messages_parsed.add(1, {"message.type": event.message_type})
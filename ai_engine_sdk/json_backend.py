@@ -0,0 +1,20 @@
+"""
+JSON decoding used on the hot paths of the SDK (API responses and the JSON encoded messages inside them).
+
+Uses `orjson` when it is installed, falling back to the standard library otherwise.
+"""
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+backend: str = "orjson" if orjson is not None else "json"
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
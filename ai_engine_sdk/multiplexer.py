@@ -0,0 +1,299 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from typing import TYPE_CHECKING, AsyncIterator, Dict, List, Optional, Tuple
+
+from .api_models.api_message import ApiBaseMessage, is_stop_message
+from .errors import AuthenticationError, NotFoundError
+from .polling import PollBackoff
+from .rate_limiting import TokenBucket
+
+if TYPE_CHECKING:
+    from .client import AiEngine, Session
+
+logger = logging.getLogger(__name__)
+
+
+class _PolledSession:
+    def __init__(self, session: "Session", queue: asyncio.Queue, backoff: PollBackoff):
+        self.session = session
+        self.queue = queue
+        self.backoff = backoff
+        self.last_activity = time.monotonic()
+        # Bumped every time the session is (re)scheduled, stale heap entries are skipped.
+        self.generation = 0
+        self.in_flight = False
+        self.submitted_while_in_flight = False
+        self.finished = False
+
+
+class SessionMultiplexer:
+    """
+    Polls the `new-messages` endpoint of many sessions under a single scheduler.
+
+    Instead of every `Session` polling on its own, registered sessions are polled in due-time order (earliest first,
+    round-robin among sessions due at the same time) with:
+        - a bounded number of polls in flight at once (`max_concurrency`),
+        - a global polls-per-second budget (`polls_per_second`),
+        - an adaptive interval per session: fast right after a submit or a received message, backing off while idle.
+
+    Messages are delivered to a bounded queue per session. A session whose queue is full is not polled again until
+    its consumer catches up (backpressure). When a session ends (after a `StopMessage` or `idle_timeout`) `None` is
+    put in its queue. A session that can't be polled anymore (deleted, expired or unauthorized) is unregistered and
+    the error is put in its queue instead: `messages` raises it.
+
+        async with SessionMultiplexer(max_concurrency=64, polls_per_second=200) as multiplexer:
+            session = await multiplexer.create_session(ai_engine, function_group=group.uuid)
+            await session.start(objective)
+            async for message in multiplexer.messages(session.session_id):
+                ...
+    """
+    def __init__(
+            self,
+            max_concurrency: int = 32,
+            polls_per_second: Optional[float] = 50.0,
+            queue_size: int = 100,
+            min_interval: float = 0.25,
+            max_interval: float = 5.0,
+            backoff_factor: float = 2.0,
+            idle_timeout: Optional[float] = 120.0
+    ):
+        """
+        Args:
+            max_concurrency (int): Maximum number of polls in flight at the same time.
+            polls_per_second (Optional[float]): Global budget of polls per second. None disables the budget.
+            queue_size (int): Capacity of each per-session message queue.
+            min_interval (float): Seconds between polls of a session right after some activity.
+            max_interval (float): Maximum seconds between two polls of the same session.
+            backoff_factor (float): Growth factor of the interval after every empty poll.
+            idle_timeout (Optional[float]): Seconds without new messages after which a session is unregistered.
+        """
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._budget = TokenBucket(polls_per_second) if polls_per_second else None
+        self._queue_size = queue_size
+        self._min_interval = min_interval
+        self._max_interval = max_interval
+        self._backoff_factor = backoff_factor
+        self._idle_timeout = idle_timeout
+
+        self._sessions: Dict[str, _PolledSession] = {}
+        # Kept until the consumer reads the end of the stream, which may happen after the session is unregistered.
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self._schedule: List[Tuple[float, int, str, int]] = []
+        self._sequence = itertools.count()
+        self._wake_up = asyncio.Event()
+        self._scheduler: Optional[asyncio.Task] = None
+        self._poll_tasks: set[asyncio.Task] = set()
+        # The end of the streams waiting for room in a full queue. Referenced until delivered: the event loop only
+        # keeps weak references to tasks.
+        self._pending_ends: Dict[str, asyncio.Task] = {}
+
+    async def __aenter__(self) -> "SessionMultiplexer":
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+
+    def start(self):
+        """
+        Starts the scheduler. It must be called from a running event loop.
+        """
+        if self._scheduler is None or self._scheduler.done():
+            self._scheduler = asyncio.create_task(self._run())
+
+    async def aclose(self, delete_sessions: bool = False):
+        """
+        Stops polling. Optionally deletes every session still registered.
+        """
+        if self._scheduler is not None:
+            self._scheduler.cancel()
+            await asyncio.gather(self._scheduler, return_exceptions=True)
+            self._scheduler = None
+        for task in list(self._poll_tasks):
+            task.cancel()
+        await asyncio.gather(*self._poll_tasks, return_exceptions=True)
+        sessions = [state.session for state in self._sessions.values()]
+        for session in sessions:
+            self.unregister(session.session_id)
+        if delete_sessions:
+            await asyncio.gather(*(session.delete() for session in sessions), return_exceptions=True)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    async def create_session(self, ai_engine: "AiEngine", function_group: str, opts: Optional[dict] = None) -> "Session":
+        """
+        Creates a session through `AiEngine.create_session` and registers it.
+        """
+        session = await ai_engine.create_session(function_group=function_group, opts=opts)
+        self.register(session)
+        return session
+
+    def register(self, session: "Session") -> asyncio.Queue:
+        """
+        Starts polling a session and returns the queue where its messages will be delivered.
+        """
+        if session.session_id in self._sessions:
+            return self._sessions[session.session_id].queue
+        if session.session_id in self._queues:
+            raise ValueError(f"Session {session.session_id} has ended and its queue has not been drained yet")
+        state = _PolledSession(
+            session=session,
+            queue=asyncio.Queue(maxsize=self._queue_size),
+            backoff=PollBackoff(
+                min_interval=self._min_interval,
+                max_interval=self._max_interval,
+                multiplier=self._backoff_factor
+            )
+        )
+        self._sessions[session.session_id] = state
+        self._queues[session.session_id] = state.queue
+        session.add_submit_listener(self._on_submit)
+        self._schedule_poll(state, delay=0)
+        return state.queue
+
+    def unregister(self, session_id: str, error: Optional[Exception] = None):
+        """
+        Stops polling a session. Its queue receives a final `None` (or `error`, if given) once the consumer makes room
+        for it.
+        """
+        state = self._sessions.pop(session_id, None)
+        if state is None:
+            return
+        state.finished = True
+        state.session.remove_submit_listener(self._on_submit)
+        try:
+            state.queue.put_nowait(error)
+        except asyncio.QueueFull:
+            task = asyncio.ensure_future(state.queue.put(error))
+            self._pending_ends[session_id] = task
+            task.add_done_callback(lambda _: self._forget_pending_end(session_id, task))
+
+    def _forget_pending_end(self, session_id: str, task: asyncio.Task):
+        if self._pending_ends.get(session_id) is task:
+            del self._pending_ends[session_id]
+
+    def discard(self, session_id: str):
+        """
+        Stops polling a session and drops its queue, for consumers that won't read the rest of its messages.
+        """
+        self.unregister(session_id)
+        self._queues.pop(session_id, None)
+        pending_end = self._pending_ends.pop(session_id, None)
+        if pending_end is not None:
+            pending_end.cancel()
+
+    def queue(self, session_id: str) -> asyncio.Queue:
+        return self._queues[session_id]
+
+    async def messages(self, session_id: str) -> AsyncIterator[ApiBaseMessage]:
+        """
+        Yields the messages of a registered session until it ends. Raises the error that ended it, if any (e.g.
+        `NotFoundError` once the session is deleted).
+        """
+        queue = self._queues[session_id]
+        while True:
+            message = await queue.get()
+            if message is None or isinstance(message, Exception):
+                self._queues.pop(session_id, None)
+                if message is not None:
+                    raise message
+                return
+            yield message
+
+    def _on_submit(self, session: "Session"):
+        state = self._sessions.get(session.session_id)
+        if state is None:
+            return
+        if state.in_flight:
+            state.submitted_while_in_flight = True
+            return
+        state.backoff.reset()
+        state.last_activity = time.monotonic()
+        self._schedule_poll(state, delay=0)
+
+    def _schedule_poll(self, state: _PolledSession, delay: float):
+        state.generation += 1
+        heapq.heappush(
+            self._schedule,
+            (time.monotonic() + delay, next(self._sequence), state.session.session_id, state.generation)
+        )
+        self._wake_up.set()
+
+    async def _run(self):
+        while True:
+            self._wake_up.clear()
+            if not self._schedule:
+                await self._wake_up.wait()
+                continue
+
+            due_at, _, session_id, generation = self._schedule[0]
+            delay = due_at - time.monotonic()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wake_up.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            heapq.heappop(self._schedule)
+            state = self._sessions.get(session_id)
+            if state is None or state.generation != generation or state.in_flight:
+                continue
+            if state.queue.full():
+                # Backpressure: the consumer is behind, check again later.
+                self._schedule_poll(state, delay=self._max_interval)
+                continue
+
+            await self._semaphore.acquire()
+            if self._budget is not None:
+                await self._budget.acquire()
+            state.in_flight = True
+            task = asyncio.create_task(self._poll(state))
+            self._poll_tasks.add(task)
+            task.add_done_callback(self._poll_tasks.discard)
+
+    async def _poll(self, state: _PolledSession):
+        session = state.session
+        try:
+            try:
+                messages = await session.get_messages()
+            finally:
+                self._semaphore.release()
+        except (NotFoundError, AuthenticationError) as e:
+            # Polling again won't help: the session is gone, or the API key can't access it anymore.
+            logger.warning(f"Polling session {session.session_id} failed, unregistering it: {e}")
+            state.in_flight = False
+            self.unregister(session.session_id, error=e)
+            return
+        except Exception as e:
+            logger.warning(f"Polling session {session.session_id} failed: {e}")
+            messages = []
+
+        stopped = False
+        for message in messages:
+            await state.queue.put(message)
+            if is_stop_message(message):
+                stopped = True
+                break
+
+        state.in_flight = False
+        if state.finished:
+            return
+        if stopped:
+            self.unregister(session.session_id)
+            return
+
+        now = time.monotonic()
+        if messages or state.submitted_while_in_flight:
+            state.submitted_while_in_flight = False
+            state.last_activity = now
+            state.backoff.reset()
+        elif self._idle_timeout is not None and now - state.last_activity >= self._idle_timeout:
+            logger.debug(f"Session {session.session_id} idle for {self._idle_timeout}s, unregistering it")
+            self.unregister(session.session_id)
+            return
+        self._schedule_poll(state, delay=state.backoff.next_interval())
@@ -0,0 +1,49 @@
+import random
+
+
+class PollBackoff:
+    """
+    Exponential backoff for polling the `new-messages` endpoint.
+
+    The interval starts at `min_interval` (fast polling right after some activity, e.g. a submitted message or a
+    received reply) and grows by `multiplier` on every idle poll until it reaches `max_interval`.
+    """
+    def __init__(
+            self,
+            min_interval: float = 0.25,
+            max_interval: float = 5.0,
+            multiplier: float = 2.0,
+            jitter: float = 0.1
+    ):
+        """
+        Args:
+            min_interval (float): Seconds to wait right after activity.
+            max_interval (float): Ceiling, in seconds, for the wait between two polls.
+            multiplier (float): Growth factor applied to the interval after every idle poll.
+            jitter (float): Random +/- fraction applied to every interval, so many sessions don't poll in lockstep.
+        """
+        if min_interval <= 0 or max_interval < min_interval:
+            raise ValueError("Expected 0 < min_interval <= max_interval")
+        if multiplier < 1:
+            raise ValueError("multiplier must be >= 1")
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self._current = min_interval
+
+    def reset(self):
+        """
+        Goes back to fast polling, to be called whenever there is activity in the session.
+        """
+        self._current = self.min_interval
+
+    def next_interval(self) -> float:
+        """
+        Returns the seconds to wait before the next poll and backs off for the following one.
+        """
+        interval = self._current
+        self._current = min(self._current * self.multiplier, self.max_interval)
+        if self.jitter:
+            interval *= 1 + random.uniform(-self.jitter, self.jitter)
+        return min(interval, self.max_interval)
@@ -0,0 +1,253 @@
+import asyncio
+import time
+from typing import Any, Dict, Optional, Union
+
+
+class TokenBucket:
+    """
+    Asyncio token bucket: allows `rate` operations per second on average, with bursts of up to `capacity`.
+    """
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Args:
+            rate (float): Tokens added to the bucket per second.
+            capacity (Optional[float]): Maximum number of tokens stored (burst size). Defaults to `rate`, at least 1.
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """
+        Takes `tokens` from the bucket if they are available right now.
+        """
+        self._refill()
+        if self._tokens >= tokens:
+            self._tokens -= tokens
+            return True
+        return False
+
+    async def acquire(self, tokens: float = 1.0):
+        """
+        Waits until `tokens` are available and takes them.
+        """
+        if tokens > self.capacity:
+            raise ValueError(f"Cannot acquire {tokens} tokens from a bucket of capacity {self.capacity}")
+        while not self.try_acquire(tokens):
+            await asyncio.sleep((tokens - self._tokens) / self.rate)
+
+
+class _EndpointLatency:
+    __slots__ = ("samples", "short", "long")
+
+    def __init__(self):
+        self.samples = 0
+        self.short = 0.0
+        self.long = 0.0
+
+    def observe(self, latency: float, smoothing: float, baseline_smoothing: float, warm_up: int):
+        self.samples += 1
+        if self.samples <= warm_up:
+            # Plain averages over the first samples, so that the first latency doesn't weigh on them for long.
+            self.short += (latency - self.short) / self.samples
+            self.long += (latency - self.long) / self.samples
+        else:
+            self.short += smoothing * (latency - self.short)
+            self.long += baseline_smoothing * (latency - self.long)
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD (additive increase, multiplicative decrease) limit on the number of requests in flight.
+
+    The limit grows by about one for every `limit` healthy responses, and is multiplied by `decrease_factor` when the
+    server pushes back: a 429/503 response, a connection error, or latency rising above `latency_tolerance` times its
+    usual level. Decreases happen at most once per `decrease_cooldown` seconds, so a burst of rejections of requests
+    sent together counts as a single congestion signal.
+
+    Latency is tracked per endpoint (polls and catalog reads don't take the same time): a short-term average of the
+    last responses is compared to a long-term average, which follows the normal latency of the endpoint and its
+    jitter, rather than to the fastest response ever seen.
+    """
+    def __init__(
+            self,
+            initial_limit: float = 16,
+            min_limit: float = 1,
+            max_limit: float = 256,
+            decrease_factor: float = 0.5,
+            latency_tolerance: Optional[float] = 2.0,
+            decrease_cooldown: float = 1.0,
+            smoothing: float = 0.1,
+            baseline_smoothing: float = 0.01,
+            min_samples: int = 20
+    ):
+        """
+        Args:
+            initial_limit (float): Requests allowed in flight at the start.
+            min_limit (float): The limit never goes below this.
+            max_limit (float): The limit never goes above this.
+            decrease_factor (float): Factor applied to the limit on congestion.
+            latency_tolerance (Optional[float]): Ratio between the short-term and the long-term latency of an endpoint
+                above which the server is considered congested. None ignores latency.
+            decrease_cooldown (float): Minimum seconds between two decreases.
+            smoothing (float): Weight of the last latency in the short-term (exponentially weighted) latency.
+            baseline_smoothing (float): Weight of the last latency in the long-term latency.
+            min_samples (int): Responses of an endpoint needed before its latency is taken into account.
+        """
+        if not 0 < min_limit <= initial_limit <= max_limit:
+            raise ValueError("Expected 0 < min_limit <= initial_limit <= max_limit")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self.decrease_cooldown = decrease_cooldown
+        self.smoothing = smoothing
+        self.baseline_smoothing = baseline_smoothing
+        self.min_samples = min_samples
+        self._limit = float(initial_limit)
+        self._in_flight = 0
+        self._condition = asyncio.Condition()
+        self._latencies: Dict[Optional[str], _EndpointLatency] = {}
+        self._last_decrease_at = float("-inf")
+
+    @property
+    def limit(self) -> int:
+        return max(int(self._limit), 1)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    async def acquire(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+
+    async def release(self, latency: Optional[float], congested: bool = False, endpoint: Optional[str] = None):
+        """
+        Frees a slot and adapts the limit.
+
+        Args:
+            latency (Optional[float]): Seconds the request took, None if it got no response.
+            congested (bool): Whether the server signalled congestion (429, 503, connection error...).
+            endpoint (Optional[str]): The kind of request (e.g. its endpoint template), latency is compared per kind.
+        """
+        if latency is None and not congested:
+            # Cancelled or failed on the client side: nothing learnt about the server.
+            async with self._condition:
+                self._in_flight -= 1
+                self._condition.notify_all()
+            return
+
+        if latency is not None and self.latency_tolerance is not None:
+            stats = self._latencies.get(endpoint)
+            if stats is None:
+                stats = self._latencies[endpoint] = _EndpointLatency()
+            stats.observe(latency, self.smoothing, self.baseline_smoothing, self.min_samples)
+            if not congested and stats.samples >= self.min_samples and stats.short > stats.long * self.latency_tolerance:
+                congested = True
+
+        if congested:
+            now = time.monotonic()
+            if now - self._last_decrease_at >= self.decrease_cooldown:
+                self._limit = max(self.min_limit, self._limit * self.decrease_factor)
+                self._last_decrease_at = now
+        else:
+            self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+
+        async with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+
+class RateLimiter:
+    """
+    Client-side limits shared by every request of an `AiEngine` (and of the sessions it creates):
+        - an optional token bucket capping the requests per second,
+        - an optional adaptive limit of requests in flight (see `AdaptiveConcurrencyLimiter`),
+        - a global pause when the server answers with a `Retry-After` header, so every caller backs off at once.
+    """
+    CONGESTION_STATUSES = frozenset({429, 503})
+
+    def __init__(
+            self,
+            requests_per_second: Optional[float] = None,
+            burst: Optional[float] = None,
+            concurrency_limiter: Optional[AdaptiveConcurrencyLimiter] = None
+    ):
+        """
+        Args:
+            requests_per_second (Optional[float]): Average requests per second allowed. None for no cap.
+            burst (Optional[float]): Requests that may be sent at once above the average rate.
+            concurrency_limiter (Optional[AdaptiveConcurrencyLimiter]): Adaptive limit of requests in flight.
+        """
+        self.bucket = TokenBucket(requests_per_second, burst) if requests_per_second else None
+        self.concurrency_limiter = concurrency_limiter
+        self._paused_until = 0.0
+
+    def pause(self, seconds: float):
+        """
+        Holds every new request for `seconds`.
+        """
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    async def acquire(self):
+        while (pause := self._paused_until - time.monotonic()) > 0:
+            await asyncio.sleep(pause)
+        if self.bucket is not None:
+            await self.bucket.acquire()
+        if self.concurrency_limiter is not None:
+            await self.concurrency_limiter.acquire()
+
+    async def release(
+            self,
+            latency: Optional[float] = None,
+            endpoint: Optional[str] = None,
+            status: Optional[int] = None,
+            retry_after: Optional[float] = None,
+            connection_failed: bool = False
+    ):
+        """
+        Reports the outcome of a request acquired with `acquire`.
+
+        Args:
+            latency (Optional[float]): Seconds the request took, None if it got no response.
+            endpoint (Optional[str]): The endpoint template of the request.
+            status (Optional[int]): The response status, None if there was no response.
+            retry_after (Optional[float]): The `Retry-After` of the response, if any.
+            connection_failed (bool): Whether the request failed to reach the server (refused, reset, timeout...).
+        """
+        if retry_after:
+            self.pause(retry_after)
+        if self.concurrency_limiter is not None:
+            congested = connection_failed or status in self.CONGESTION_STATUSES
+            await self.concurrency_limiter.release(
+                latency if status is not None else None, congested=congested, endpoint=endpoint
+            )
+
+
+def make_rate_limiter(
+        requests_per_second: Optional[float] = None,
+        burst: Optional[float] = None,
+        adaptive_concurrency: Union[bool, Dict[str, Any]] = False
+) -> Optional[RateLimiter]:
+    """
+    Builds a `RateLimiter` from the `AiEngine` options, or returns None when no limit is configured.
+    """
+    if isinstance(adaptive_concurrency, dict):
+        concurrency_limiter = AdaptiveConcurrencyLimiter(**adaptive_concurrency)
+    elif adaptive_concurrency:
+        concurrency_limiter = AdaptiveConcurrencyLimiter()
+    else:
+        concurrency_limiter = None
+    if not requests_per_second and concurrency_limiter is None:
+        return None
+    return RateLimiter(requests_per_second=requests_per_second, burst=burst, concurrency_limiter=concurrency_limiter)
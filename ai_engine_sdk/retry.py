@@ -0,0 +1,106 @@
+import random
+import re
+from enum import Enum
+from typing import Dict, FrozenSet, Mapping, Optional, Union
+
+from pydantic import BaseModel
+
+from .errors import AiEngineError, ApiConnectionError, ApiError
+
+
+class EndpointClass(str, Enum):
+    """
+    Groups of endpoints sharing a retry policy.
+    """
+    POLL = "poll"  # GET .../new-messages
+    SUBMIT = "submit"  # POST .../submit
+    CATALOG_READ = "catalog_read"  # Any other GET: function groups, functions, credits...
+    DELETE = "delete"  # Any DELETE
+    WRITE = "write"  # Any other POST/PUT: creating sessions and function groups, sharing...
+
+
+_POLL_ENDPOINT = re.compile(r"/engine/chat/sessions/[^/]+/new-messages")
+_SUBMIT_ENDPOINT = re.compile(r"/engine/chat/sessions/[^/]+/submit$")
+
+
+def classify_endpoint(method: str, endpoint: str) -> EndpointClass:
+    method = method.upper()
+    path = endpoint.split("?", 1)[0]
+    if method == "GET":
+        return EndpointClass.POLL if _POLL_ENDPOINT.search(path) else EndpointClass.CATALOG_READ
+    if method == "DELETE":
+        return EndpointClass.DELETE
+    if method == "POST" and _SUBMIT_ENDPOINT.search(path):
+        return EndpointClass.SUBMIT
+    return EndpointClass.WRITE
+
+
+class RetryPolicy(BaseModel):
+    """
+    How a failed request is retried: exponential backoff with full jitter, honouring `Retry-After`.
+
+    Attributes:
+        max_attempts (int): Total attempts, including the first one. 1 disables retries.
+        base_delay (float): Seconds to wait before the first retry (before jitter).
+        max_delay (float): Ceiling, in seconds, of the backoff delay.
+        multiplier (float): Growth factor of the delay after every attempt.
+        jitter (bool): Wait a random time between 0 and the backoff delay ("full jitter").
+        retry_statuses (FrozenSet[int]): Statuses that are worth retrying. Others (401, 404...) fail immediately.
+        retry_connection_errors (bool): Retry when the request could not be completed at all.
+        max_retry_after (float): Longest `Retry-After` honoured, in seconds. Longer ones fail immediately.
+    """
+    max_attempts: int = 3
+    base_delay: float = 0.25
+    max_delay: float = 10.0
+    multiplier: float = 2.0
+    jitter: bool = True
+    retry_statuses: FrozenSet[int] = frozenset({408, 425, 429, 500, 502, 503, 504})
+    retry_connection_errors: bool = True
+    max_retry_after: float = 60.0
+
+    def is_retriable(self, error: AiEngineError) -> bool:
+        if isinstance(error, ApiError):
+            if error.status not in self.retry_statuses:
+                return False
+            retry_after = error.retry_after
+            return retry_after is None or retry_after <= self.max_retry_after
+        if isinstance(error, ApiConnectionError):
+            return self.retry_connection_errors
+        return False
+
+    def get_delay(self, attempt: int, error: Optional[AiEngineError] = None) -> float:
+        """
+        Seconds to wait before the next attempt, after `attempt` (1-based) attempts failed.
+        """
+        delay = min(self.base_delay * self.multiplier ** (attempt - 1), self.max_delay)
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        retry_after = error.retry_after if isinstance(error, ApiError) else None
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+
+NO_RETRY = RetryPolicy(max_attempts=1)
+
+DEFAULT_RETRY_POLICIES: Mapping[EndpointClass, RetryPolicy] = {
+    EndpointClass.POLL: RetryPolicy(max_attempts=5),
+    # Only submits carrying a `message_id` are retried, see `make_raw_api_request`.
+    EndpointClass.SUBMIT: RetryPolicy(max_attempts=3),
+    EndpointClass.CATALOG_READ: RetryPolicy(max_attempts=3),
+    EndpointClass.DELETE: RetryPolicy(max_attempts=3),
+    # Creating sessions or function groups twice is not harmless.
+    EndpointClass.WRITE: NO_RETRY,
+}
+
+
+def resolve_retry_policies(
+        overrides: Optional[Mapping[Union[EndpointClass, str], RetryPolicy]] = None
+) -> Dict[EndpointClass, RetryPolicy]:
+    """
+    Returns the default retry policies updated with `overrides`.
+    """
+    policies = dict(DEFAULT_RETRY_POLICIES)
+    for endpoint_class, policy in (overrides or {}).items():
+        policies[EndpointClass(endpoint_class)] = policy
+    return policies
@@ -0,0 +1,58 @@
+from collections import deque
+from enum import Enum
+from typing import Deque, Iterable, Union
+
+
+class MessageRetention(str, Enum):
+    """
+    How many of the raw received messages a `Session` keeps in memory.
+
+    CURSOR_ONLY: only the id of the last message, needed to ask the API for newer messages.
+    RING_BUFFER: the last `history_size` messages.
+    FULL: every message received during the session.
+    """
+    CURSOR_ONLY = "cursor_only"
+    RING_BUFFER = "ring_buffer"
+    FULL = "full"
+
+
+def make_message_history(retention: Union[MessageRetention, str], history_size: int) -> Union[list, Deque]:
+    retention = MessageRetention(retention)
+    if retention == MessageRetention.FULL:
+        return []
+    if retention == MessageRetention.RING_BUFFER:
+        if history_size <= 0:
+            raise ValueError("history_size must be positive when keeping a ring buffer of messages")
+        return deque(maxlen=history_size)
+    return deque(maxlen=0)
+
+
+class RecentIds:
+    """
+    Set of the last `max_size` ids added, the oldest ones are forgotten first.
+
+    Used to skip messages received twice. The API only returns messages after the `last_message_id` cursor, so
+    duplicates can only come from the most recent ones and a bounded window is enough.
+    """
+    def __init__(self, max_size: int = 1024, ids: Iterable[str] = ()):
+        if max_size <= 0:
+            raise ValueError("max_size must be positive")
+        self.max_size = max_size
+        self._order: Deque[str] = deque()
+        self._ids: set[str] = set()
+        for id_ in ids:
+            self.add(id_)
+
+    def add(self, id_: str):
+        if id_ in self._ids:
+            return
+        self._ids.add(id_)
+        self._order.append(id_)
+        if len(self._order) > self.max_size:
+            self._ids.discard(self._order.popleft())
+
+    def __contains__(self, id_: object) -> bool:
+        return id_ in self._ids
+
+    def __len__(self) -> int:
+        return len(self._ids)
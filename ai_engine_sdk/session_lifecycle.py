@@ -0,0 +1,179 @@
+import asyncio
+import logging
+import traceback
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from .errors import NotFoundError
+
+if TYPE_CHECKING:
+    from .client import Session
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SessionLeakReport:
+    """
+    What `SessionLifecycleManager.shutdown` found and did.
+
+    Attributes:
+        leaked (List[str]): The sessions still live at shutdown, never deleted by the application.
+        deleted (List[str]): The leaked sessions deleted by the shutdown.
+        failed (Dict[str, Exception]): The leaked sessions whose deletion failed, with the error.
+        timed_out (List[str]): The leaked sessions whose deletion didn't complete within the shutdown timeout.
+        reaped (List[str]): The sessions deleted earlier for being idle.
+        origins (Dict[str, str]): Where every leaked session was created, with `record_origins`.
+    """
+    leaked: List[str] = field(default_factory=list)
+    deleted: List[str] = field(default_factory=list)
+    failed: Dict[str, Exception] = field(default_factory=dict)
+    timed_out: List[str] = field(default_factory=list)
+    reaped: List[str] = field(default_factory=list)
+    origins: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return not self.leaked and not self.reaped
+
+
+class SessionLifecycleManager:
+    """
+    Tracks the live sessions of an `AiEngine` (option `session_lifecycle`): the sessions it creates or resumes and
+    that aren't deleted yet.
+
+    Sessions that sent no request for `idle_timeout` seconds are deleted in the background, and `shutdown` (called by
+    `AiEngine.aclose`) deletes the remaining ones concurrently, within `shutdown_timeout` seconds, and reports them as
+    leaks: the application should delete its sessions, e.g. with `async with session:`.
+    """
+    def __init__(
+            self,
+            idle_timeout: Optional[float] = None,
+            reap_interval: float = 60.0,
+            shutdown_timeout: float = 10.0,
+            delete_concurrency: int = 32,
+            record_origins: bool = False
+    ):
+        """
+        Args:
+            idle_timeout (Optional[float]): Seconds without request after which a session is deleted. None keeps
+                idle sessions until shutdown.
+            reap_interval (float): Seconds between two checks for idle sessions.
+            shutdown_timeout (float): Seconds the shutdown waits for the deletions.
+            delete_concurrency (int): Sessions deleted at once by the shutdown.
+            record_origins (bool): Whether to record the stack creating every session, to report where leaked
+                sessions come from. Costs a stack capture per session.
+        """
+        self.idle_timeout = idle_timeout
+        self.reap_interval = reap_interval
+        self.shutdown_timeout = shutdown_timeout
+        self.delete_concurrency = delete_concurrency
+        self.record_origins = record_origins
+        self._sessions: Dict[str, "Session"] = {}
+        self._origins: Dict[str, str] = {}
+        self._reaped: List[str] = []
+        self._reaper_task: Optional[asyncio.Task] = None
+        self.last_report: Optional[SessionLeakReport] = None
+
+    @property
+    def live_sessions(self) -> List["Session"]:
+        return list(self._sessions.values())
+
+    def track(self, session: "Session"):
+        self._sessions[session.session_id] = session
+        session.add_delete_listener(self._untrack)
+        if self.record_origins:
+            # Drop the frames of this method, `AiEngine._make_session` and its caller.
+            self._origins[session.session_id] = "".join(traceback.format_stack()[:-3])
+        if self.idle_timeout is not None and (self._reaper_task is None or self._reaper_task.done()):
+            self._reaper_task = asyncio.ensure_future(self._reap_periodically())
+
+    def _untrack(self, session: "Session"):
+        self._sessions.pop(session.session_id, None)
+        self._origins.pop(session.session_id, None)
+
+    async def _delete(self, session: "Session"):
+        try:
+            await session.delete()
+        except NotFoundError:
+            # Already gone (deleted elsewhere, or expired by the server).
+            self._untrack(session)
+
+    ####
+    # Idle reaping
+    ####
+    async def reap(self) -> List[str]:
+        """
+        Deletes the sessions idle for `idle_timeout` seconds and returns their ids. Does nothing without
+        `idle_timeout`.
+        """
+        if self.idle_timeout is None:
+            return []
+        idle = [session for session in self._sessions.values() if session.idle_time >= self.idle_timeout]
+        results = await asyncio.gather(*(self._delete(session) for session in idle), return_exceptions=True)
+        reaped = []
+        for session, result in zip(idle, results):
+            if isinstance(result, BaseException):
+                logger.warning(f"Could not delete the idle session {session.session_id}: {result}")
+            else:
+                reaped.append(session.session_id)
+        if reaped:
+            logger.warning(f"Deleted {len(reaped)} sessions idle for {self.idle_timeout}s: {', '.join(reaped)}")
+            self._reaped.extend(reaped)
+        return reaped
+
+    async def _reap_periodically(self):
+        while self._sessions:
+            await asyncio.sleep(self.reap_interval)
+            await self.reap()
+
+    ####
+    # Shutdown
+    ####
+    async def shutdown(self) -> SessionLeakReport:
+        """
+        Deletes every live session, concurrently, and reports them as leaks.
+        """
+        if self._reaper_task is not None:
+            self._reaper_task.cancel()
+            await asyncio.gather(self._reaper_task, return_exceptions=True)
+            self._reaper_task = None
+
+        leaked = list(self._sessions.values())
+        report = SessionLeakReport(
+            leaked=[session.session_id for session in leaked],
+            reaped=list(self._reaped),
+            origins={
+                session_id: self._origins[session_id] for session_id in self._sessions if session_id in self._origins
+            }
+        )
+        self.last_report = report
+        if not leaked:
+            return report
+
+        semaphore = asyncio.Semaphore(self.delete_concurrency)
+
+        async def delete(session: "Session"):
+            async with semaphore:
+                await self._delete(session)
+
+        deletions = [asyncio.ensure_future(delete(session)) for session in leaked]
+        done, pending = await asyncio.wait(deletions, timeout=self.shutdown_timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        for session, deletion in zip(leaked, deletions):
+            if deletion in pending:
+                report.timed_out.append(session.session_id)
+            elif deletion.exception() is not None:
+                report.failed[session.session_id] = deletion.exception()
+            else:
+                report.deleted.append(session.session_id)
+
+        logger.warning(
+            f"{len(leaked)} sessions were never deleted: {len(report.deleted)} deleted at shutdown, "
+            f"{len(report.failed)} failed, {len(report.timed_out)} timed out. Leaked: {', '.join(report.leaked)}"
+        )
+        for session_id, origin in report.origins.items():
+            logger.warning(f"Session {session_id} was created at:\n{origin}")
+        return report
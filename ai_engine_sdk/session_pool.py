@@ -0,0 +1,202 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Deque, Dict, Optional, Set, Tuple
+
+from .llm_models import get_model_id
+
+if TYPE_CHECKING:
+    from .client import AiEngine, Session
+
+logger = logging.getLogger(__name__)
+
+# (function_group, requested model id or None for the default one, email)
+PoolKey = Tuple[str, Optional[str], str]
+
+
+def pool_key(function_group: str, opts: Optional[dict] = None) -> PoolKey:
+    opts = opts or {}
+    model = opts.get('model')
+    return function_group, get_model_id(model) if model is not None else None, opts.get('email') or ""
+
+
+class SessionPool:
+    """
+    Keeps idle sessions, already created, for every `(function_group, model, email)` in use, so that `acquire`
+    hands one out without any request on the critical path. The pool refills in the background as sessions are
+    taken, and deletes the sessions that stayed idle longer than `max_idle` (the API may expire them).
+
+    A key is pooled from its first `acquire` (a miss, which creates the session like `AiEngine.create_session`)
+    or from `warm`. Enabled in `AiEngine` with the `session_pool` option. With the `credit_guard` option, idle
+    sessions are not charged: the estimated cost of a session is deducted when `acquire` hands it out.
+    """
+    def __init__(
+            self,
+            ai_engine: "AiEngine",
+            size: int = 2,
+            max_idle: float = 300.0,
+            maintenance_interval: float = 30.0,
+            max_keys: int = 64
+    ):
+        """
+        Args:
+            ai_engine (AiEngine): The client creating the sessions.
+            size (int): Idle sessions kept per key.
+            max_idle (float): Seconds an idle session is kept before being deleted and replaced.
+            maintenance_interval (float): Seconds between two background expirations and refills.
+            max_keys (int): Keys pooled at most, the next ones are served without pooling.
+        """
+        if size < 1:
+            raise ValueError("size must be at least 1")
+        self._ai_engine = ai_engine
+        self.size = size
+        self.max_idle = max_idle
+        self.maintenance_interval = maintenance_interval
+        self.max_keys = max_keys
+        # Idle sessions per key, oldest first, with their creation time.
+        self._idle: Dict[PoolKey, Deque[Tuple[float, "Session"]]] = {}
+        self._opts: Dict[PoolKey, dict] = {}
+        self._refills: Dict[PoolKey, asyncio.Task] = {}
+        self._deletions: Set[asyncio.Task] = set()
+        self._maintenance_task: Optional[asyncio.Task] = None
+        self._closed = False
+        self.hits = 0
+        self.misses = 0
+
+    def idle_count(self, function_group: str, opts: Optional[dict] = None) -> int:
+        return len(self._idle.get(pool_key(function_group, opts), ()))
+
+    ####
+    # Acquisition
+    ####
+    async def acquire(self, function_group: str, opts: Optional[dict] = None) -> "Session":
+        """
+        Returns an idle session of the key if there is one, otherwise creates one. Either way, the pool of the key is
+        refilled in the background.
+        """
+        key = pool_key(function_group, opts)
+        credit_guard = self._ai_engine._credit_guard
+        if credit_guard is not None and self.idle_count(function_group, opts):
+            # Raises when there is no credit left, like a miss would, before taking an idle session.
+            await credit_guard.ensure_credits()
+        session = self._take(key)
+        if self._register(key, function_group, opts):
+            self._refill_soon(key)
+        if session is not None:
+            self.hits += 1
+            if credit_guard is not None:
+                credit_guard.charge(session._model)
+            return session
+        self.misses += 1
+        return await self._ai_engine._create_session(function_group, opts)
+
+    async def warm(self, function_group: str, opts: Optional[dict] = None):
+        """
+        Pools a key ahead of its first `acquire` and waits until its idle sessions are created.
+        """
+        key = pool_key(function_group, opts)
+        if self._register(key, function_group, opts):
+            self._refill_soon(key)
+            await asyncio.shield(self._refills[key])
+
+    def _register(self, key: PoolKey, function_group: str, opts: Optional[dict]) -> bool:
+        if self._closed:
+            return False
+        if key not in self._idle:
+            if len(self._idle) >= self.max_keys:
+                return False
+            self._idle[key] = deque()
+            self._opts[key] = {**(opts or {}), 'function_group': function_group}
+            self._start_maintenance()
+        return True
+
+    def _take(self, key: PoolKey) -> Optional["Session"]:
+        idle = self._idle.get(key)
+        now = time.monotonic()
+        while idle:
+            created_at, session = idle.popleft()
+            if session.deleted:
+                # Reaped by the session lifecycle manager.
+                continue
+            if now - created_at < self.max_idle:
+                return session
+            self._delete_soon(session)
+        return None
+
+    ####
+    # Refill and expiration
+    ####
+    def _refill_soon(self, key: PoolKey):
+        refill = self._refills.get(key)
+        if refill is None or refill.done():
+            self._refills[key] = asyncio.ensure_future(self._refill(key))
+
+    async def _refill(self, key: PoolKey):
+        opts = dict(self._opts[key])
+        function_group = opts.pop('function_group')
+        idle = self._idle[key]
+        # Sessions taken while refilling are replaced in the next round.
+        while not self._closed and (missing := self.size - len(idle)) > 0:
+            results = await asyncio.gather(
+                *(self._ai_engine._create_session(function_group, opts, charge=False) for _ in range(missing)),
+                return_exceptions=True
+            )
+            failed = False
+            for result in results:
+                if isinstance(result, BaseException):
+                    # The next acquire or maintenance tries again, misses are served meanwhile.
+                    logger.warning(f"Could not refill the session pool of {key}: {result}")
+                    failed = True
+                elif self._closed:
+                    self._delete_soon(result)
+                else:
+                    idle.append((time.monotonic(), result))
+            if failed:
+                return
+
+    def _expire(self):
+        now = time.monotonic()
+        for idle in self._idle.values():
+            while idle and now - idle[0][0] >= self.max_idle:
+                self._delete_soon(idle.popleft()[1])
+
+    def _start_maintenance(self):
+        if self._maintenance_task is None or self._maintenance_task.done():
+            self._maintenance_task = asyncio.ensure_future(self._maintain_periodically())
+
+    async def _maintain_periodically(self):
+        while True:
+            await asyncio.sleep(self.maintenance_interval)
+            self._expire()
+            for key in list(self._idle):
+                self._refill_soon(key)
+
+    def _delete_soon(self, session: "Session"):
+        deletion = asyncio.ensure_future(self._delete(session))
+        self._deletions.add(deletion)
+        deletion.add_done_callback(self._deletions.discard)
+
+    @staticmethod
+    async def _delete(session: "Session"):
+        if session.deleted:
+            return
+        try:
+            await session.delete()
+        except Exception as error:
+            logger.warning(f"Could not delete the pooled session {session.session_id}: {error}")
+
+    async def aclose(self):
+        """
+        Stops refilling and deletes the idle sessions.
+        """
+        self._closed = True
+        if self._maintenance_task is not None:
+            self._maintenance_task.cancel()
+            await asyncio.gather(self._maintenance_task, return_exceptions=True)
+        # Let the refills in flight finish: they delete the sessions they create once the pool is closed.
+        await asyncio.gather(*self._refills.values(), return_exceptions=True)
+        for idle in self._idle.values():
+            while idle:
+                self._delete_soon(idle.popleft()[1])
+        await asyncio.gather(*self._deletions, return_exceptions=True)
@@ -0,0 +1,169 @@
+import asyncio
+import os
+import sqlite3
+import tempfile
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from pydantic import BaseModel, Field
+
+
+class SessionSnapshot(BaseModel):
+    """
+    The minimal state needed to resume a session in another process.
+
+    Attributes:
+        session_id (str): The unique identifier for the session.
+        function_group (str): The function group associated with the session.
+        last_message_id (Optional[str]): The ID of the last message processed, the cursor for fetching newer messages.
+        saved_at (float): Unix time of the snapshot.
+    """
+    session_id: str
+    function_group: str
+    last_message_id: Optional[str] = None
+    saved_at: float = Field(default_factory=time.time)
+
+
+class SessionStore(ABC):
+    """
+    Where session snapshots are persisted, see `AiEngine.resume_session`.
+    """
+    @abstractmethod
+    async def save(self, snapshot: SessionSnapshot):
+        ...
+
+    @abstractmethod
+    async def load(self, session_id: str) -> Optional[SessionSnapshot]:
+        ...
+
+    @abstractmethod
+    async def delete(self, session_id: str):
+        ...
+
+    @abstractmethod
+    async def list(self) -> List[SessionSnapshot]:
+        ...
+
+
+class MemorySessionStore(SessionStore):
+    """
+    Keeps the snapshots in a dict: survives sessions, not process restarts. Useful for tests.
+    """
+    def __init__(self):
+        self._snapshots: Dict[str, SessionSnapshot] = {}
+
+    async def save(self, snapshot: SessionSnapshot):
+        self._snapshots[snapshot.session_id] = snapshot.model_copy()
+
+    async def load(self, session_id: str) -> Optional[SessionSnapshot]:
+        snapshot = self._snapshots.get(session_id)
+        return snapshot.model_copy() if snapshot is not None else None
+
+    async def delete(self, session_id: str):
+        self._snapshots.pop(session_id, None)
+
+    async def list(self) -> List[SessionSnapshot]:
+        return [snapshot.model_copy() for snapshot in self._snapshots.values()]
+
+
+class FileSessionStore(SessionStore):
+    """
+    One JSON file per session in `directory`. Files are replaced atomically, so a crash never leaves a partial
+    snapshot behind.
+    """
+    def __init__(self, directory: Union[str, Path]):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, session_id: str) -> Path:
+        return self.directory / f"{session_id}.json"
+
+    def _write(self, snapshot: SessionSnapshot):
+        fd, temporary_path = tempfile.mkstemp(dir=self.directory, prefix=".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as file:
+                file.write(snapshot.model_dump_json())
+            os.replace(temporary_path, self._path(snapshot.session_id))
+        except BaseException:
+            os.unlink(temporary_path)
+            raise
+
+    def _read(self, path: Path) -> Optional[SessionSnapshot]:
+        try:
+            return SessionSnapshot.model_validate_json(path.read_text())
+        except FileNotFoundError:
+            return None
+
+    async def save(self, snapshot: SessionSnapshot):
+        await asyncio.to_thread(self._write, snapshot)
+
+    async def load(self, session_id: str) -> Optional[SessionSnapshot]:
+        return await asyncio.to_thread(self._read, self._path(session_id))
+
+    async def delete(self, session_id: str):
+        await asyncio.to_thread(self._path(session_id).unlink, missing_ok=True)
+
+    async def list(self) -> List[SessionSnapshot]:
+        def read_all() -> List[SessionSnapshot]:
+            snapshots = (self._read(path) for path in sorted(self.directory.glob("*.json")))
+            return [snapshot for snapshot in snapshots if snapshot is not None]
+        return await asyncio.to_thread(read_all)
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Snapshots in a SQLite table, for many sessions or several workers sharing a disk.
+    """
+    def __init__(self, path: Union[str, Path], table: str = "ai_engine_sessions"):
+        if not table.isidentifier():
+            raise ValueError(f"Invalid table name: {table}")
+        self.path = str(path)
+        self.table = table
+        self._lock = asyncio.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                "session_id TEXT PRIMARY KEY, function_group TEXT NOT NULL, last_message_id TEXT, saved_at REAL NOT NULL"
+                ")"
+            )
+
+    async def _execute(self, query: str, parameters: tuple = ()) -> list:
+        def execute() -> list:
+            with self._connection:
+                return self._connection.execute(query, parameters).fetchall()
+        async with self._lock:
+            return await asyncio.to_thread(execute)
+
+    async def save(self, snapshot: SessionSnapshot):
+        await self._execute(
+            f"INSERT OR REPLACE INTO {self.table} (session_id, function_group, last_message_id, saved_at) "
+            "VALUES (?, ?, ?, ?)",
+            (snapshot.session_id, snapshot.function_group, snapshot.last_message_id, snapshot.saved_at)
+        )
+
+    async def load(self, session_id: str) -> Optional[SessionSnapshot]:
+        rows = await self._execute(
+            f"SELECT session_id, function_group, last_message_id, saved_at FROM {self.table} WHERE session_id = ?",
+            (session_id,)
+        )
+        return self._snapshot(rows[0]) if rows else None
+
+    async def delete(self, session_id: str):
+        await self._execute(f"DELETE FROM {self.table} WHERE session_id = ?", (session_id,))
+
+    async def list(self) -> List[SessionSnapshot]:
+        rows = await self._execute(f"SELECT session_id, function_group, last_message_id, saved_at FROM {self.table}")
+        return [self._snapshot(row) for row in rows]
+
+    @staticmethod
+    def _snapshot(row: tuple) -> SessionSnapshot:
+        session_id, function_group, last_message_id, saved_at = row
+        return SessionSnapshot(
+            session_id=session_id, function_group=function_group, last_message_id=last_message_id, saved_at=saved_at
+        )
+
+    def close(self):
+        self._connection.close()
@@ -0,0 +1,359 @@
+import asyncio
+import atexit
+import inspect
+import os
+import threading
+import weakref
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar, Union
+
+from .api_models.agents_json_messages import ConfirmationMessage, TaskOption, TaskSelectionMessage
+from .api_models.api_message import AgentMessage, ApiBaseMessage
+from .bulk import BulkReport
+from .client import AiEngine, CreditBalance, Function, FunctionGroup, FunctionGroupFunctions, Model, Session
+from .fan_out import ExecutionJob, ExecutionResult, MessageResponder
+from .llm_models import CustomModel, KnownModelId
+from .session_store import SessionSnapshot
+
+T = TypeVar("T")
+
+# Seconds given to the open clients to close when the process exits.
+SHUTDOWN_TIMEOUT = 10.0
+
+
+class BackgroundEventLoop:
+    """
+    An event loop running forever in a daemon thread, on which synchronous code schedules coroutines.
+
+    One is shared per process (see `get_background_loop`), so every `SyncAiEngine` reuses the same loop and their
+    connection pools stay alive between calls.
+    """
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name="ai-engine-sdk-loop", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    @property
+    def thread(self) -> threading.Thread:
+        return self._thread
+
+    def run(self, awaitable: Awaitable[T], timeout: Optional[float] = None) -> T:
+        """
+        Runs `awaitable` on the loop and blocks the calling thread until it's done. Thread safe.
+
+        Raises:
+            TimeoutError: when it takes more than `timeout` seconds (it's then cancelled).
+        """
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("Cannot block the background event loop from its own thread, await instead")
+        future = asyncio.run_coroutine_threadsafe(_await(awaitable), self.loop)
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise TimeoutError(f"Operation timed out after {timeout}s")
+
+    def stop(self):
+        if self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join()
+
+
+async def _await(awaitable: Awaitable[T]) -> T:
+    return await awaitable
+
+
+_background_loop: Optional[BackgroundEventLoop] = None
+_background_loop_pid: Optional[int] = None
+_background_loop_lock = threading.Lock()
+# The clients to close before stopping the loop at exit.
+_open_engines: "weakref.WeakSet[SyncAiEngine]" = weakref.WeakSet()
+
+
+def get_background_loop() -> BackgroundEventLoop:
+    """
+    Returns the background loop of the process, starting it on first use (and again in forked children).
+    """
+    global _background_loop, _background_loop_pid
+    with _background_loop_lock:
+        if _background_loop is None or _background_loop_pid != os.getpid():
+            if _background_loop is None:
+                # Forked children inherit the hook: it only handles the loop of the process running it.
+                atexit.register(_shutdown_background_loop)
+            _background_loop = BackgroundEventLoop()
+            _background_loop_pid = os.getpid()
+        return _background_loop
+
+
+def _shutdown_background_loop():
+    """
+    Closes the clients still open (session pools, session lifecycle, connections...) and stops the loop.
+    """
+    global _background_loop
+    with _background_loop_lock:
+        background_loop = _background_loop if _background_loop_pid == os.getpid() else None
+        _background_loop = None
+    if background_loop is None:
+        return
+    engines = [engine for engine in list(_open_engines) if engine._pid == os.getpid()]
+
+    async def close_engines():
+        await asyncio.gather(*(engine._ai_engine.aclose() for engine in engines), return_exceptions=True)
+
+    if engines:
+        try:
+            background_loop.run(close_engines(), SHUTDOWN_TIMEOUT)
+        except TimeoutError:
+            pass
+    background_loop.stop()
+
+
+class SyncSession:
+    """
+    Blocking counterpart of `Session`, see `SyncAiEngine`.
+    """
+    def __init__(self, session: Session, background_loop: BackgroundEventLoop, timeout: Optional[float] = None):
+        self.session = session
+        self._background_loop = background_loop
+        self._timeout = timeout
+        self._pid = os.getpid()
+
+    def _get_background_loop(self) -> BackgroundEventLoop:
+        if self._pid != os.getpid():
+            raise RuntimeError(
+                f"Session {self.session_id} was created before a fork, resume it from its snapshot in this process"
+            )
+        return self._background_loop
+
+    def _run(self, awaitable: Awaitable[T]) -> T:
+        return self._get_background_loop().run(awaitable, self._timeout)
+
+    @property
+    def session_id(self) -> str:
+        return self.session.session_id
+
+    @property
+    def function_group(self) -> str:
+        return self.session.function_group
+
+    @property
+    def last_message_id(self) -> Optional[str]:
+        return self.session.last_message_id
+
+    def snapshot(self) -> SessionSnapshot:
+        return self.session.snapshot()
+
+    def start(self, objective: str, context: Optional[str] = None):
+        self._run(self.session.start(objective, context))
+
+    def submit_task_selection(self, selection: TaskSelectionMessage, options: List[TaskOption]):
+        self._run(self.session.submit_task_selection(selection, options))
+
+    def submit_response(self, query: AgentMessage, response: str):
+        self._run(self.session.submit_response(query, response))
+
+    def submit_confirmation(self, confirmation: ConfirmationMessage):
+        self._run(self.session.submit_confirmation(confirmation))
+
+    def reject_confirmation(self, confirmation: ConfirmationMessage, reason: str):
+        self._run(self.session.reject_confirmation(confirmation, reason))
+
+    def get_messages(self) -> List[ApiBaseMessage]:
+        return self._run(self.session.get_messages())
+
+    def stream(self, **kwargs) -> Iterator[ApiBaseMessage]:
+        """
+        Blocking iterator over `Session.stream(**kwargs)`.
+        """
+        background_loop = self._get_background_loop()
+        messages = self.session.stream(**kwargs)
+        try:
+            while True:
+                try:
+                    # No timeout: waiting for the next message is what a stream does.
+                    yield background_loop.run(messages.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            background_loop.run(messages.aclose())
+
+    def execute_function(self, function_ids: List[str], objective: str, context: Optional[str] = None):
+        self._run(self.session.execute_function(function_ids, objective, context))
+
+    def delete(self):
+        self._run(self.session.delete())
+
+
+class SyncAiEngine:
+    """
+    Blocking client for synchronous code (WSGI workers, scripts, batch jobs...).
+
+    Every call runs on a background event loop shared by the whole process, with a single pooled `AiEngine`, so
+    connections are reused between calls. It is safe to call from many threads at once: the calls run concurrently
+    on the loop. In a forked child, the client is created again on the loop of the child at its first call (the
+    sessions created before the fork can't be used there: resume them from their snapshot). The clients still open
+    when the process exits are closed before the loop stops.
+
+        with SyncAiEngine(api_key) as ai_engine:
+            session = ai_engine.create_session(function_group=function_group.uuid)
+            session.start("Find a flight to Warsaw.")
+            for message in session.stream():
+                ...
+    """
+    def __init__(self, api_key: str, options: Optional[dict] = None, timeout: Optional[float] = None):
+        """
+        Args:
+            api_key (str): The AGENTVERSE API key used for authentication.
+            options (Optional[dict]): The `AiEngine` options.
+            timeout (Optional[float]): Seconds a call may block before raising `TimeoutError`. None waits forever.
+        """
+        self._api_key = api_key
+        self._options = options
+        self._timeout = timeout
+        self._pid: Optional[int] = None
+        self._bind()
+
+    def _bind(self):
+        """
+        Creates the client on the background loop of the current process.
+        """
+        self._background_loop = get_background_loop()
+
+        async def make_ai_engine() -> AiEngine:
+            return AiEngine(self._api_key, self._options)
+
+        self._ai_engine: AiEngine = self._background_loop.run(make_ai_engine(), self._timeout)
+        self._pid = os.getpid()
+        _open_engines.add(self)
+
+    @property
+    def ai_engine(self) -> AiEngine:
+        if self._pid != os.getpid():
+            # Forked: the loop of the parent (and the connections of its client) don't exist in this process.
+            self._bind()
+        return self._ai_engine
+
+    def _run(self, awaitable: Awaitable[T]) -> T:
+        return self._background_loop.run(awaitable, self._timeout)
+
+    def _call(self, method: Callable[..., Any], *args, **kwargs) -> Any:
+        async def call():
+            # Also the methods that are not coroutines (bulk operations, cache invalidation...) run on the loop,
+            # so that the client state is only ever touched from there.
+            result = method(*args, **kwargs)
+            return await result if inspect.isawaitable(result) else result
+        return self._run(call())
+
+    def _wrap_session(self, session: Session) -> SyncSession:
+        return SyncSession(session, self._background_loop, self._timeout)
+
+    def close(self):
+        ai_engine = self.ai_engine
+        _open_engines.discard(self)
+        self._run(ai_engine.aclose())
+
+    def __enter__(self) -> "SyncAiEngine":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    ####
+    # Function groups
+    ####
+    def get_function_groups(self) -> List[FunctionGroup]:
+        return self._call(self.ai_engine.get_function_groups)
+
+    def get_public_function_groups(self) -> List[FunctionGroup]:
+        return self._call(self.ai_engine.get_public_function_groups)
+
+    def get_private_function_groups(self) -> List[FunctionGroup]:
+        return self._call(self.ai_engine.get_private_function_groups)
+
+    def create_function_group(self, is_private: bool, name: str) -> FunctionGroup:
+        return self._call(self.ai_engine.create_function_group, is_private=is_private, name=name)
+
+    def delete_function_group(self, function_group_id: str):
+        return self._call(self.ai_engine.delete_function_group, function_group_id)
+
+    def get_function_group_by_function(self, function_id: str) -> List[FunctionGroup]:
+        return self._call(self.ai_engine.get_function_group_by_function, function_id)
+
+    def share_function_group(self, function_group_id: str, target_user_email: str) -> dict:
+        return self._call(
+            self.ai_engine.share_function_group, function_group_id=function_group_id, target_user_email=target_user_email
+        )
+
+    def invalidate_catalog_cache(self, *endpoints: str):
+        self._call(self.ai_engine.invalidate_catalog_cache, *endpoints)
+
+    ####
+    # Functions
+    ####
+    def get_functions_by_function_group(self, function_group_id: str) -> List[FunctionGroupFunctions]:
+        return self._call(self.ai_engine.get_functions_by_function_group, function_group_id)
+
+    def get_functions(self) -> List[Function]:
+        return self._call(self.ai_engine.get_functions)
+
+    ####
+    # Model and credit
+    ####
+    def get_models(self) -> List[Model]:
+        return self._call(self.ai_engine.get_models)
+
+    def get_credits(self) -> CreditBalance:
+        return self._call(self.ai_engine.get_credits)
+
+    def get_model_credits(self, model: Union[KnownModelId, CustomModel]) -> int:
+        return self._call(self.ai_engine.get_model_credits, model)
+
+    def get_model_credits_bulk(self, models: Iterable[Union[KnownModelId, CustomModel]]) -> Dict[str, int]:
+        return self._call(self.ai_engine.get_model_credits_bulk, models)
+
+    ####
+    # Session
+    ####
+    def create_session(self, function_group: str, opts: Optional[dict] = None) -> SyncSession:
+        return self._wrap_session(self._call(self.ai_engine.create_session, function_group, opts))
+
+    def resume_session(self, snapshot: Union[SessionSnapshot, str]) -> SyncSession:
+        return self._wrap_session(self._call(self.ai_engine.resume_session, snapshot))
+
+    ####
+    # Bulk
+    ####
+    def create_function_groups(self, names: Iterable[str], is_private: bool = True, concurrency: int = 16) -> BulkReport[str, FunctionGroup]:
+        return self._call(self.ai_engine.create_function_groups, names, is_private=is_private, concurrency=concurrency)
+
+    def share_function_groups(
+            self,
+            function_group_ids: Iterable[str],
+            target_user_emails: Iterable[str],
+            concurrency: int = 16
+    ) -> BulkReport[Tuple[str, str], dict]:
+        return self._call(self.ai_engine.share_function_groups, function_group_ids, target_user_emails, concurrency)
+
+    def delete_function_groups(self, function_group_ids: Iterable[str], concurrency: int = 16) -> BulkReport[str, dict]:
+        return self._call(self.ai_engine.delete_function_groups, function_group_ids, concurrency)
+
+    def execute_functions(
+            self,
+            function_group: str,
+            jobs: Iterable[ExecutionJob],
+            concurrency: int = 16,
+            timeout: Optional[float] = 120.0,
+            deadline: Optional[float] = None,
+            respond: Optional[MessageResponder] = None
+    ) -> BulkReport[ExecutionJob, ExecutionResult]:
+        """
+        See `AiEngine.execute_functions`. `respond`, when given, is a coroutine function: it runs on the background loop.
+        """
+        return self._call(
+            self.ai_engine.execute_functions, function_group, jobs,
+            concurrency=concurrency, timeout=timeout, deadline=deadline, respond=respond
+        )
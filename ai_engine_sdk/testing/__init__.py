@@ -0,0 +1 @@
+from .fake_agentverse import FakeAgentverse, FakeChatSession, FakeResponse, default_conversation_script
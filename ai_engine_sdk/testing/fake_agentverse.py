@@ -0,0 +1,471 @@
+"""
+In-process stand-in for the Agentverse endpoints used by the SDK, for offline tests and benchmarks.
+
+    async with FakeAgentverse(latency=0.05, jitter=0.02, rate_limit_rate=0.01) as fake:
+        ai_engine = AiEngine(fake.api_key, options={"api_base_url": fake.url})
+        ...
+
+Chat sessions follow a scripted conversation (see `default_conversation_script`): the objective is answered with
+a task list, the task selection with a confirmation request and the confirmation with a final agent message and
+a stop message.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import random
+import re
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional, Pattern, Tuple, Union
+from urllib.parse import parse_qs, urlsplit
+from uuid import uuid4
+
+logger = logging.getLogger(__name__)
+
+
+class FakeResponse:
+    def __init__(self, status: int, payload: Any = None, headers: Optional[Dict[str, str]] = None):
+        self.status = status
+        self.headers = {"Content-Type": "application/json", **(headers or {})}
+        self.body: bytes = json.dumps(payload).encode() if payload is not None else b""
+
+
+class FakeChatSession:
+    def __init__(self, session_id: str, function_group: Optional[str], model: str, email: str):
+        self.session_id = session_id
+        self.function_group = function_group
+        self.model = model
+        self.email = email
+        self.submitted: List[dict] = []
+        # (available_at, raw message) in delivery order.
+        self.messages: List[Tuple[float, dict]] = []
+        self.deleted = False
+
+    def add_message(self, message: dict, delay: float = 0.0):
+        loop_time = asyncio.get_running_loop().time()
+        self.messages.append((loop_time + delay, message))
+
+
+ConversationScript = Callable[["FakeAgentverse", FakeChatSession, dict], List[dict]]
+
+
+def _raw_message(message_type: str, **fields) -> dict:
+    return {
+        "message_id": str(uuid4()),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "type": message_type,
+        **fields,
+    }
+
+
+def default_conversation_script(fake: "FakeAgentverse", session: FakeChatSession, payload: dict) -> List[dict]:
+    """
+    Returns the raw messages the agent answers to a submitted payload.
+    """
+    payload_type = payload.get("type")
+    if payload_type == "start":
+        return [
+            _raw_message("agent_info", agent_info=f"Looking for functions to achieve: {payload.get('objective', '')}"),
+            _raw_message("agent_json", agent_json={
+                "type": "task_list",
+                "text": "Please select one of the following tasks",
+                "options": [{"key": i, "value": f["name"]} for i, f in enumerate(fake.functions.values())],
+                "context_json": None,
+            }),
+        ]
+    if payload_type == "user_json":
+        return [
+            _raw_message("agent_json", agent_json={
+                "type": "context_json",
+                "text": "Please confirm the following details",
+                "options": None,
+                "context_json": {"selection": payload.get("user_json", {}).get("selection", [])},
+            }),
+        ]
+    if payload_type == "user_message":
+        if payload.get("user_message") == "confirm":
+            return [
+                _raw_message("agent_message", agent_message="Your task has been completed"),
+                _raw_message("stop"),
+            ]
+        return [_raw_message("agent_message", agent_message="Could you give me more details?")]
+    if payload_type == "execute_functions":
+        return [
+            _raw_message("agent_info", agent_info=f"Executing {len(payload.get('functions', []))} function(s)"),
+            _raw_message("agent_message", agent_message="Execution finished"),
+            _raw_message("stop"),
+        ]
+    return [_raw_message("agent_message", agent_message=f"Unsupported payload: {payload_type}")]
+
+
+Handler = Callable[["FakeAgentverse", re.Match, Mapping[str, List[str]], Any], Awaitable[FakeResponse]]
+
+
+class FakeAgentverse:
+    """
+    Fake Agentverse API.
+
+    It can be served over HTTP on localhost (`async with FakeAgentverse() as fake`, then use `fake.url` as
+    `api_base_url`) or called directly through `handle`.
+
+    Attributes:
+        public_function_groups, private_function_groups (Dict[str, dict]): The function groups, by uuid.
+        functions (Dict[str, dict]): The functions, by uuid.
+        group_functions (Dict[str, List[str]]): The uuids of the functions of every function group.
+        sessions (Dict[str, FakeChatSession]): The chat sessions created so far.
+        request_counts (Counter): Number of requests received per `(method, route template)`.
+        response_counts (Counter): Number of responses sent per `(method, route template, status)`.
+    """
+    def __init__(
+            self,
+            api_key: str = "fake-api-key",
+            latency: float = 0.0,
+            jitter: float = 0.0,
+            error_rate: float = 0.0,
+            rate_limit_rate: float = 0.0,
+            retry_after: float = 1.0,
+            reply_delay: float = 0.0,
+            conversation_script: ConversationScript = default_conversation_script,
+            model_tokens: Optional[Dict[str, int]] = None,
+            credits: Tuple[int, int] = (1000, 0),
+            seed: Optional[int] = None,
+            paginate: bool = False,
+            host: str = "127.0.0.1",
+            port: int = 0,
+    ):
+        """
+        Args:
+            api_key (str): The API key expected in the `Authorization` header, None accepts any.
+            latency (float): Seconds added to every response.
+            jitter (float): Maximum random seconds added on top of `latency`.
+            error_rate (float): Probability of answering any request with a 500 error.
+            rate_limit_rate (float): Probability of answering any request with a 429 error.
+            retry_after (float): Seconds sent in the `Retry-After` header of the 429 responses.
+            reply_delay (float): Seconds between a submitted message and the agent replies becoming available.
+            conversation_script (ConversationScript): Builds the agent replies to every submitted payload.
+            model_tokens (Optional[Dict[str, int]]): Remaining tokens per model id.
+            credits (Tuple[int, int]): Total and used credit of the account.
+            seed (Optional[int]): Seed for the random faults and latency, for reproducible runs.
+            paginate (bool): Whether the catalog endpoints honour the `limit` and `offset` query parameters, answering
+                with `{"items": [...], "total": n}` (`{"functions": [...], "total": n}` for the functions of a group).
+            host (str): Interface the HTTP server listens on.
+            port (int): Port the HTTP server listens on, 0 picks a free one.
+        """
+        self.api_key = api_key
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.reply_delay = reply_delay
+        self.conversation_script = conversation_script
+        self.model_tokens: Dict[str, int] = dict(model_tokens) if model_tokens is not None else {
+            "thoughtful-01": 10000,
+            "talkative-01": 10000,
+            "creative-01": 10000,
+            "gemini-pro": 10000,
+            "next-gen": 10000,
+            "ml-recommender-01": 10000,
+        }
+        self.total_credit, self.used_credit = credits
+        self._random = random.Random(seed)
+        self.paginate = paginate
+        self._host = host
+        self._port = port
+        self._runner = None
+        self.url: Optional[str] = None
+
+        self.public_function_groups: Dict[str, dict] = {}
+        self.private_function_groups: Dict[str, dict] = {}
+        self.functions: Dict[str, dict] = {}
+        self.group_functions: Dict[str, List[str]] = {}
+        self.permissions: Dict[str, List[str]] = {}
+        self.sessions: Dict[str, FakeChatSession] = {}
+        self.request_counts: Counter = Counter()
+        self.response_counts: Counter = Counter()
+        self._injected_failures: List[Tuple[int, Dict[str, str]]] = []
+
+        public_group = self.add_function_group("Fetch Verified", is_private=False)
+        private_group = self.add_function_group("My Functions", is_private=True)
+        for name in ("Flight Finder", "Hotel Booking", "Weather Forecast"):
+            self.add_function(name, function_groups=[public_group["uuid"]])
+        self.add_function("My Private Function", function_groups=[private_group["uuid"]])
+
+    ####
+    # Seeding
+    ####
+    def add_function_group(self, name: str, is_private: bool = True, uuid: Optional[str] = None) -> dict:
+        group = {"uuid": uuid or str(uuid4()), "name": name, "isPrivate": is_private}
+        groups = self.private_function_groups if is_private else self.public_function_groups
+        groups[group["uuid"]] = group
+        self.group_functions.setdefault(group["uuid"], [])
+        return group
+
+    def add_function(self, name: str, function_groups: List[str] = (), uuid: Optional[str] = None) -> dict:
+        function = {"uuid": uuid or str(uuid4()), "name": name}
+        self.functions[function["uuid"]] = function
+        for group_uuid in function_groups:
+            self.group_functions.setdefault(group_uuid, []).append(function["uuid"])
+        return function
+
+    def inject_failures(self, status: int, count: int = 1, headers: Optional[Dict[str, str]] = None):
+        """
+        Answers the next `count` requests with `status`, whatever they are.
+        """
+        self._injected_failures.extend([(status, dict(headers or {}))] * count)
+
+    def get_function_group(self, uuid: str) -> Optional[dict]:
+        return self.private_function_groups.get(uuid) or self.public_function_groups.get(uuid)
+
+    ####
+    # HTTP server
+    ####
+    async def __aenter__(self) -> "FakeAgentverse":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.stop()
+
+    async def start(self):
+        from aiohttp import web
+
+        async def handle_http(request: web.Request) -> web.Response:
+            body = await request.read()
+            response = await self.handle(
+                method=request.method,
+                url=request.path_qs,
+                headers=request.headers,
+                body=body or None,
+            )
+            return web.Response(status=response.status, body=response.body, headers=response.headers)
+
+        app = web.Application()
+        app.router.add_route("*", "/{tail:.*}", handle_http)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self._host, self._port)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.url = f"http://{self._host}:{port}"
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+            self.url = None
+
+    ####
+    # Request handling
+    ####
+    async def handle(
+            self,
+            method: str,
+            url: str,
+            headers: Optional[Mapping[str, str]] = None,
+            body: Optional[Union[str, bytes]] = None
+    ) -> FakeResponse:
+        """
+        Answers a request to the fake API. `url` may be absolute or just the path and query string.
+        """
+        split_url = urlsplit(url)
+        route = self._match_route(method, split_url.path)
+        route_name = route[0] if route else split_url.path
+        self.request_counts[(method, route_name)] += 1
+
+        response = await self._respond(
+            method=method,
+            route=route,
+            path=split_url.path,
+            query=parse_qs(split_url.query),
+            headers=headers or {},
+            payload=json.loads(body) if body else None
+        )
+        self.response_counts[(method, route_name, response.status)] += 1
+        return response
+
+    async def _respond(
+            self,
+            method: str,
+            route: Optional[Tuple[str, re.Match, Handler]],
+            path: str,
+            query: Mapping[str, List[str]],
+            headers: Mapping[str, str],
+            payload: Any
+    ) -> FakeResponse:
+        delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay:
+            await asyncio.sleep(delay)
+
+        if self.api_key is not None and headers.get("Authorization") != f"Bearer {self.api_key}":
+            return FakeResponse(401, {"detail": "Invalid API key"})
+        if self._injected_failures:
+            status, failure_headers = self._injected_failures.pop(0)
+            return FakeResponse(status, {"detail": "Injected failure"}, headers=failure_headers)
+        if self.rate_limit_rate and self._random.random() < self.rate_limit_rate:
+            return FakeResponse(429, {"detail": "Too many requests"}, headers={"Retry-After": str(self.retry_after)})
+        if self.error_rate and self._random.random() < self.error_rate:
+            return FakeResponse(500, {"detail": "Injected error"})
+        if route is None:
+            return FakeResponse(404, {"detail": f"No route for {method} {path}"})
+
+        _, match, handler = route
+        response = await handler(self, match, query, payload)
+        if method == "GET" and response.status == 200:
+            etag = f'"{hashlib.sha1(response.body).hexdigest()}"'
+            if headers.get("If-None-Match") == etag:
+                return FakeResponse(304, headers={"ETag": etag})
+            response.headers["ETag"] = etag
+        return response
+
+    def _match_route(self, method: str, path: str) -> Optional[Tuple[str, re.Match, Handler]]:
+        for route_method, template, pattern, handler in _ROUTES:
+            if route_method == method:
+                match = pattern.fullmatch(path)
+                if match:
+                    return template, match, handler
+        return None
+
+    def _page(self, query: Mapping[str, List[str]], items: list, items_key: Optional[str] = None) -> FakeResponse:
+        if not self.paginate or "limit" not in query:
+            return FakeResponse(200, {items_key: items} if items_key else items)
+        offset = int(query.get("offset", ["0"])[0])
+        limit = int(query["limit"][0])
+        return FakeResponse(200, {items_key or "items": items[offset:offset + limit], "total": len(items)})
+
+    async def _public_function_groups(self, match, query, payload) -> FakeResponse:
+        return self._page(query, list(self.public_function_groups.values()))
+
+    async def _private_function_groups(self, match, query, payload) -> FakeResponse:
+        return self._page(query, list(self.private_function_groups.values()))
+
+    async def _create_function_group(self, match, query, payload) -> FakeResponse:
+        group = self.add_function_group(name=payload["name"], is_private=payload.get("isPrivate", True))
+        return FakeResponse(201, group)
+
+    async def _delete_function_group(self, match, query, payload) -> FakeResponse:
+        uuid = match["group"]
+        if self.private_function_groups.pop(uuid, None) is None and self.public_function_groups.pop(uuid, None) is None:
+            return FakeResponse(404, {"detail": "Function group not found"})
+        self.group_functions.pop(uuid, None)
+        return FakeResponse(200, {})
+
+    async def _share_function_group(self, match, query, payload) -> FakeResponse:
+        uuid = match["group"]
+        if self.get_function_group(uuid) is None:
+            return FakeResponse(404, {"detail": "Function group not found"})
+        self.permissions.setdefault(uuid, []).append(payload["user_email_to_add_permission"])
+        return FakeResponse(200, {"function_group": uuid, "user": payload["user_email_to_add_permission"]})
+
+    async def _function_group_functions(self, match, query, payload) -> FakeResponse:
+        uuid = match["group"]
+        if self.get_function_group(uuid) is None:
+            return FakeResponse(404, {"detail": "Function group not found"})
+        return self._page(query, [self.functions[f]["name"] for f in self.group_functions.get(uuid, [])], "functions")
+
+    async def _function_groups_by_function(self, match, query, payload) -> FakeResponse:
+        function_uuid = match["function"]
+        if function_uuid not in self.functions:
+            return FakeResponse(404, {"detail": "Function not found"})
+        groups = [
+            self.get_function_group(group_uuid)
+            for group_uuid, function_uuids in self.group_functions.items()
+            if function_uuid in function_uuids and self.get_function_group(group_uuid) is not None
+        ]
+        return FakeResponse(200, groups)
+
+    async def _functions(self, match, query, payload) -> FakeResponse:
+        return self._page(query, list(self.functions.values()))
+
+    async def _credit_info(self, match, query, payload) -> FakeResponse:
+        return FakeResponse(200, {
+            "total_credit": self.total_credit,
+            "used_credit": self.used_credit,
+            "available_credit": self.total_credit - self.used_credit,
+        })
+
+    async def _remaining_tokens(self, match, query, payload) -> FakeResponse:
+        # Like the real endpoint: one `models` parameter, a comma-separated list of model ids.
+        if len(query.get("models", [])) > 1:
+            return FakeResponse(422, {"detail": "models must be a single comma-separated list"})
+        model_ids = [m for value in query.get("models", []) for m in value.split(",") if m]
+        return FakeResponse(200, {
+            "model_tokens": {m: self.model_tokens[m] for m in model_ids if m in self.model_tokens}
+        })
+
+    async def _create_session(self, match, query, payload) -> FakeResponse:
+        session = FakeChatSession(
+            session_id=str(uuid4()),
+            function_group=payload.get("functionGroup"),
+            model=payload.get("requestedModel"),
+            email=payload.get("email", ""),
+        )
+        self.sessions[session.session_id] = session
+        return FakeResponse(200, {
+            "session_id": session.session_id,
+            "function_group": session.function_group,
+            "model": session.model,
+            "num_messages": 0,
+        })
+
+    def _get_live_session(self, session_id: str) -> Optional[FakeChatSession]:
+        session = self.sessions.get(session_id)
+        return None if session is None or session.deleted else session
+
+    async def _submit(self, match, query, payload) -> FakeResponse:
+        session = self._get_live_session(match["session"])
+        if session is None:
+            return FakeResponse(404, {"detail": "Session not found"})
+        message = payload["payload"]
+        session.submitted.append(message)
+        for i, reply in enumerate(self.conversation_script(self, session, message)):
+            session.add_message(reply, delay=self.reply_delay * (i + 1))
+        return FakeResponse(200, {})
+
+    async def _new_messages(self, match, query, payload) -> FakeResponse:
+        session = self._get_live_session(match["session"])
+        if session is None:
+            return FakeResponse(404, {"detail": "Session not found"})
+        now = asyncio.get_running_loop().time()
+        available = [message for available_at, message in session.messages if available_at <= now]
+        last_message_id = query.get("last_message_id", [None])[0]
+        if last_message_id is not None:
+            ids = [m["message_id"] for m in available]
+            if last_message_id in ids:
+                available = available[ids.index(last_message_id) + 1:]
+        return FakeResponse(200, {"agent_response": [json.dumps(m) for m in available]})
+
+    async def _delete_session(self, match, query, payload) -> FakeResponse:
+        session = self._get_live_session(match["session"])
+        if session is None:
+            return FakeResponse(404, {"detail": "Session not found"})
+        session.deleted = True
+        return FakeResponse(200, {})
+
+
+_ROUTE_TEMPLATES: List[Tuple[str, str, Handler]] = [
+    ("GET", "/v1beta1/function-groups/public/", FakeAgentverse._public_function_groups),
+    ("GET", "/v1beta1/function-groups/", FakeAgentverse._private_function_groups),
+    ("POST", "/v1beta1/function-groups/", FakeAgentverse._create_function_group),
+    ("DELETE", "/v1beta1/function-groups/{group}/", FakeAgentverse._delete_function_group),
+    ("PUT", "/v1beta1/function-groups/{group}/permissions/", FakeAgentverse._share_function_group),
+    ("GET", "/v1beta1/function-groups/{group}/functions/", FakeAgentverse._function_group_functions),
+    ("GET", "/v1beta1/function/{function}/groups", FakeAgentverse._function_groups_by_function),
+    ("GET", "/v1beta1/functions/", FakeAgentverse._functions),
+    ("GET", "/v1beta1/engine/credit/info", FakeAgentverse._credit_info),
+    ("GET", "/v1beta1/engine/credit/remaining_tokens", FakeAgentverse._remaining_tokens),
+    ("POST", "/v1beta1/engine/chat/sessions", FakeAgentverse._create_session),
+    ("POST", "/v1beta1/engine/chat/sessions/{session}/submit", FakeAgentverse._submit),
+    ("GET", "/v1beta1/engine/chat/sessions/{session}/new-messages", FakeAgentverse._new_messages),
+    ("DELETE", "/v1beta1/engine/chat/sessions/{session}", FakeAgentverse._delete_session),
+]
+
+
+def _compile_route_template(template: str) -> Pattern:
+    return re.compile(re.sub(r"\\\{(\w+)\\\}", r"(?P<\1>[^/]+)", re.escape(template)))
+
+
+_ROUTES: List[Tuple[str, str, Pattern, Handler]] = [
+    (method, template, _compile_route_template(template), handler) for method, template, handler in _ROUTE_TEMPLATES
+]
@@ -0,0 +1,282 @@
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Mapping, Optional, Protocol, Union
+
+from . import json_backend
+from .errors import ApiConnectionError
+
+if TYPE_CHECKING:
+    import aiohttp
+    import httpx
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class TransportResponse:
+    """
+    A fully read HTTP response, detached from the connection it came from.
+
+    Attributes:
+        status (int): The HTTP status code.
+        headers (Mapping[str, str]): The response headers.
+        body (bytes): The raw response body.
+    """
+    status: int
+    headers: Mapping[str, str] = field(default_factory=dict)
+    body: bytes = b""
+
+    def json(self) -> Any:
+        return json_backend.loads(self.body) if self.body else None
+
+    def header(self, name: str) -> Optional[str]:
+        """
+        Returns the value of a header, looked up case-insensitively.
+        """
+        name = name.lower()
+        return next((value for key, value in self.headers.items() if key.lower() == name), None)
+
+
+class Transport(ABC):
+    """
+    Sends the HTTP requests of an `AiEngine` and of its sessions (option `transport`).
+
+    Implementations return fully read responses and raise `ApiConnectionError` when a request could not be
+    completed, HTTP error statuses are handled by the client.
+    """
+    @abstractmethod
+    async def request(
+            self,
+            method: str,
+            url: str,
+            headers: Optional[Mapping[str, str]] = None,
+            data: Optional[str] = None
+    ) -> TransportResponse:
+        ...
+
+    async def aclose(self):
+        """
+        Releases the connections. The transport can still be used afterwards.
+        """
+
+    async def __aenter__(self) -> "Transport":
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+
+
+class AiohttpTransport(Transport):
+    """
+    Long-lived HTTP transport backed by a single pooled `aiohttp.ClientSession`.
+
+    Connections are kept alive between requests and DNS lookups are cached, so consecutive calls to the
+    ai-engine API (e.g. `Session.get_messages` polls) reuse the same TCP+TLS connection instead of paying a
+    new handshake each time.
+
+    The underlying `ClientSession` is created lazily on the first request (it has to be bound to a running
+    event loop) and recreated if the transport is later used from a different event loop. aiohttp itself is only
+    imported then, it is the bulk of the import time of the SDK.
+    """
+    def __init__(
+            self,
+            max_connections: int = 100,
+            max_connections_per_host: int = 0,
+            keepalive_timeout: float = 30.0,
+            dns_cache_ttl: Optional[int] = 300,
+            request_timeout: Optional[float] = None,
+    ):
+        """
+        Args:
+            max_connections (int): Total number of simultaneous connections in the pool (0 means unlimited).
+            max_connections_per_host (int): Simultaneous connections to the same host (0 means unlimited).
+            keepalive_timeout (float): Seconds an idle connection is kept open for reuse.
+            dns_cache_ttl (Optional[int]): Seconds a DNS resolution is cached (None caches forever).
+            request_timeout (Optional[float]): Total timeout, in seconds, for a single request.
+        """
+        self._max_connections = max_connections
+        self._max_connections_per_host = max_connections_per_host
+        self._keepalive_timeout = keepalive_timeout
+        self._dns_cache_ttl = dns_cache_ttl
+        self._request_timeout = request_timeout
+        self._session: Optional["aiohttp.ClientSession"] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_session(self) -> "aiohttp.ClientSession":
+        import aiohttp
+
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            if self._session is not None and not self._session.closed:
+                logger.debug("Transport used from a new event loop, opening a new connection pool")
+            connector = aiohttp.TCPConnector(
+                limit=self._max_connections,
+                limit_per_host=self._max_connections_per_host,
+                keepalive_timeout=self._keepalive_timeout,
+                ttl_dns_cache=self._dns_cache_ttl,
+                use_dns_cache=True,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self._request_timeout),
+            )
+            self._loop = loop
+        return self._session
+
+    async def request(
+            self,
+            method: str,
+            url: str,
+            headers: Optional[Mapping[str, str]] = None,
+            data: Optional[str] = None
+    ) -> TransportResponse:
+        import aiohttp
+
+        session = self._get_session()
+        try:
+            async with session.request(method, url, headers=headers, data=data) as response:
+                body = await response.read()
+                return TransportResponse(status=response.status, headers=dict(response.headers), body=body)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise ApiConnectionError(f"{method} {url} failed: {e!r}") from e
+
+    async def aclose(self):
+        """
+        Closes the pooled connections. The transport can still be used afterwards, a new pool is opened on demand.
+        """
+        if self._session is not None and not self._session.closed and self._loop is asyncio.get_running_loop():
+            await self._session.close()
+        self._session = None
+        self._loop = None
+
+
+class HttpxTransport(Transport):
+    """
+    HTTP/2 transport backed by a pooled `httpx.AsyncClient`. Requires the `httpx[http2]` package.
+
+    With HTTP/2 the concurrent requests to a host are multiplexed over a single connection, so thousands of
+    sessions polling at once need a handful of connections instead of one each. Servers that don't negotiate
+    HTTP/2 are spoken to in HTTP/1.1, like with `AiohttpTransport`.
+
+    The client is created on the first request and recreated if the transport is later used from a different
+    event loop.
+    """
+    def __init__(
+            self,
+            max_connections: int = 100,
+            keepalive_timeout: float = 30.0,
+            request_timeout: Optional[float] = None,
+            http2: bool = True,
+    ):
+        """
+        Args:
+            max_connections (int): Total number of simultaneous connections in the pool (0 means unlimited).
+            keepalive_timeout (float): Seconds an idle connection is kept open for reuse.
+            request_timeout (Optional[float]): Total timeout, in seconds, for a single request.
+            http2 (bool): Whether to negotiate HTTP/2.
+        """
+        self._max_connections = max_connections
+        self._keepalive_timeout = keepalive_timeout
+        self._request_timeout = request_timeout
+        self._http2 = http2
+        self._client: Optional["httpx.AsyncClient"] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_client(self) -> "httpx.AsyncClient":
+        try:
+            import httpx
+        except ImportError as error:
+            raise ImportError(
+                "HttpxTransport requires the httpx package with HTTP/2 support: pip install 'httpx[http2]'"
+            ) from error
+
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._loop is not loop:
+            if self._client is not None and not self._client.is_closed:
+                logger.debug("Transport used from a new event loop, opening a new connection pool")
+            self._client = httpx.AsyncClient(
+                http2=self._http2,
+                limits=httpx.Limits(
+                    max_connections=self._max_connections or None,
+                    keepalive_expiry=self._keepalive_timeout,
+                ),
+                timeout=httpx.Timeout(self._request_timeout),
+            )
+            self._loop = loop
+        return self._client
+
+    async def request(
+            self,
+            method: str,
+            url: str,
+            headers: Optional[Mapping[str, str]] = None,
+            data: Optional[str] = None
+    ) -> TransportResponse:
+        client = self._get_client()
+        import httpx
+
+        try:
+            response = await client.request(method, url, headers=headers, content=data)
+        except httpx.HTTPError as e:
+            raise ApiConnectionError(f"{method} {url} failed: {e!r}") from e
+        return TransportResponse(status=response.status_code, headers=dict(response.headers), body=response.content)
+
+    async def aclose(self):
+        if self._client is not None and not self._client.is_closed and self._loop is asyncio.get_running_loop():
+            await self._client.aclose()
+        self._client = None
+        self._loop = None
+
+
+class HandlerResponse(Protocol):
+    status: int
+    headers: Mapping[str, str]
+    body: bytes
+
+
+RequestHandler = Callable[[str, str, Optional[Mapping[str, str]], Optional[str]], Awaitable[HandlerResponse]]
+
+
+class InMemoryTransport(Transport):
+    """
+    Calls a Python handler instead of sending requests over the network, e.g. `FakeAgentverse.handle`:
+
+        ai_engine = AiEngine(fake.api_key, options={"transport": InMemoryTransport(fake.handle)})
+
+    Useful in tests, and in benchmarks to measure the overhead of the SDK apart from the cost of the sockets.
+    """
+    def __init__(self, handler: RequestHandler):
+        """
+        Args:
+            handler (RequestHandler): Called with the method, the absolute URL, the headers and the body of every
+                request. Returns an object with `status`, `headers` and `body` (bytes) attributes.
+        """
+        self._handler = handler
+
+    async def request(
+            self,
+            method: str,
+            url: str,
+            headers: Optional[Mapping[str, str]] = None,
+            data: Optional[str] = None
+    ) -> TransportResponse:
+        response = await self._handler(method, url, headers, data)
+        return TransportResponse(status=response.status, headers=dict(response.headers), body=response.body)
+
+
+def make_transport(transport: Union[Transport, str, None] = None, **pool_options) -> Transport:
+    """
+    Returns `transport` if it's already a `Transport`, otherwise builds the transport named `aiohttp` (default) or
+    `http2` with the given pool options.
+    """
+    if isinstance(transport, Transport):
+        return transport
+    if transport is None or transport == "aiohttp":
+        return AiohttpTransport(**pool_options)
+    if transport == "http2":
+        pool_options.pop("max_connections_per_host", None)
+        pool_options.pop("dns_cache_ttl", None)
+        return HttpxTransport(**pool_options)
+    raise ValueError(f"Unknown transport: {transport!r}, expected a Transport, 'aiohttp' or 'http2'")
@@ -1,4 +1,9 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import Dict, List
+
 from ai_engine_sdk import AiEngine, FunctionGroup
+from ai_engine_sdk.bulk import BulkOperation, BulkOperationError, BulkReport
 
 
 class CreateFunctionGroupAndShare:
@@ -25,3 +30,72 @@ class CreateFunctionGroupAndShare:
 
         return res
 
+
+@dataclass
+class ProvisionedFunctionGroup:
+    """
+    A function group created and shared by `CreateFunctionGroupsAndShare`.
+
+    Attributes:
+        function_group_id (str): The uuid of the created group.
+        shares (List[dict]): The response of every share, in the order of the emails.
+    """
+    function_group_id: str
+    shares: List[dict] = field(default_factory=list)
+
+
+class FunctionGroupSharingError(BulkOperationError):
+    """
+    A function group was created but sharing it failed for some users, see `report`. The group is not deleted:
+    `function_group_id` identifies it, to share it again or delete it.
+    """
+    def __init__(self, function_group_id: str, report: BulkReport):
+        super().__init__(report)
+        self.function_group_id = function_group_id
+
+    def __str__(self) -> str:
+        return f"Function group {self.function_group_id} was created, but sharing it failed: {super().__str__()}"
+
+
+class CreateFunctionGroupsAndShare:
+    """
+    Batch version of `CreateFunctionGroupAndShare`: creates every group and shares it with its users. At most
+    `concurrency` requests (creations and shares together) are in flight at the same time.
+    """
+    client: AiEngine
+
+    def __init__(self, client: AiEngine, concurrency: int = 16):
+        self.client = client
+        self.concurrency = concurrency
+
+    def __call__(
+            self,
+            fg_is_private: bool,
+            target_user_emails_by_fg_name: Dict[str, List[str]],
+    ) -> BulkOperation[str, ProvisionedFunctionGroup]:
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def share(function_group_id: str, target_user_email: str) -> dict:
+            async with semaphore:
+                return await self.client.share_function_group(
+                    function_group_id=function_group_id,
+                    target_user_email=target_user_email
+                )
+
+        async def provision(fg_name: str) -> ProvisionedFunctionGroup:
+            async with semaphore:
+                created_function_group: FunctionGroup = await self.client.create_function_group(is_private=fg_is_private, name=fg_name)
+            function_group_id = created_function_group.uuid
+            share_report = await BulkOperation(
+                items=target_user_emails_by_fg_name[fg_name],
+                operation=lambda email: share(function_group_id, email),
+                concurrency=self.concurrency
+            )
+            if not share_report.ok:
+                raise FunctionGroupSharingError(function_group_id, share_report)
+            return ProvisionedFunctionGroup(
+                function_group_id=function_group_id,
+                shares=[item_result.result for item_result in share_report.results]
+            )
+
+        return BulkOperation(items=target_user_emails_by_fg_name, operation=provision, concurrency=self.concurrency)
@@ -0,0 +1,56 @@
+"""
+Measures the cold-start cost of the SDK: the time to import it in a fresh interpreter, and the modules that weigh
+the most (from `python -X importtime`).
+
+    python -m benchmarks.bench_import_time --runs 20
+    python -m benchmarks.bench_import_time --statement "from ai_engine_sdk import AiEngine"
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+
+def import_time(statement: str) -> float:
+    """
+    Returns the seconds `statement` takes in a new interpreter, net of the interpreter startup.
+    """
+    code = f"import time; started_at = time.perf_counter(); {statement}; print(time.perf_counter() - started_at)"
+    output = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+    return float(output)
+
+
+def heaviest_modules(statement: str, count: int) -> list[tuple[int, str]]:
+    """
+    Returns the `count` modules with the highest cumulative import time (µs) when running `statement`.
+    """
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement], check=True, capture_output=True, text=True
+    ).stderr
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules.append((int(cumulative), name.strip()))
+    return sorted(modules, reverse=True)[:count]
+
+
+def run(statement: str, runs: int, top: int):
+    import_time(statement)  # Warm up the filesystem caches and the bytecode.
+    timings = [import_time(statement) for _ in range(runs)]
+    print(
+        f"{statement}: median {statistics.median(timings) * 1e3:.1f} ms, "
+        f"min {min(timings) * 1e3:.1f} ms over {runs} runs"
+    )
+    for cumulative, name in heaviest_modules(statement, top):
+        print(f"{cumulative / 1e3:10.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--runs", type=int, default=20)
+    parser.add_argument("-s", "--statement", default="import ai_engine_sdk")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+    run(args.statement, args.runs, args.top)
@@ -0,0 +1,86 @@
+"""
+Measures the cost of decoding `new-messages` responses into SDK messages, per JSON backend: CPU time and memory
+allocated per message.
+
+    python -m benchmarks.bench_message_decoding --iterations 2000
+"""
+import argparse
+import json
+import timeit
+import tracemalloc
+from unittest import mock
+
+from ai_engine_sdk import json_backend
+from ai_engine_sdk.api_models.decoding import decode_message, load_raw_messages
+
+
+def build_agent_response() -> list[str]:
+    messages = [
+        {
+            "message_id": "task-list", "timestamp": "2024-01-01T00:00:00", "type": "agent_json",
+            "agent_json": {
+                "type": "task_list",
+                "text": "Please select one of the following",
+                "options": [{"key": i, "value": f"Option {i}"} for i in range(10)],
+            },
+        },
+        {"message_id": "info", "timestamp": "2024-01-01T00:00:01", "type": "agent_info", "agent_info": "Working on it"},
+        {
+            "message_id": "confirmation", "timestamp": "2024-01-01T00:00:02", "type": "agent_json",
+            "agent_json": {
+                "type": "context_json",
+                "text": "Please confirm the following details",
+                "context_json": {"args": {"destination": "Warsaw", "date": "2024-06-01"}},
+            },
+        },
+        {"message_id": "agent", "timestamp": "2024-01-01T00:00:03", "type": "agent_message", "agent_message": "Done"},
+        {"message_id": "stop", "timestamp": "2024-01-01T00:00:04", "type": "stop"},
+    ]
+    return [json.dumps(m) for m in messages]
+
+
+def decode_response(agent_response: list[str]):
+    return [decode_message(message) for message in load_raw_messages(agent_response)]
+
+
+def measure_memory(agent_response: list[str]) -> tuple[int, int]:
+    """
+    Returns the peak and the retained bytes allocated to decode the response once.
+    """
+    decode_response(agent_response)  # Warm up pydantic and the JSON backend.
+    tracemalloc.start()
+    try:
+        start, _ = tracemalloc.get_traced_memory()
+        messages = decode_response(agent_response)
+        retained, peak = tracemalloc.get_traced_memory()
+        del messages
+        return peak - start, retained - start
+    finally:
+        tracemalloc.stop()
+
+
+def run(iterations: int):
+    agent_response = build_agent_response()
+    messages_per_run = len(agent_response)
+
+    backends = [json_backend.backend]
+    if json_backend.orjson is not None:
+        backends.append("json")
+    for backend in backends:
+        with mock.patch.object(json_backend, "orjson", json_backend.orjson if backend == "orjson" else None):
+            seconds = min(timeit.repeat(lambda: decode_response(agent_response), number=iterations, repeat=5))
+        per_message_us = seconds / (iterations * messages_per_run) * 1e6
+        print(f"{backend:>7}: {per_message_us:8.2f} µs/message  ({messages_per_run * iterations / seconds:,.0f} messages/s)")
+
+    peak, retained = measure_memory(agent_response)
+    print(
+        f" memory: {peak / messages_per_run:8.0f} B/message allocated at peak, "
+        f"{retained / messages_per_run:8.0f} B/message retained"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--iterations", type=int, default=2000)
+    args = parser.parse_args()
+    run(args.iterations)
@@ -0,0 +1,79 @@
+"""
+Replays a cassette of API traffic through the SDK and measures its cost offline: CPU time, memory allocated and
+requests per endpoint. Run it against two SDK versions with the same cassette to compare them.
+
+    python -m benchmarks.bench_replay --record traffic.jsonl.gz --sessions 50   # Record conversations with the fake.
+    python -m benchmarks.bench_replay --cassette traffic.jsonl.gz --speed 10    # Replay them ten times faster.
+
+The conversations are driven like in `bench_sessions`, so a cassette recorded in production replays as long as its
+conversations follow the same script (select the first task, confirm...).
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+from collections import Counter
+from typing import Optional
+
+from ai_engine_sdk import AiEngine, Cassette, ReplayTransport
+from ai_engine_sdk.instrumentation import endpoint_template
+from ai_engine_sdk.testing import FakeAgentverse
+from benchmarks.bench_sessions import run_conversation
+
+REPLAY_BASE_URL = "http://replay"
+CREATE_SESSION = ("POST", "/v1beta1/engine/chat/sessions")
+
+
+async def record(path: str, sessions: int, reply_delay: float):
+    async with FakeAgentverse(reply_delay=reply_delay, seed=0) as fake:
+        options = {"api_base_url": fake.url, "record_cassette": path}
+        async with AiEngine(fake.api_key, options=options) as ai_engine:
+            function_group = next(iter(fake.public_function_groups))
+            await asyncio.gather(*(run_conversation(ai_engine, function_group) for _ in range(sessions)))
+    print(f"{sessions} conversations recorded in {path}")
+
+
+async def replay(path: str, speed: Optional[float]):
+    cassette = Cassette.load(path)
+    sessions = sum(1 for interaction in cassette.interactions if interaction.key == CREATE_SESSION)
+    # The fake only gives the function group, the replayed requests never reach it.
+    function_group = next(iter(FakeAgentverse().public_function_groups))
+
+    transport = ReplayTransport(cassette, speed=speed)
+    tracemalloc.start()
+    started_at, cpu_started_at = time.perf_counter(), time.process_time()
+    async with AiEngine("replay", options={"api_base_url": REPLAY_BASE_URL, "transport": transport}) as ai_engine:
+        results = await asyncio.gather(
+            *(run_conversation(ai_engine, function_group) for _ in range(sessions)),
+            return_exceptions=True
+        )
+    elapsed, cpu = time.perf_counter() - started_at, time.process_time() - cpu_started_at
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    failures = [result for result in results if isinstance(result, BaseException)]
+    requests = Counter(
+        (interaction.method, endpoint_template(interaction.url)) for interaction in cassette.interactions
+    )
+    print(
+        f"{sessions} conversations replayed in {elapsed:.2f}s, {cpu:.3f}s CPU "
+        f"({cpu / max(transport.played, 1) * 1e6:.0f} µs/request), {peak / 1e6:.1f} MB allocated at peak, "
+        f"{len(failures)} failed"
+    )
+    print(f"{transport.played} requests replayed, {transport.unplayed} recorded requests not replayed:")
+    for (method, template), count in requests.most_common():
+        print(f"  {count:8d}  {method} {template}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cassette", help="Cassette to replay")
+    parser.add_argument("--record", help="Cassette to record with the fake Agentverse")
+    parser.add_argument("--sessions", type=int, default=50, help="Conversations recorded")
+    parser.add_argument("--reply-delay", type=float, default=0.1, help="Agent reply delay when recording")
+    parser.add_argument("--speed", type=float, default=None, help="Replay speed, immediate by default")
+    args = parser.parse_args()
+    if args.record:
+        asyncio.run(record(args.record, args.sessions, args.reply_delay))
+    if args.cassette:
+        asyncio.run(replay(args.cassette, args.speed))
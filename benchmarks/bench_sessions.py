@@ -0,0 +1,91 @@
+"""
+Load test of the SDK against the in-process fake Agentverse: runs many scripted conversations concurrently.
+
+    python -m benchmarks.bench_sessions --sessions 200 --latency 0.02 --jitter 0.01
+
+With `--transport memory` the requests are handed to the fake without any socket, which isolates the overhead
+of the SDK; `--transport http2` needs `httpx[http2]`.
+"""
+import argparse
+import asyncio
+import time
+from collections import Counter
+
+from ai_engine_sdk import AiEngine, InMemoryTransport, is_task_selection_message
+from ai_engine_sdk.api_models.agents_json_messages import ConfirmationMessage
+from ai_engine_sdk.testing import FakeAgentverse
+
+
+async def run_conversation(ai_engine: AiEngine, function_group: str) -> int:
+    session = await ai_engine.create_session(function_group=function_group)
+    await session.start("Find a flight to warsaw.")
+    received = 0
+    try:
+        async for message in session.stream(min_interval=0.05, max_interval=1.0, idle_timeout=30):
+            received += 1
+            if is_task_selection_message(message_type=message.type):
+                await session.submit_task_selection(message, [next(iter(message.options.values()))])
+            elif isinstance(message, ConfirmationMessage):
+                await session.submit_confirmation(message)
+    finally:
+        await session.delete()
+    return received
+
+
+async def main(
+        sessions: int,
+        latency: float,
+        jitter: float,
+        error_rate: float,
+        rate_limit_rate: float,
+        reply_delay: float,
+        transport: str
+):
+    async with FakeAgentverse(
+            latency=latency,
+            jitter=jitter,
+            error_rate=error_rate,
+            rate_limit_rate=rate_limit_rate,
+            reply_delay=reply_delay,
+            seed=0
+    ) as fake:
+        if transport == "memory":
+            options = {"api_base_url": "http://fake-agentverse", "transport": InMemoryTransport(fake.handle)}
+        else:
+            options = {"api_base_url": fake.url, "transport": transport}
+        async with AiEngine(fake.api_key, options=options) as ai_engine:
+            function_group = next(iter(fake.public_function_groups))
+            started_at = time.perf_counter()
+            results = await asyncio.gather(
+                *(run_conversation(ai_engine, function_group) for _ in range(sessions)),
+                return_exceptions=True
+            )
+            elapsed = time.perf_counter() - started_at
+
+    failures = [r for r in results if isinstance(r, BaseException)]
+    requests = Counter({route: count for (_, route), count in fake.request_counts.items()})
+    print(f"{sessions} conversations in {elapsed:.2f}s ({sessions / elapsed:.1f}/s), {len(failures)} failed")
+    print(f"{sum(requests.values())} requests:")
+    for route, count in requests.most_common():
+        print(f"  {count:8d}  {route}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--jitter", type=float, default=0.01)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--reply-delay", type=float, default=0.1)
+    parser.add_argument("--transport", choices=["aiohttp", "http2", "memory"], default="aiohttp")
+    args = parser.parse_args()
+    asyncio.run(main(
+        sessions=args.sessions,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        reply_delay=args.reply_delay,
+        transport=args.transport,
+    ))
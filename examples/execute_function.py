@@ -27,24 +27,11 @@ async def main(
     await session.execute_function(function_ids=[function_uuid], objective="", context="")
 
     try:
-        empty_count = 0
-        session_ended = False
-
         print("Waiting for execution:")
-        while empty_count < 100:
-            messages: list[ApiBaseMessage] = await session.get_messages()
-            if messages:
-                pprint(messages)
-                if any((msg.type.lower() == "stop" for msg in messages)):
-                    print("DONE")
-                    break
-            if len(messages) % 10 == 0:
-                print("Wait...")
-            if len(messages) == 0:
-                empty_count += 1
-            else:
-                empty_count = 0
-
+        message: ApiBaseMessage
+        async for message in session.stream():
+            pprint(message)
+        print("DONE")
 
     except Exception as ex:
         pprint(ex)
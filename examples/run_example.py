@@ -2,16 +2,12 @@ import asyncio
 import logging
 import os
 import sys
-from time import sleep
-from ai_engine_sdk import (
-    AiEngine,
-    is_agent_message,
-    is_ai_engine_message,
-    is_confirmation_message,
-    is_stop_message,
-    is_task_selection_message, TaskSelectionMessage
-)
+from ai_engine_sdk import AiEngine, TaskSelectionMessage
 from ai_engine_sdk import ApiBaseMessage, FunctionGroup
+from ai_engine_sdk.api_models.agents_json_messages import ConfirmationMessage
+from ai_engine_sdk.api_models.api_message import AgentMessage
+from ai_engine_sdk.client import Session
+from ai_engine_sdk.driver import ConversationDriver
 
 logger = logging.getLogger(__name__)
 
@@ -29,83 +25,72 @@ async def main():
     if public_group is None:
         raise Exception('Could not find "Public" function group.')
 
-    session = await ai_engine.create_session(function_group=public_group.uuid)
-    default_objective: str = "Find a flight to warsaw."
-
-    logger.info(interaction_user_prompt_header)
-    objective = input(f"\n🎯 What is your objective [default: {default_objective}]: ") or default_objective
-    await session.start(objective)
-
-    try:
-        empty_count = 0
-        session_ended = False
-
-        while empty_count < 100:
-            messages: list[ApiBaseMessage] = await session.get_messages()
-            if len(messages) == 0:
-                empty_count += 1
+    # The session is deleted when leaving the block, whatever happens.
+    async with await ai_engine.create_session(function_group=public_group.uuid) as session:
+        default_objective: str = "Find a flight to warsaw."
+
+        logger.info(interaction_user_prompt_header)
+        # `input` blocks: run it in a thread so that the event loop keeps polling meanwhile.
+        objective = await asyncio.to_thread(input, f"\n🎯 What is your objective [default: {default_objective}]: ")
+        await session.start(objective or default_objective)
+
+        # No timeout: the handlers wait for the user.
+        driver = ConversationDriver(handler_timeout=None)
+
+        @driver.on_task_selection
+        async def select_task(session: Session, task_selection_message: TaskSelectionMessage):
+            logger.info(interaction_user_prompt_header)
+            print("Please select a key from the list below:\n")
+            for _, option in task_selection_message.options.items():
+                print(f"➡ 🔑 {option.key}  ->  🧰 {option.title}")
+            option_key = str(await asyncio.to_thread(input, "\nEnter task key: "))
+
+            # check the index: the message is consumed, ask again rather than leaving the conversation stuck
+            while option_key not in task_selection_message.options.keys():
+                print(f"🔴 Invalid task number.\n You selected: {option_key}")
+                option_key = str(await asyncio.to_thread(input, "\nEnter task key: "))
+            logger.debug(option_key)
+            await session.submit_task_selection(task_selection_message, [task_selection_message.options[option_key]])
+
+        @driver.on_agent_message
+        async def answer_agent(session: Session, message: AgentMessage):
+            logger.info(interaction_user_prompt_header)
+            print(message.text.capitalize())
+            response = await asyncio.to_thread(input, "✍ (enter to skip): ")
+            if response == "exit":
+                conversation.cancel()
+            elif response != "":
+                await session.submit_response(message, response)
+
+        @driver.on_ai_engine_message
+        async def show_info(session: Session, message: ApiBaseMessage):
+            logger.info(f"\n 🤖 ℹ Informative message \n\n ---> ✨{message.text}")
+
+        @driver.on_confirmation
+        async def confirm(session: Session, message: ConfirmationMessage):
+            logger.info(interaction_user_prompt_header)
+            print("Confirm:", message.payload)
+            response = await asyncio.to_thread(input, "\nPress enter to confirm, otherwise explain issue:\n")
+
+            if response == "":
+                await session.submit_confirmation(message)
             else:
-                empty_count = 0
-
-            message: ApiBaseMessage
-            for message in messages:
-                if is_task_selection_message(message_type=message.type):
-                    task_selection_message: TaskSelectionMessage = message
-
-                    logger.info(interaction_user_prompt_header)
-                    print("Please select a key from the list below:\n")
-                    for _, option in task_selection_message.options.items():
-                        print(f"➡ 🔑 {option.key}  ->  🧰 {option.title}")
-                    option_key = str(input("\nEnter task key: "))
-
-                    # check the index
-                    if option_key not in task_selection_message.options.keys():
-                        raise Exception(f"🔴 Invalid task number.\n You selected: {option_key}")
-                    logger.debug(option_key)
-                    await session.submit_task_selection(message, [task_selection_message.options[option_key]])
-                    del task_selection_message
-                elif is_agent_message(message):
-                    logger.info(interaction_user_prompt_header)
-                    print(message.text.capitalize())
-                    response = input("✍ (enter to skip): ")
-                    if response == "exit":
-                        break
-
-                    if response != "":
-                        await session.submit_response(message, response)
-                elif is_ai_engine_message(message):
-                    logger.info(f"\n 🤖 ℹ Informative message \n\n ---> ✨{message.text}")
-                    sleep(3.5)
-                elif is_confirmation_message(message_type=message.type):
-                    logger.info(interaction_user_prompt_header)
-                    print("Confirm:", message.payload)
-                    response = input("\nPress enter to confirm, otherwise explain issue:\n")
-
-                    if response == "":
-                        await session.submit_confirmation(message)
-                    else:
-                        await session.reject_confirmation(message, response)
-                elif is_stop_message(message):
-
-                    logger.info("\n 👋 Session has ended, thanks! ")
-                    session_ended = True
-                    break
-
-            # if the session has concluded then break
-            if session_ended:
-                break
-
-            logger.info(f"\n🤖 Processing\n")
-            sleep(1.5)
-            logger.debug(f"No messages: {empty_count} times in a row")
-
-    except Exception as e:
-        logger.debug(f"Unhandled exception: {e}")
-        print("Error", e)
-        raise e
-    finally:
-        # clean up the session
-        await session.delete()
+                await session.reject_confirmation(message, response)
+
+        @driver.on_stop
+        async def stopped(session: Session, message: ApiBaseMessage):
+            logger.info("\n 👋 Session has ended, thanks! ")
+
+        @driver.on_error
+        async def on_error(session: Session, message: ApiBaseMessage, error: Exception):
+            logger.debug(f"Unhandled exception: {error}")
+            print("Error", error)
+
+        conversation = driver.drive(session)
+        try:
+            await conversation
+        except asyncio.CancelledError:
+            pass
 
 
 if __name__ == "__main__":
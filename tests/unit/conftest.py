@@ -0,0 +1,16 @@
+import pytest_asyncio
+
+from ai_engine_sdk import AiEngine
+from ai_engine_sdk.testing import FakeAgentverse
+
+
+@pytest_asyncio.fixture
+async def fake_agentverse() -> FakeAgentverse:
+    async with FakeAgentverse(seed=0) as fake:
+        yield fake
+
+
+@pytest_asyncio.fixture
+async def offline_ai_engine(fake_agentverse: FakeAgentverse) -> AiEngine:
+    async with AiEngine(api_key=fake_agentverse.api_key, options={"api_base_url": fake_agentverse.url}) as ai_engine:
+        yield ai_engine
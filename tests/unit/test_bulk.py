@@ -0,0 +1,122 @@
+import asyncio
+
+import pytest
+
+from ai_engine_sdk import AiEngine, BulkOperation, BulkOperationError, NotFoundError
+from ai_engine_sdk.testing import FakeAgentverse
+from ai_engine_sdk.use_cases.create_function_group_and_share import (
+    CreateFunctionGroupsAndShare,
+    FunctionGroupSharingError,
+)
+
+
+class TestBulkOperation:
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded_and_failures_are_reported(self):
+        in_flight = max_in_flight = 0
+
+        async def operation(item: int) -> int:
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.001 * (item % 3))
+            in_flight -= 1
+            if item == 5:
+                raise ValueError("boom")
+            return item * 2
+
+        report = await BulkOperation(range(20), operation, concurrency=4)
+
+        assert max_in_flight == 4
+        assert [r.result for r in report.succeeded] == [i * 2 for i in range(20) if i != 5]
+        assert [r.item for r in report.failed] == [5]
+        with pytest.raises(BulkOperationError):
+            report.raise_for_failures()
+
+    @pytest.mark.asyncio
+    async def test_results_are_streamed_as_they_finish(self):
+        async def operation(delay: float) -> float:
+            await asyncio.sleep(delay)
+            return delay
+
+        finished = [r.result async for r in BulkOperation([0.03, 0.0, 0.01], operation, concurrency=3)]
+        assert finished == [0.0, 0.01, 0.03]
+
+
+class TestBulkFunctionGroups:
+    @pytest.mark.asyncio
+    async def test_create_share_and_delete(self, offline_ai_engine: AiEngine, fake_agentverse: FakeAgentverse):
+        report = await offline_ai_engine.create_function_groups([f"tenant {i}" for i in range(10)])
+        assert report.ok
+        group_ids = [r.result.uuid for r in report.results]
+        assert set(group_ids) <= set(fake_agentverse.private_function_groups)
+
+        report = await offline_ai_engine.share_function_groups(group_ids + ["unknown"], ["a@x.com", "b@x.com"])
+        assert len(report.succeeded) == 20
+        assert {r.item for r in report.failed} == {("unknown", "a@x.com"), ("unknown", "b@x.com")}
+        assert all(isinstance(r.error, NotFoundError) for r in report.failed)
+        assert fake_agentverse.permissions[group_ids[0]] == ["a@x.com", "b@x.com"]
+
+        report = await offline_ai_engine.delete_function_groups(group_ids)
+        assert report.ok
+        assert not set(group_ids) & set(fake_agentverse.private_function_groups)
+
+    @pytest.mark.asyncio
+    async def test_create_function_groups_and_share_use_case(self, offline_ai_engine: AiEngine, fake_agentverse: FakeAgentverse):
+        use_case = CreateFunctionGroupsAndShare(client=offline_ai_engine, concurrency=4)
+        report = await use_case(fg_is_private=True, target_user_emails_by_fg_name={
+            "tenant a": ["a@x.com"],
+            "tenant b": ["b@x.com", "c@x.com"],
+        })
+        assert report.ok
+        assert sorted(len(r.result.shares) for r in report.results) == [1, 2]
+        assert {r.result.function_group_id for r in report.results} <= set(fake_agentverse.private_function_groups)
+
+    @pytest.mark.asyncio
+    async def test_create_function_groups_and_share_bounds_every_request(self, offline_ai_engine: AiEngine, monkeypatch):
+        in_flight = max_in_flight = 0
+        share_function_group = offline_ai_engine.share_function_group
+
+        async def counting_share(**kwargs):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            try:
+                return await share_function_group(**kwargs)
+            finally:
+                in_flight -= 1
+
+        monkeypatch.setattr(offline_ai_engine, "share_function_group", counting_share)
+        use_case = CreateFunctionGroupsAndShare(client=offline_ai_engine, concurrency=3)
+        emails = [f"user{i}@x.com" for i in range(8)]
+        report = await use_case(fg_is_private=True, target_user_emails_by_fg_name={f"tenant {i}": emails for i in range(3)})
+
+        assert report.ok
+        assert max_in_flight <= 3
+
+    @pytest.mark.asyncio
+    async def test_create_function_groups_and_share_reports_the_group_when_sharing_fails(
+            self,
+            offline_ai_engine: AiEngine,
+            fake_agentverse: FakeAgentverse,
+            monkeypatch
+    ):
+        share_function_group = offline_ai_engine.share_function_group
+
+        async def failing_share(function_group_id: str, target_user_email: str):
+            if target_user_email == "unknown@x.com":
+                raise NotFoundError(status=404, method="PUT", endpoint="/permissions/")
+            return await share_function_group(function_group_id=function_group_id, target_user_email=target_user_email)
+
+        monkeypatch.setattr(offline_ai_engine, "share_function_group", failing_share)
+        use_case = CreateFunctionGroupsAndShare(client=offline_ai_engine)
+        report = await use_case(fg_is_private=True, target_user_emails_by_fg_name={
+            "tenant a": ["a@x.com", "unknown@x.com"],
+        })
+
+        (item_result,) = report.results
+        assert isinstance(item_result.error, FunctionGroupSharingError)
+        function_group_id = item_result.error.function_group_id
+        assert function_group_id in fake_agentverse.private_function_groups
+        assert function_group_id in str(item_result.error)
+        assert [r.item for r in item_result.error.report.failed] == ["unknown@x.com"]
@@ -0,0 +1,88 @@
+import time
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from ai_engine_sdk import AiEngine, Cassette, CassetteError, RecordingTransport, ReplayTransport
+from ai_engine_sdk.api_models.agents_json_messages import ConfirmationMessage, TaskSelectionMessage
+from ai_engine_sdk.api_models.api_message import StopMessage
+from ai_engine_sdk.cassette import Interaction
+from ai_engine_sdk.testing import FakeAgentverse
+from ai_engine_sdk.transport import InMemoryTransport
+
+
+async def run_conversation(ai_engine: AiEngine, function_group: str) -> List[str]:
+    session = await ai_engine.create_session(function_group=function_group)
+    await session.start("Find a flight to warsaw.")
+    received = []
+    async for message in session.stream(min_interval=0.01, idle_timeout=5):
+        received.append(message.text if hasattr(message, "text") else type(message).__name__)
+        if isinstance(message, TaskSelectionMessage):
+            await session.submit_task_selection(message, [message.options["0"]])
+        elif isinstance(message, ConfirmationMessage):
+            await session.submit_confirmation(message)
+        elif isinstance(message, StopMessage):
+            break
+    await session.delete()
+    return received
+
+
+@pytest.mark.parametrize("file_name", ["traffic.jsonl", "traffic.jsonl.gz"])
+@pytest.mark.asyncio
+async def test_replays_a_recorded_conversation(tmp_path: Path, file_name: str):
+    path = tmp_path / file_name
+    fake = FakeAgentverse(seed=0)
+    function_group = next(iter(fake.public_function_groups))
+    options = {"api_base_url": "http://recorded", "transport": InMemoryTransport(fake.handle), "record_cassette": path}
+    async with AiEngine(fake.api_key, options=options) as ai_engine:
+        recorded = await run_conversation(ai_engine, function_group)
+
+    cassette = Cassette.load(path)
+    assert len(cassette.interactions) == sum(fake.request_counts.values())
+    assert all(interaction.url.startswith("/v1beta1/") for interaction in cassette.interactions)
+
+    replay = ReplayTransport(path, speed=1000)
+    async with AiEngine("other-key", options={"api_base_url": "http://replayed", "transport": replay}) as ai_engine:
+        replayed = await run_conversation(ai_engine, function_group)
+
+    assert replayed == recorded
+    assert replay.played == len(cassette.interactions)
+    assert replay.unplayed == 0
+
+
+@pytest.mark.asyncio
+async def test_does_not_record_the_api_key(tmp_path: Path):
+    fake = FakeAgentverse(seed=0)
+    recording = RecordingTransport(InMemoryTransport(fake.handle), tmp_path / "traffic.jsonl")
+    async with AiEngine(fake.api_key, options={"transport": recording}) as ai_engine:
+        await ai_engine.get_functions()
+
+    assert fake.api_key not in (tmp_path / "traffic.jsonl").read_text()
+
+
+@pytest.mark.asyncio
+async def test_raises_on_unrecorded_requests():
+    replay = ReplayTransport(Cassette())
+    with pytest.raises(CassetteError):
+        await replay.request("GET", "http://replayed/v1beta1/functions/")
+
+
+@pytest.mark.parametrize("speed", [1, 2])
+@pytest.mark.asyncio
+async def test_replays_at_the_recorded_offsets(speed: float):
+    cassette = Cassette([
+        Interaction(method="GET", url="/first", request_body=None, status=200, started_at=0.0, duration=0.05),
+        Interaction(method="GET", url="/second", request_body=None, status=200, started_at=0.3, duration=0.05),
+    ])
+    replay = ReplayTransport(cassette, speed=speed)
+
+    started_at = time.monotonic()
+    await replay.request("GET", "http://replayed/first")
+    first_at = time.monotonic() - started_at
+    # Sent right away, but recorded 0.3 s after the first request: served at its recorded offset.
+    await replay.request("GET", "http://replayed/second")
+    second_at = time.monotonic() - started_at
+
+    assert 0.05 / speed <= first_at < 0.05 / speed + 0.05
+    assert 0.35 / speed <= second_at < 0.35 / speed + 0.05
@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+
+from ai_engine_sdk import AiEngine
+from ai_engine_sdk.testing import FakeAgentverse
+
+PRIVATE_GROUPS_ROUTE = ("GET", "/v1beta1/function-groups/")
+
+
+class TestCatalogCache:
+    @pytest.mark.asyncio
+    async def test_unchanged_catalog_is_revalidated_with_304(self, fake_agentverse: FakeAgentverse, offline_ai_engine: AiEngine):
+        first = await offline_ai_engine.get_private_function_groups()
+        second = await offline_ai_engine.get_private_function_groups()
+
+        assert first == second
+        assert fake_agentverse.response_counts[(*PRIVATE_GROUPS_ROUTE, 200)] == 1
+        assert fake_agentverse.response_counts[(*PRIVATE_GROUPS_ROUTE, 304)] == 1
+
+    @pytest.mark.asyncio
+    async def test_fresh_catalog_is_served_from_memory(self, fake_agentverse: FakeAgentverse):
+        options = {"api_base_url": fake_agentverse.url, "catalog_cache_ttl": 60}
+        async with AiEngine(fake_agentverse.api_key, options=options) as ai_engine:
+            await asyncio.gather(*(ai_engine.get_function_groups() for _ in range(5)))
+            await ai_engine.get_function_groups()
+        assert fake_agentverse.request_counts[PRIVATE_GROUPS_ROUTE] == 1
+
+    @pytest.mark.asyncio
+    async def test_stale_catalog_is_served_while_revalidating(self, fake_agentverse: FakeAgentverse):
+        options = {
+            "api_base_url": fake_agentverse.url,
+            "catalog_cache_ttl": 0.01,
+            "catalog_cache_stale_while_revalidate": 60,
+        }
+        async with AiEngine(fake_agentverse.api_key, options=options) as ai_engine:
+            await ai_engine.get_private_function_groups()
+            fake_agentverse.add_function_group("Added elsewhere", is_private=True)
+            await asyncio.sleep(0.02)
+
+            stale = await ai_engine.get_private_function_groups()
+            assert "Added elsewhere" not in {g.name for g in stale}
+            await asyncio.sleep(0.05)
+            refreshed = await ai_engine.get_private_function_groups()
+            assert "Added elsewhere" in {g.name for g in refreshed}
+
+    @pytest.mark.asyncio
+    async def test_writes_invalidate_the_cache(self, fake_agentverse: FakeAgentverse):
+        options = {"api_base_url": fake_agentverse.url, "catalog_cache_ttl": 60}
+        async with AiEngine(fake_agentverse.api_key, options=options) as ai_engine:
+            await ai_engine.get_function_groups()
+            group = await ai_engine.create_function_group(is_private=True, name="New group")
+            assert group.uuid in {g.uuid for g in await ai_engine.get_function_groups()}
+
+            await ai_engine.delete_function_group(group.uuid)
+            assert group.uuid not in {g.uuid for g in await ai_engine.get_function_groups()}
@@ -0,0 +1,41 @@
+import pytest
+
+from ai_engine_sdk import AiEngine
+from ai_engine_sdk.catalog_index import FunctionCatalogIndex
+from ai_engine_sdk.testing import FakeAgentverse
+
+
+class TestFunctionCatalogIndex:
+    @pytest.mark.asyncio
+    async def test_lookups(self, fake_agentverse: FakeAgentverse, offline_ai_engine: AiEngine):
+        index = await FunctionCatalogIndex.build(offline_ai_engine)
+
+        public_group = index.group_by_name("Fetch Verified")
+        assert public_group is not None and not public_group.isPrivate
+        assert index.group_by_uuid(public_group.uuid) == public_group
+        assert {f.name for f in index.functions_of_group(public_group.uuid)} == {
+            "Flight Finder", "Hotel Booking", "Weather Forecast"
+        }
+        assert index.groups_of_function("Flight Finder") == [public_group]
+
+        private_function = index.function_by_name("My Private Function")
+        assert [g.name for g in index.groups_of_function(private_function.uuid)] == ["My Functions"]
+
+    @pytest.mark.asyncio
+    async def test_incremental_refresh(self, fake_agentverse: FakeAgentverse, offline_ai_engine: AiEngine):
+        index = await FunctionCatalogIndex.build(offline_ai_engine)
+        group_functions_route = ("GET", "/v1beta1/function-groups/{group}/functions/")
+        fetched_before = fake_agentverse.request_counts[group_functions_route]
+
+        new_group = fake_agentverse.add_function_group("Travel", is_private=True)
+        flight_finder = next(f for f in fake_agentverse.functions.values() if f["name"] == "Flight Finder")
+        fake_agentverse.group_functions[new_group["uuid"]].append(flight_finder["uuid"])
+        removed_uuid = index.group_by_name("My Functions").uuid
+        del fake_agentverse.private_function_groups[removed_uuid]
+
+        await index.refresh()
+
+        assert fake_agentverse.request_counts[group_functions_route] == fetched_before + 1
+        assert {g.name for g in index.groups_of_function("Flight Finder")} == {"Fetch Verified", "Travel"}
+        assert index.group_by_uuid(removed_uuid) is None
+        assert index.groups_of_function("My Private Function") == []
@@ -0,0 +1,41 @@
+import pytest
+
+from ai_engine_sdk import AiEngine
+from ai_engine_sdk.testing import FakeAgentverse
+
+FUNCTIONS_ROUTE = ("GET", "/v1beta1/functions/")
+
+
+def add_functions(fake_agentverse: FakeAgentverse, group_uuid: str, count: int):
+    for i in range(count):
+        fake_agentverse.add_function(name=f"Function {i}", function_groups=[group_uuid])
+
+
+class TestCatalogIteration:
+    @pytest.mark.asyncio
+    async def test_pages_through_paginated_catalogs(self, fake_agentverse: FakeAgentverse, offline_ai_engine: AiEngine):
+        fake_agentverse.paginate = True
+        group = fake_agentverse.add_function_group(name="Big group", is_private=True)
+        add_functions(fake_agentverse, group["uuid"], 25)
+
+        functions = [f async for f in offline_ai_engine.iter_functions(page_size=10)]
+
+        assert len(functions) == len(fake_agentverse.functions)
+        assert len({f.uuid for f in functions}) == len(functions)
+        assert fake_agentverse.request_counts[FUNCTIONS_ROUTE] == 3
+
+        group_functions = [f.name async for f in offline_ai_engine.iter_functions_by_function_group(group["uuid"], page_size=10)]
+        assert group_functions == [f"Function {i}" for i in range(25)]
+
+    @pytest.mark.asyncio
+    async def test_unpaginated_catalogs_are_fetched_once(self, fake_agentverse: FakeAgentverse, offline_ai_engine: AiEngine):
+        functions = [f async for f in offline_ai_engine.iter_functions(page_size=2)]
+
+        assert len(functions) == len(fake_agentverse.functions)
+        assert fake_agentverse.request_counts[FUNCTIONS_ROUTE] == 1
+
+    @pytest.mark.asyncio
+    async def test_unpaginated_full_page_is_not_repeated(self, fake_agentverse: FakeAgentverse, offline_ai_engine: AiEngine):
+        groups = [g async for g in offline_ai_engine.iter_public_function_groups(page_size=len(fake_agentverse.public_function_groups))]
+
+        assert [g.uuid for g in groups] == list(fake_agentverse.public_function_groups)
@@ -0,0 +1,58 @@
+import pytest
+import pytest_asyncio
+
+from ai_engine_sdk import AiEngine, InsufficientCreditsError
+from ai_engine_sdk.llm_models import DefaultModelId
+from ai_engine_sdk.testing import FakeAgentverse
+
+CREATE_SESSION_ROUTE = ("POST", "/v1beta1/engine/chat/sessions")
+
+
+@pytest_asyncio.fixture
+async def ai_engine(fake_agentverse: FakeAgentverse) -> AiEngine:
+    options = {"api_base_url": fake_agentverse.url, "credit_guard": {"models": ["next-gen", "talkative-01"]}}
+    async with AiEngine(api_key=fake_agentverse.api_key, options=options) as ai_engine:
+        yield ai_engine
+
+
+class TestCreditGuard:
+    @pytest.mark.asyncio
+    async def test_credit_is_cached_and_decremented_optimistically(self, fake_agentverse: FakeAgentverse, ai_engine: AiEngine):
+        for _ in range(3):
+            await ai_engine.create_session(function_group="group")
+
+        assert fake_agentverse.request_counts[("GET", "/v1beta1/engine/credit/info")] == 1
+        assert ai_engine._credit_guard.available_credits == 997
+        assert ai_engine._credit_guard.model_tokens(DefaultModelId) == 9997
+
+    @pytest.mark.asyncio
+    async def test_rejects_sessions_without_credit(self, fake_agentverse: FakeAgentverse, ai_engine: AiEngine):
+        fake_agentverse.used_credit = fake_agentverse.total_credit
+
+        with pytest.raises(InsufficientCreditsError):
+            await ai_engine.create_session(function_group="group")
+        assert fake_agentverse.request_counts[CREATE_SESSION_ROUTE] == 0
+
+    @pytest.mark.asyncio
+    async def test_routes_to_a_model_with_tokens(self, fake_agentverse: FakeAgentverse, ai_engine: AiEngine):
+        fake_agentverse.model_tokens["next-gen"] = 0
+
+        session = await ai_engine.create_session(function_group="group", opts={"email": "", "model": "next-gen"})
+
+        assert fake_agentverse.sessions[session.session_id].model == "talkative-01"
+
+    @pytest.mark.asyncio
+    async def test_rejects_model_without_tokens_when_routing_is_disabled(self, fake_agentverse: FakeAgentverse):
+        fake_agentverse.model_tokens["next-gen"] = 0
+        options = {"api_base_url": fake_agentverse.url, "credit_guard": {"route_models": False}}
+        async with AiEngine(api_key=fake_agentverse.api_key, options=options) as ai_engine:
+            with pytest.raises(InsufficientCreditsError):
+                await ai_engine.create_session(function_group="group", opts={"email": "", "model": "next-gen"})
+
+    @pytest.mark.asyncio
+    async def test_start_checks_the_account_credit(self, fake_agentverse: FakeAgentverse, ai_engine: AiEngine):
+        session = await ai_engine.create_session(function_group="group")
+        ai_engine._credit_guard._available_credits = 0
+
+        with pytest.raises(InsufficientCreditsError):
+            await session.start("Find a flight")
@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+
+from ai_engine_sdk import AiEngine
+from ai_engine_sdk.api_models.agents_json_messages import ConfirmationMessage, TaskSelectionMessage
+from ai_engine_sdk.api_models.api_message import AiEngineMessage, ApiBaseMessage, StopMessage
+from ai_engine_sdk.client import Session
+from ai_engine_sdk.driver import ConversationDriver
+
+STREAM_OPTIONS = {"min_interval": 0.01, "max_interval": 0.05, "idle_timeout": 5}
+
+
+def make_driver(**kwargs) -> ConversationDriver:
+    driver = ConversationDriver(stream_options=STREAM_OPTIONS, **kwargs)
+
+    @driver.on_task_selection
+    async def select_task(session: Session, message: TaskSelectionMessage):
+        await session.submit_task_selection(message, [message.options["0"]])
+
+    @driver.on_confirmation
+    async def confirm(session: Session, message: ConfirmationMessage):
+        await session.submit_confirmation(message)
+
+    return driver
+
+
+class TestConversationDriver:
+    @pytest.mark.asyncio
+    async def test_slow_handler_does_not_delay_other_sessions(self, offline_ai_engine: AiEngine):
+        driver = make_driver()
+        stopped_at = {}
+        slow_session_id = None
+
+        @driver.on_ai_engine_message
+        async def slow_info(session: Session, message: ApiBaseMessage):
+            if session.session_id == slow_session_id:
+                await asyncio.sleep(0.5)
+
+        @driver.on_stop
+        async def stopped(session: Session, message: StopMessage):
+            stopped_at[session.session_id] = asyncio.get_running_loop().time()
+
+        sessions = [await offline_ai_engine.create_session(function_group="group") for _ in range(3)]
+        slow_session_id = sessions[0].session_id
+        for session in sessions:
+            await session.start("Find a flight")
+
+        started_at = asyncio.get_running_loop().time()
+        assert await driver.run_all(sessions) == [None, None, None]
+
+        assert stopped_at[slow_session_id] - started_at >= 0.5
+        assert all(stopped_at[s.session_id] - started_at < 0.5 for s in sessions[1:])
+
+    @pytest.mark.asyncio
+    async def test_messages_are_handled_in_order_and_timeouts_reported(self, offline_ai_engine: AiEngine):
+        driver = make_driver(handler_timeout=0.05)
+        handled = []
+        errors = []
+
+        @driver.on_ai_engine_message
+        async def hang(session: Session, message: ApiBaseMessage):
+            handled.append(type(message).__name__)
+            await asyncio.sleep(10)
+
+        @driver.on_agent_message
+        async def agent_message(session: Session, message: ApiBaseMessage):
+            handled.append(type(message).__name__)
+
+        @driver.on_stop
+        async def stopped(session: Session, message: ApiBaseMessage):
+            handled.append(type(message).__name__)
+
+        @driver.on_error
+        async def on_error(session: Session, message: ApiBaseMessage, error: Exception):
+            errors.append(error)
+
+        session = await offline_ai_engine.create_session(function_group="group")
+        await session.start("Find a flight")
+        await driver.run(session)
+
+        assert handled == ["AiEngineMessage", "AgentMessage", "StopMessage"]
+        assert len(errors) == 1 and isinstance(errors[0], asyncio.TimeoutError)
+
+    @pytest.mark.asyncio
+    async def test_polling_failure_with_a_full_queue_ends_the_run(self, offline_ai_engine: AiEngine):
+        driver = make_driver(max_pending_messages=1)
+        handled = []
+
+        @driver.on_ai_engine_message
+        async def slow_info(session: Session, message: ApiBaseMessage):
+            await asyncio.sleep(0.05)
+            handled.append(message.id)
+
+        async def failing_stream(**kwargs):
+            for index in range(3):
+                yield AiEngineMessage(id=str(index), timestamp="", text="Info")
+            raise RuntimeError("The API is down")
+
+        session = await offline_ai_engine.create_session(function_group="group")
+        session.stream = failing_stream
+
+        with pytest.raises(RuntimeError, match="The API is down"):
+            await asyncio.wait_for(driver.run(session), timeout=2.0)
+        assert handled == ["0", "1", "2"]
@@ -0,0 +1,29 @@
+import json
+
+import pytest
+
+from ai_engine_sdk.testing import FakeAgentverse
+
+
+class TestFakeAgentverse:
+    @pytest.mark.asyncio
+    async def test_rejects_invalid_api_key(self):
+        fake = FakeAgentverse()
+        response = await fake.handle("GET", "/v1beta1/functions/", headers={"Authorization": "Bearer wrong"})
+        assert response.status == 401
+
+    @pytest.mark.asyncio
+    async def test_injects_rate_limiting(self):
+        fake = FakeAgentverse(api_key=None, rate_limit_rate=1.0, retry_after=2.5)
+        response = await fake.handle("GET", "/v1beta1/functions/")
+        assert response.status == 429
+        assert response.headers["Retry-After"] == "2.5"
+
+    @pytest.mark.asyncio
+    async def test_counts_requests_by_route(self):
+        fake = FakeAgentverse(api_key=None)
+        response = await fake.handle("POST", "/v1beta1/engine/chat/sessions", body=json.dumps({"requestedModel": "next-gen"}))
+        session_id = json.loads(response.body)["session_id"]
+        await fake.handle("GET", f"/v1beta1/engine/chat/sessions/{session_id}/new-messages")
+        await fake.handle("GET", f"http://localhost/v1beta1/engine/chat/sessions/{session_id}/new-messages?last_message_id=x")
+        assert fake.request_counts[("GET", "/v1beta1/engine/chat/sessions/{session}/new-messages")] == 2
@@ -0,0 +1,114 @@
+import asyncio
+from typing import List
+
+import pytest
+
+from ai_engine_sdk import AiEngine, ExecutionJob
+from ai_engine_sdk.api_models.api_message import StopMessage
+from ai_engine_sdk.testing import FakeAgentverse
+from ai_engine_sdk.transport import InMemoryTransport
+
+FAST_POLLING = {"min_interval": 0.01, "max_interval": 0.05, "polls_per_second": None}
+
+
+def make_jobs(fake: FakeAgentverse, count: int) -> List[ExecutionJob]:
+    function_ids = list(fake.functions)
+    return [
+        ExecutionJob(function_ids=[function_ids[index % len(function_ids)]], objective=f"Objective {index}", opts={"email": ""})
+        for index in range(count)
+    ]
+
+
+def live_sessions(fake: FakeAgentverse) -> int:
+    return sum(1 for session in fake.sessions.values() if not session.deleted)
+
+
+class TestFanOut:
+    @pytest.mark.asyncio
+    async def test_runs_every_job_in_its_own_session(self, offline_ai_engine: AiEngine, fake_agentverse: FakeAgentverse):
+        function_group = next(iter(fake_agentverse.public_function_groups))
+        max_live_sessions = 0
+
+        async def respond(session, message):
+            nonlocal max_live_sessions
+            max_live_sessions = max(max_live_sessions, live_sessions(fake_agentverse))
+
+        jobs = make_jobs(fake_agentverse, 6)
+        report = await offline_ai_engine.execute_functions(
+            function_group, jobs, concurrency=2, respond=respond, multiplexer_options=FAST_POLLING
+        )
+
+        assert report.ok
+        assert [item_result.item for item_result in report.results] == jobs
+        for item_result in report.results:
+            assert item_result.result.stopped
+            assert isinstance(item_result.result.messages[-1], StopMessage)
+        assert len({item_result.result.session_id for item_result in report.results}) == 6
+        assert 1 <= max_live_sessions <= 2
+        assert live_sessions(fake_agentverse) == 0
+        executed = [fake_agentverse.sessions[r.result.session_id].submitted[0] for r in report.results]
+        assert [payload["objective"] for payload in executed] == [job.objective for job in jobs]
+
+    @pytest.mark.asyncio
+    async def test_times_out_and_cleans_up_stragglers(self, offline_ai_engine: AiEngine, fake_agentverse: FakeAgentverse):
+        function_group = next(iter(fake_agentverse.public_function_groups))
+        fake_agentverse.reply_delay = 10
+
+        report = await offline_ai_engine.execute_functions(
+            function_group, make_jobs(fake_agentverse, 3), timeout=0.2, multiplexer_options=FAST_POLLING
+        )
+
+        assert len(report.failed) == 3
+        assert all(isinstance(item_result.error, TimeoutError) for item_result in report.failed)
+        assert len(fake_agentverse.sessions) == 3
+        assert live_sessions(fake_agentverse) == 0
+
+    @pytest.mark.asyncio
+    async def test_cleans_up_sessions_created_after_the_timeout(self, fake_agentverse: FakeAgentverse):
+        function_group = next(iter(fake_agentverse.public_function_groups))
+
+        async def slow_session_creation(method, url, headers, data):
+            # The session is created server-side, but the response arrives after the job timed out.
+            response = await fake_agentverse.handle(method, url, headers, data)
+            if method == "POST" and url.endswith("/v1beta1/engine/chat/sessions"):
+                await asyncio.sleep(0.2)
+            return response
+
+        options = {"transport": InMemoryTransport(slow_session_creation)}
+        async with AiEngine(fake_agentverse.api_key, options=options) as ai_engine:
+            report = await ai_engine.execute_functions(
+                function_group, make_jobs(fake_agentverse, 4), timeout=0.1, multiplexer_options=FAST_POLLING
+            )
+
+        assert len(report.failed) == 4
+        assert all(isinstance(item_result.error, TimeoutError) for item_result in report.failed)
+        assert len(fake_agentverse.sessions) == 4
+        assert live_sessions(fake_agentverse) == 0
+
+    @pytest.mark.asyncio
+    async def test_deadline_fails_the_jobs_not_started(self, offline_ai_engine: AiEngine, fake_agentverse: FakeAgentverse):
+        function_group = next(iter(fake_agentverse.public_function_groups))
+        fake_agentverse.reply_delay = 10
+
+        report = await offline_ai_engine.execute_functions(
+            function_group, make_jobs(fake_agentverse, 4), concurrency=2, deadline=0.2,
+            multiplexer_options=FAST_POLLING
+        )
+
+        assert len(report.failed) == 4
+        # The second wave never started: only the first one created sessions.
+        assert len(fake_agentverse.sessions) == 2
+        assert live_sessions(fake_agentverse) == 0
+
+    @pytest.mark.asyncio
+    async def test_leaving_early_cancels_the_running_jobs(self, offline_ai_engine: AiEngine, fake_agentverse: FakeAgentverse):
+        function_group = next(iter(fake_agentverse.public_function_groups))
+        jobs = make_jobs(fake_agentverse, 5)
+        fan_out = offline_ai_engine.execute_functions(function_group, jobs, concurrency=5, multiplexer_options=FAST_POLLING)
+
+        async for item_result in fan_out:
+            assert item_result.ok
+            break
+
+        assert live_sessions(fake_agentverse) == 0
+        assert sum(1 for item_result in fan_out.report.results if item_result is not None) >= 1
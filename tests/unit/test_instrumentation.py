@@ -0,0 +1,50 @@
+import pytest
+
+from ai_engine_sdk import AiEngine, Instrumentation, MetricsCollector
+from ai_engine_sdk.instrumentation import endpoint_template
+from ai_engine_sdk.retry import EndpointClass, RetryPolicy
+from ai_engine_sdk.testing import FakeAgentverse
+
+NEW_MESSAGES_TEMPLATE = "/v1beta1/engine/chat/sessions/{session_id}/new-messages"
+
+
+class FailingInstrumentation(Instrumentation):
+    def on_request_end(self, event):
+        raise RuntimeError("broken hook")
+
+
+class TestInstrumentation:
+    def test_endpoint_template(self):
+        assert endpoint_template("/v1beta1/engine/chat/sessions/abc/new-messages?last_message_id=m") == NEW_MESSAGES_TEMPLATE
+        assert endpoint_template("/v1beta1/function-groups/public/") == "/v1beta1/function-groups/public/"
+        assert endpoint_template("/v1beta1/function-groups/g1/permissions/") == "/v1beta1/function-groups/{function_group_id}/permissions/"
+        assert endpoint_template("/v1beta1/function/f1/groups") == "/v1beta1/function/{function_id}/groups"
+
+    @pytest.mark.asyncio
+    async def test_metrics_collector(self, fake_agentverse: FakeAgentverse):
+        metrics = MetricsCollector()
+        options = {
+            "api_base_url": fake_agentverse.url,
+            "instrumentation": [metrics, FailingInstrumentation()],
+            "retry_policies": {EndpointClass.POLL: RetryPolicy(base_delay=0.001)},
+        }
+        async with AiEngine(api_key=fake_agentverse.api_key, options=options) as ai_engine:
+            session = await ai_engine.create_session(function_group="group")
+            await session.start("Find a flight")
+            fake_agentverse.inject_failures(503)
+            messages = []
+            while not messages:
+                messages = await session.get_messages()
+
+        poll = ("GET", NEW_MESSAGES_TEMPLATE)
+        assert metrics.latency[poll].count >= 2
+        assert metrics.responses[(*poll, "503")] == 1
+        assert metrics.retries[poll] == 1
+        assert metrics.bytes_in[poll] > 0
+        assert metrics.bytes_out[("POST", "/v1beta1/engine/chat/sessions/{session_id}/submit")] > 0
+        assert sum(metrics.messages_parsed.values()) == len(messages)
+
+        exposition = metrics.to_prometheus()
+        assert f'ai_engine_sdk_retries_total{{method="GET",endpoint="{NEW_MESSAGES_TEMPLATE}"}} 1' in exposition
+        assert "# TYPE ai_engine_sdk_request_duration_seconds histogram" in exposition
+        assert 'le="+Inf"' in exposition
@@ -0,0 +1,50 @@
+import subprocess
+import sys
+
+import pytest
+
+import ai_engine_sdk
+
+
+def loaded_modules(statement: str) -> set[str]:
+    """
+    Returns the modules loaded by `statement` in a new interpreter.
+    """
+    code = f"import sys; {statement}; print(' '.join(sys.modules))"
+    output = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+    return set(output.split())
+
+
+class TestLazyImports:
+    def test_importing_the_package_loads_no_submodule(self):
+        modules = loaded_modules("import ai_engine_sdk")
+        assert "ai_engine_sdk" in modules
+        assert not {"ai_engine_sdk.client", "pydantic", "aiohttp"} & modules
+
+    def test_the_client_does_not_load_aiohttp_before_a_request(self):
+        modules = loaded_modules("from ai_engine_sdk import AiEngine; AiEngine('key')")
+        assert "ai_engine_sdk.client" in modules
+        assert "aiohttp" not in modules
+
+    def test_the_client_loads_optional_features_only_when_enabled(self):
+        optional_modules = {
+            f"ai_engine_sdk.{name}" for name in (
+                "bulk", "cassette", "credit_guard", "fan_out", "instrumentation", "multiplexer", "session_lifecycle",
+                "session_pool", "session_store",
+            )
+        } | {"gzip", "sqlite3"}
+        assert not optional_modules & loaded_modules("from ai_engine_sdk import AiEngine; AiEngine('key')")
+
+        modules = loaded_modules("from ai_engine_sdk import AiEngine; AiEngine('key', options={'session_pool': True})")
+        assert "ai_engine_sdk.session_pool" in modules
+
+    def test_every_public_name_resolves(self):
+        for name in ai_engine_sdk.__all__:
+            assert getattr(ai_engine_sdk, name) is not None
+        assert ai_engine_sdk.is_confirmation_message is \
+            ai_engine_sdk.api_models.agents_json_messages.is_agent_json_confirmation_message
+        assert set(ai_engine_sdk.__all__) <= set(dir(ai_engine_sdk))
+
+    def test_unknown_names_raise_attribute_error(self):
+        with pytest.raises(AttributeError):
+            ai_engine_sdk.NotAThing
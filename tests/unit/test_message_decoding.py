@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+from ai_engine_sdk.api_models.agents_json_messages import (
+    ConfirmationMessage,
+    DataRequestMessage,
+    TaskSelectionMessage,
+    is_data_request_message,
+    is_task_selection_message,
+)
+from ai_engine_sdk.api_models.api_message import AgentMessage, AiEngineMessage, StopMessage
+from ai_engine_sdk.api_models.decoding import decode_message, get_decoder_key, load_raw_messages
+
+
+def raw_message(message_type: str, **fields) -> dict:
+    return {"message_id": fields.pop("message_id", "m-1"), "timestamp": "2024-01-01T00:00:00", "type": message_type, **fields}
+
+
+class TestMessageDecoding:
+    def test_task_list_is_decoded_as_task_selection(self):
+        message = decode_message(raw_message(
+            "agent_json",
+            agent_json={"type": "task_list", "text": "Pick one", "options": [{"key": 0, "value": "Flights"}]}
+        ))
+        assert isinstance(message, TaskSelectionMessage)
+        assert message.type == "TASK_LIST"
+        assert message.options["0"].title == "Flights"
+
+    @pytest.mark.parametrize("agent_json_type", ["context_json", "options_with_text"])
+    def test_confirmation_is_decoded_by_type_or_text(self, agent_json_type: str):
+        message = decode_message(raw_message(
+            "agent_json",
+            agent_json={"type": agent_json_type, "text": "Please confirm the details", "context_json": {"a": 1}}
+        ))
+        assert isinstance(message, ConfirmationMessage)
+        assert message.payload == {"a": 1}
+
+    def test_confirmation_text_does_not_override_task_selection(self):
+        raw = raw_message(
+            "agent_json",
+            agent_json={"type": "options", "text": "Please confirm your pick", "options": [{"key": "a", "value": "A"}]}
+        )
+        assert get_decoder_key(raw) == ("agent_json", "OPTIONS")
+        assert isinstance(decode_message(raw), TaskSelectionMessage)
+
+    def test_date_is_decoded_as_data_request(self):
+        message = decode_message(raw_message("agent_json", agent_json={"type": "date", "text": "When?", "options": []}))
+        assert isinstance(message, DataRequestMessage)
+
+    def test_plain_messages(self):
+        assert isinstance(decode_message(raw_message("agent_info", agent_info="Working")), AiEngineMessage)
+        assert isinstance(decode_message(raw_message("agent_message", agent_message="Hi")), AgentMessage)
+        assert isinstance(decode_message(raw_message("stop")), StopMessage)
+
+    def test_unknown_message_is_skipped(self):
+        assert decode_message(raw_message("something_new")) is None
+
+    def test_load_raw_messages(self):
+        raw = [raw_message("stop", message_id="a"), raw_message("stop", message_id="b")]
+        assert load_raw_messages([json.dumps(m) for m in raw]) == raw
+
+    def test_type_checkers(self):
+        assert is_task_selection_message("task_list")
+        assert is_task_selection_message("OPTIONS")
+        assert not is_task_selection_message("DATE")
+        assert is_data_request_message("date")
+        assert not is_data_request_message("agent")
@@ -0,0 +1,216 @@
+import asyncio
+import gc
+import time
+from collections import Counter
+from typing import List
+
+import pytest
+import pytest_asyncio
+
+from ai_engine_sdk import AiEngine, AuthenticationError, NotFoundError, is_stop_message
+from ai_engine_sdk.api_models.agents_json_messages import ConfirmationMessage
+from ai_engine_sdk.client import Session
+from ai_engine_sdk.multiplexer import SessionMultiplexer
+from ai_engine_sdk.testing import FakeAgentverse
+from ai_engine_sdk.transport import InMemoryTransport
+
+
+class PollRecorder:
+    """
+    Serves the requests with a `FakeAgentverse` and records which session every `new-messages` poll was for.
+    """
+    def __init__(self, fake: FakeAgentverse):
+        self.fake = fake
+        self.polls: List[str] = []
+
+    async def __call__(self, method, url, headers, data):
+        if "/new-messages" in url:
+            self.polls.append(url.split("/sessions/")[1].split("/")[0])
+        return await self.fake.handle(method, url, headers, data)
+
+    def count(self, session: Session) -> int:
+        return self.polls.count(session.session_id)
+
+
+@pytest.fixture
+def fake() -> FakeAgentverse:
+    return FakeAgentverse(seed=0)
+
+
+@pytest.fixture
+def recorder(fake: FakeAgentverse) -> PollRecorder:
+    return PollRecorder(fake)
+
+
+@pytest_asyncio.fixture
+async def ai_engine(fake: FakeAgentverse, recorder: PollRecorder) -> AiEngine:
+    async with AiEngine(fake.api_key, options={"transport": InMemoryTransport(recorder)}) as ai_engine:
+        yield ai_engine
+
+
+async def create_sessions(ai_engine: AiEngine, fake: FakeAgentverse, count: int) -> List[Session]:
+    function_group = next(iter(fake.public_function_groups))
+    return list(await asyncio.gather(*(ai_engine.create_session(function_group) for _ in range(count))))
+
+
+async def wait_until(condition, timeout: float = 2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "Condition not met in time"
+        await asyncio.sleep(0.005)
+
+
+class TestSessionMultiplexer:
+    @pytest.mark.asyncio
+    async def test_rotates_fairly_across_sessions(self, ai_engine: AiEngine, fake: FakeAgentverse, recorder: PollRecorder):
+        sessions = await create_sessions(ai_engine, fake, 4)
+        options = dict(max_concurrency=1, polls_per_second=None, min_interval=0.02, backoff_factor=1.0, idle_timeout=None)
+        async with SessionMultiplexer(**options) as multiplexer:
+            for session in sessions:
+                multiplexer.register(session)
+            await wait_until(lambda: len(recorder.polls) >= 12)
+
+        # Every session is polled once before any of them is polled again.
+        assert recorder.polls[:4] == [session.session_id for session in sessions]
+        counts = Counter(recorder.polls[:12])
+        assert max(counts.values()) - min(counts.values()) <= 1
+
+    @pytest.mark.asyncio
+    async def test_respects_the_polls_per_second_budget(self, ai_engine: AiEngine, fake: FakeAgentverse, recorder: PollRecorder):
+        sessions = await create_sessions(ai_engine, fake, 10)
+        options = dict(polls_per_second=20, min_interval=0.01, backoff_factor=1.0, idle_timeout=None)
+        async with SessionMultiplexer(**options) as multiplexer:
+            for session in sessions:
+                multiplexer.register(session)
+            await asyncio.sleep(0.5)
+
+        # A burst of `polls_per_second`, then 20 polls per second, where unthrottled sessions would poll ~500 times.
+        assert 20 <= len(recorder.polls) <= 20 + 0.5 * 20 + 2
+
+    @pytest.mark.asyncio
+    async def test_stops_polling_while_the_queue_is_full(self, ai_engine: AiEngine, fake: FakeAgentverse, recorder: PollRecorder):
+        (session,) = await create_sessions(ai_engine, fake, 1)
+        options = dict(queue_size=2, min_interval=0.01, max_interval=0.05, idle_timeout=None)
+        async with SessionMultiplexer(**options) as multiplexer:
+            queue = multiplexer.register(session)
+            await session.start("Find a flight to warsaw.")  # Two replies: fill the queue.
+            await wait_until(queue.full)
+            polls = recorder.count(session)
+            await asyncio.sleep(0.3)
+            assert recorder.count(session) == polls
+
+            messages = multiplexer.messages(session.session_id)
+            await messages.__anext__()
+            task_selection = await messages.__anext__()
+            await session.submit_task_selection(task_selection, [task_selection.options["0"]])
+            confirmation = await asyncio.wait_for(messages.__anext__(), timeout=1.0)
+            assert isinstance(confirmation, ConfirmationMessage)
+            assert recorder.count(session) > polls
+
+    @pytest.mark.asyncio
+    async def test_unregisters_stopped_and_idle_sessions(self, ai_engine: AiEngine, fake: FakeAgentverse):
+        stopped, idle = await create_sessions(ai_engine, fake, 2)
+        async with SessionMultiplexer(min_interval=0.01, max_interval=0.02, idle_timeout=0.2) as multiplexer:
+            multiplexer.register(stopped)
+            multiplexer.register(idle)
+            await stopped.execute_function(["function-id"], "Book a flight")
+
+            received = [message async for message in multiplexer.messages(stopped.session_id)]
+            assert is_stop_message(received[-1])
+            assert len(multiplexer) == 1
+
+            started_at = time.monotonic()
+            assert [message async for message in multiplexer.messages(idle.session_id)] == []
+            assert time.monotonic() - started_at < 1.0
+            assert len(multiplexer) == 0
+
+    @pytest.mark.asyncio
+    async def test_submit_triggers_a_poll(self, ai_engine: AiEngine, fake: FakeAgentverse, recorder: PollRecorder):
+        (session,) = await create_sessions(ai_engine, fake, 1)
+        async with SessionMultiplexer(min_interval=0.05, max_interval=30.0, idle_timeout=None) as multiplexer:
+            multiplexer.register(session)
+            # Let the session back off: its next poll is seconds away.
+            await asyncio.sleep(0.5)
+            polls = recorder.count(session)
+
+            submitted_at = time.monotonic()
+            await session.execute_function(["function-id"], "Book a flight")
+            first = await asyncio.wait_for(multiplexer.messages(session.session_id).__anext__(), timeout=1.0)
+
+            assert first is not None
+            assert time.monotonic() - submitted_at < 0.3
+            assert recorder.count(session) == polls + 1
+
+    @pytest.mark.asyncio
+    async def test_stop_ends_polling(self, ai_engine: AiEngine, fake: FakeAgentverse, recorder: PollRecorder):
+        sessions = await create_sessions(ai_engine, fake, 3)
+        multiplexer = SessionMultiplexer(min_interval=0.01, max_interval=0.01, idle_timeout=None)
+        multiplexer.start()
+        for session in sessions:
+            multiplexer.register(session)
+        await wait_until(lambda: len(recorder.polls) >= 3)
+
+        await multiplexer.aclose(delete_sessions=True)
+        polls = len(recorder.polls)
+        await asyncio.sleep(0.1)
+
+        assert len(recorder.polls) == polls
+        assert len(multiplexer) == 0
+        assert all(fake.sessions[session.session_id].deleted for session in sessions)
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("failure, error_class", [("deleted", NotFoundError), ("unauthorized", AuthenticationError)])
+    async def test_reports_sessions_that_cannot_be_polled(
+            self,
+            ai_engine: AiEngine,
+            fake: FakeAgentverse,
+            recorder: PollRecorder,
+            failure: str,
+            error_class: type
+    ):
+        (session,) = await create_sessions(ai_engine, fake, 1)
+        async with SessionMultiplexer(min_interval=0.01, max_interval=0.01, idle_timeout=None) as multiplexer:
+            multiplexer.register(session)
+            if failure == "deleted":
+                fake.sessions[session.session_id].deleted = True
+            else:
+                fake.api_key = "rotated-api-key"
+
+            with pytest.raises(error_class):
+                async for _ in multiplexer.messages(session.session_id):
+                    pass
+            assert len(multiplexer) == 0
+            polls = recorder.count(session)
+            await asyncio.sleep(0.1)
+            assert recorder.count(session) == polls
+
+    @pytest.mark.asyncio
+    async def test_delivers_the_error_once_a_full_queue_has_room(self, ai_engine: AiEngine, fake: FakeAgentverse):
+        (session,) = await create_sessions(ai_engine, fake, 1)
+        async with SessionMultiplexer(queue_size=1, idle_timeout=None) as multiplexer:
+            queue = multiplexer.register(session)
+            queue.put_nowait("message")
+            error = NotFoundError(status=404, method="GET", endpoint="/new-messages")
+            multiplexer.unregister(session.session_id, error=error)
+            gc.collect()
+
+            received = []
+            with pytest.raises(NotFoundError):
+                async for message in multiplexer.messages(session.session_id):
+                    received.append(message)
+            assert received == ["message"]
+
+    @pytest.mark.asyncio
+    async def test_discard_drops_the_pending_end_of_a_full_queue(self, ai_engine: AiEngine, fake: FakeAgentverse):
+        (session,) = await create_sessions(ai_engine, fake, 1)
+        async with SessionMultiplexer(queue_size=1, idle_timeout=None) as multiplexer:
+            queue = multiplexer.register(session)
+            queue.put_nowait("message")
+            multiplexer.unregister(session.session_id)
+            (pending_end,) = multiplexer._pending_ends.values()
+
+            multiplexer.discard(session.session_id)
+            await asyncio.sleep(0)
+
+            assert pending_end.cancelled()
+            assert not multiplexer._pending_ends
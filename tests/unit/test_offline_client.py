@@ -0,0 +1,99 @@
+import pytest
+
+from ai_engine_sdk import AiEngine, FunctionGroup, is_stop_message, is_task_selection_message
+from ai_engine_sdk.api_models.agents_json_messages import ConfirmationMessage, TaskSelectionMessage
+from ai_engine_sdk.client import CreditBalance, Model, Session
+from ai_engine_sdk.llm_models import CustomModel
+from ai_engine_sdk.testing import FakeAgentverse
+from ai_engine_sdk.transport import InMemoryTransport
+
+
+class TestOfflineAiEngineClient:
+    @pytest.mark.asyncio
+    async def test_get_function_groups_returns_private_and_public(self, offline_ai_engine: AiEngine):
+        function_groups: list[FunctionGroup] = await offline_ai_engine.get_function_groups()
+        assert {g.name for g in function_groups} == {"Fetch Verified", "My Functions"}
+
+    @pytest.mark.asyncio
+    async def test_create_and_delete_function_group(self, offline_ai_engine: AiEngine, fake_agentverse: FakeAgentverse):
+        new_function_group = await offline_ai_engine.create_function_group(is_private=True, name="TESTS: group")
+        assert new_function_group.uuid in fake_agentverse.private_function_groups
+
+        await offline_ai_engine.delete_function_group(function_group_id=new_function_group.uuid)
+        assert new_function_group.uuid not in fake_agentverse.private_function_groups
+
+    @pytest.mark.asyncio
+    async def test_get_credits_and_models(self, offline_ai_engine: AiEngine):
+        credits = await offline_ai_engine.get_credits()
+        assert isinstance(credits, CreditBalance)
+        assert credits.availableCredits == 1000
+
+        models = await offline_ai_engine.get_models()
+        assert all(isinstance(m, Model) and m.credits == 10000 for m in models)
+
+    @pytest.mark.asyncio
+    async def test_scripted_conversation(self, offline_ai_engine: AiEngine, fake_agentverse: FakeAgentverse):
+        group = next(g for g in await offline_ai_engine.get_function_groups() if g.name == "Fetch Verified")
+        session: Session = await offline_ai_engine.create_session(function_group=group.uuid)
+        await session.start("Find a flight to warsaw.")
+
+        received = []
+        async for message in session.stream(min_interval=0.01, max_interval=0.05, idle_timeout=2):
+            received.append(message)
+            if is_task_selection_message(message_type=message.type):
+                task_selection: TaskSelectionMessage = message
+                await session.submit_task_selection(message, [task_selection.options["0"]])
+            elif isinstance(message, ConfirmationMessage):
+                await session.submit_confirmation(message)
+
+        assert is_stop_message(received[-1])
+        await session.delete()
+        assert fake_agentverse.sessions[session.session_id].deleted
+
+    @pytest.mark.asyncio
+    async def test_requests_share_the_connection_pool(self, offline_ai_engine: AiEngine):
+        await offline_ai_engine.get_function_groups()
+        pool = offline_ai_engine._transport._session
+        await offline_ai_engine.get_credits()
+        assert offline_ai_engine._transport._session is pool
+
+    @pytest.mark.asyncio
+    async def test_get_models_fetches_credits_in_one_request(self, offline_ai_engine: AiEngine, fake_agentverse: FakeAgentverse):
+        await offline_ai_engine.get_models()
+        assert fake_agentverse.request_counts[("GET", "/v1beta1/engine/credit/remaining_tokens")] == 1
+
+    @pytest.mark.asyncio
+    async def test_get_model_credits_bulk_chunks_long_lists(self, offline_ai_engine: AiEngine, fake_agentverse: FakeAgentverse):
+        fake_agentverse.model_tokens.update({f"model-{i}": i for i in range(5)})
+        models = [f"model-{i}" for i in range(5)] + [CustomModel(id="custom", name="Custom")]
+        fake_agentverse.inject_failures(414)
+
+        credits = await offline_ai_engine.get_model_credits_bulk(models, chunk_size=4)
+
+        assert credits == {"model-0": 0, "model-1": 1, "model-2": 2, "model-3": 3, "model-4": 4, "custom": 0}
+        # Two chunks, the first one rejected as too long and split in two.
+        assert fake_agentverse.request_counts[("GET", "/v1beta1/engine/credit/remaining_tokens")] == 4
+
+    @pytest.mark.asyncio
+    async def test_get_model_credits_bulk_sends_one_comma_separated_parameter(self, fake_agentverse: FakeAgentverse):
+        fake_agentverse.model_tokens.update({"model-a": 1, "model-b": 2})
+        urls = []
+
+        async def record(method, url, headers, data):
+            urls.append(url)
+            return await fake_agentverse.handle(method, url, headers, data)
+
+        async with AiEngine(fake_agentverse.api_key, options={"transport": InMemoryTransport(record)}) as ai_engine:
+            credits = await ai_engine.get_model_credits_bulk(["model-a", "model-b"])
+
+        assert credits == {"model-a": 1, "model-b": 2}
+        (url,) = urls
+        assert url.endswith("/v1beta1/engine/credit/remaining_tokens?models=model-a,model-b")
+
+    @pytest.mark.asyncio
+    async def test_fake_rejects_repeated_models_parameters(self, fake_agentverse: FakeAgentverse):
+        response = await fake_agentverse.handle(
+            "GET", "/v1beta1/engine/credit/remaining_tokens?models=model-a&models=model-b",
+            {"Authorization": f"Bearer {fake_agentverse.api_key}"}, None
+        )
+        assert response.status == 422
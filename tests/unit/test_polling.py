@@ -0,0 +1,148 @@
+import asyncio
+import time
+
+import pytest
+
+from ai_engine_sdk import AiEngine, is_stop_message
+from ai_engine_sdk.client import Session
+from ai_engine_sdk.polling import PollBackoff
+from ai_engine_sdk.testing import FakeAgentverse
+
+NEW_MESSAGES_ROUTE = ("GET", "/v1beta1/engine/chat/sessions/{session}/new-messages")
+
+
+class RecordingBackoff(PollBackoff):
+    instances: list = []
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **{**kwargs, "jitter": 0.0})
+        self.events = []
+        RecordingBackoff.instances.append(self)
+
+    def reset(self):
+        self.events.append("reset")
+        super().reset()
+
+    def next_interval(self) -> float:
+        interval = super().next_interval()
+        self.events.append(interval)
+        return interval
+
+
+@pytest.fixture
+def recording_backoff(monkeypatch) -> list:
+    RecordingBackoff.instances = []
+    monkeypatch.setattr("ai_engine_sdk.client.PollBackoff", RecordingBackoff)
+    return RecordingBackoff.instances
+
+
+async def create_session(ai_engine: AiEngine, fake: FakeAgentverse) -> Session:
+    return await ai_engine.create_session(function_group=next(iter(fake.public_function_groups)))
+
+
+class TestPollBackoff:
+    def test_grows_up_to_the_maximum(self):
+        backoff = PollBackoff(min_interval=0.25, max_interval=2.0, multiplier=2.0, jitter=0.0)
+        assert [backoff.next_interval() for _ in range(6)] == [0.25, 0.5, 1.0, 2.0, 2.0, 2.0]
+
+    def test_reset_goes_back_to_the_minimum(self):
+        backoff = PollBackoff(min_interval=0.25, max_interval=2.0, multiplier=2.0, jitter=0.0)
+        for _ in range(4):
+            backoff.next_interval()
+        backoff.reset()
+        assert backoff.next_interval() == 0.25
+        assert backoff.next_interval() == 0.5
+
+    def test_jitter_stays_within_bounds(self):
+        backoff = PollBackoff(min_interval=1.0, max_interval=1.0, jitter=0.1)
+        for _ in range(100):
+            assert 0.9 <= backoff.next_interval() <= 1.0
+
+    @pytest.mark.parametrize("kwargs", [
+        {"min_interval": 0},
+        {"min_interval": 2.0, "max_interval": 1.0},
+        {"multiplier": 0.5},
+    ])
+    def test_rejects_invalid_settings(self, kwargs):
+        with pytest.raises(ValueError):
+            PollBackoff(**kwargs)
+
+
+class TestSessionStream:
+    @pytest.mark.asyncio
+    async def test_ends_on_stop_message(self, offline_ai_engine: AiEngine, fake_agentverse: FakeAgentverse):
+        session = await create_session(offline_ai_engine, fake_agentverse)
+        await session.execute_function(["function-id"], "Book a flight")
+
+        received = [message async for message in session.stream(min_interval=0.01, idle_timeout=None)]
+
+        assert [message.type for message in received] == ["ai-engine", "agent", "stop"]
+        assert is_stop_message(received[-1])
+
+    @pytest.mark.asyncio
+    async def test_ends_after_idle_timeout(self, offline_ai_engine: AiEngine, fake_agentverse: FakeAgentverse):
+        session = await create_session(offline_ai_engine, fake_agentverse)
+
+        started_at = time.monotonic()
+        received = [
+            message async for message in session.stream(min_interval=0.01, max_interval=0.02, idle_timeout=0.1)
+        ]
+
+        assert received == []
+        assert 0.1 <= time.monotonic() - started_at < 1.0
+        assert fake_agentverse.request_counts[NEW_MESSAGES_ROUTE] > 1
+
+    @pytest.mark.asyncio
+    async def test_backs_off_while_idle_and_resets_on_messages(
+            self,
+            offline_ai_engine: AiEngine,
+            fake_agentverse: FakeAgentverse,
+            recording_backoff: list
+    ):
+        fake_agentverse.reply_delay = 0.2
+        session = await create_session(offline_ai_engine, fake_agentverse)
+        await session.execute_function(["function-id"], "Book a flight")
+
+        received = [
+            message async for message in session.stream(min_interval=0.01, max_interval=0.04, idle_timeout=None)
+        ]
+
+        assert is_stop_message(received[-1])
+        (backoff,) = recording_backoff
+        intervals_before_reply = []
+        for event in backoff.events:
+            if event == "reset":
+                break
+            intervals_before_reply.append(event)
+        # The submit reset happened before the stream started: it polls idle, backing off up to the cap...
+        assert intervals_before_reply[:4] == [0.01, 0.02, 0.04, 0.04]
+        # ...and goes back to fast polling once the replies arrive.
+        assert backoff.events[len(intervals_before_reply) + 1] == 0.01
+
+    @pytest.mark.asyncio
+    async def test_submit_wakes_up_an_idle_stream(
+            self,
+            offline_ai_engine: AiEngine,
+            fake_agentverse: FakeAgentverse,
+            recording_backoff: list
+    ):
+        session = await create_session(offline_ai_engine, fake_agentverse)
+        received = []
+
+        async def consume():
+            async for message in session.stream(min_interval=0.05, max_interval=30.0, idle_timeout=None):
+                received.append(message)
+
+        consumer = asyncio.ensure_future(consume())
+        # Let the stream back off: its next poll is seconds away.
+        await asyncio.sleep(0.5)
+        (backoff,) = recording_backoff
+        assert backoff.events[-1] >= 0.4
+
+        submitted_at = time.monotonic()
+        await session.execute_function(["function-id"], "Book a flight")
+        await asyncio.wait_for(consumer, timeout=2.0)
+
+        assert time.monotonic() - submitted_at < 0.5
+        assert "reset" in backoff.events
+        assert is_stop_message(received[-1])
@@ -0,0 +1,107 @@
+import asyncio
+import random
+
+import pytest
+
+from ai_engine_sdk import AdaptiveConcurrencyLimiter, AiEngine, RateLimiter
+from ai_engine_sdk.retry import EndpointClass, RetryPolicy
+from ai_engine_sdk.testing import FakeAgentverse
+
+FUNCTIONS_ROUTE = ("GET", "/v1beta1/functions/")
+
+
+class TestAdaptiveConcurrencyLimiter:
+    @pytest.mark.asyncio
+    async def test_grows_on_healthy_responses(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=4, latency_tolerance=None)
+        for _ in range(20):
+            await limiter.acquire()
+            await limiter.release(latency=0.01)
+        assert limiter.limit == 4
+
+    @pytest.mark.asyncio
+    async def test_shrinks_once_per_cooldown_on_congestion(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=16, decrease_cooldown=60)
+        for _ in range(4):
+            await limiter.acquire()
+        for _ in range(4):
+            await limiter.release(latency=0.01, congested=True)
+        assert limiter.limit == 8
+        assert limiter.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_shrinks_on_rising_latency(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=16, max_limit=16, latency_tolerance=2.0, min_samples=20)
+        for _ in range(20):
+            await limiter.acquire()
+            await limiter.release(latency=0.01, endpoint="GET /functions")
+        assert limiter.limit == 16
+        for _ in range(5):
+            await limiter.acquire()
+            await limiter.release(latency=0.5, endpoint="GET /functions")
+        assert limiter.limit == 8
+
+    @pytest.mark.asyncio
+    async def test_keeps_its_limit_with_jitter_and_endpoints_of_different_latencies(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=8, max_limit=8, decrease_cooldown=0)
+        jitter = random.Random(0)
+        for _ in range(500):
+            await limiter.acquire()
+            await limiter.release(latency=0.01 + jitter.uniform(0, 0.04), endpoint="GET /credit")
+            await limiter.acquire()
+            await limiter.release(latency=0.3 + jitter.uniform(0, 0.1), endpoint="GET /new-messages")
+        assert limiter.limit == 8
+
+    @pytest.mark.asyncio
+    async def test_waits_for_a_free_slot(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=1, max_limit=1)
+        await limiter.acquire()
+        waiter = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        await limiter.release(latency=0.01)
+        await asyncio.wait_for(waiter, 1)
+
+
+class TestRateLimiter:
+    @pytest.mark.asyncio
+    async def test_retry_after_pauses_every_request(self):
+        limiter = RateLimiter()
+        await limiter.release(latency=0.01, status=429, retry_after=0.05)
+        loop = asyncio.get_running_loop()
+        started_at = loop.time()
+        await limiter.acquire()
+        assert loop.time() - started_at >= 0.04
+
+    @pytest.mark.asyncio
+    async def test_ai_engine_backs_off_when_throttled(self, fake_agentverse: FakeAgentverse):
+        options = {
+            "api_base_url": fake_agentverse.url,
+            "adaptive_concurrency": {"initial_limit": 8, "decrease_cooldown": 60},
+            "retry_policies": {EndpointClass.CATALOG_READ: RetryPolicy(max_attempts=3, base_delay=0.001)},
+        }
+        async with AiEngine(api_key=fake_agentverse.api_key, options=options) as ai_engine:
+            fake_agentverse.inject_failures(429, count=2, headers={"Retry-After": "0.01"})
+            await asyncio.gather(*(ai_engine.get_functions() for _ in range(4)))
+
+            assert ai_engine._rate_limiter.concurrency_limiter.limit == 4
+            assert ai_engine._rate_limiter.concurrency_limiter.in_flight == 0
+        assert fake_agentverse.response_counts[(*FUNCTIONS_ROUTE, 429)] == 2
+
+    @pytest.mark.asyncio
+    async def test_ai_engine_keeps_its_concurrency_on_a_healthy_jittery_server(self):
+        options = {"adaptive_concurrency": {"initial_limit": 8, "decrease_cooldown": 0.05}}
+        async with FakeAgentverse(latency=0.01, jitter=0.04, seed=0) as fake:
+            async with AiEngine(api_key=fake.api_key, options={**options, "api_base_url": fake.url}) as ai_engine:
+                limiter = ai_engine._rate_limiter.concurrency_limiter
+                lowest_limit = limiter.limit
+
+                async def worker():
+                    nonlocal lowest_limit
+                    for _ in range(15):
+                        await ai_engine.get_credits()
+                        lowest_limit = min(lowest_limit, limiter.limit)
+
+                await asyncio.gather(*(worker() for _ in range(32)))
+
+        assert lowest_limit >= 8
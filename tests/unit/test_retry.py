@@ -0,0 +1,96 @@
+import pytest
+import pytest_asyncio
+
+from ai_engine_sdk import AiEngine, ApiServerError, NotFoundError, RateLimitedError
+from ai_engine_sdk.errors import ApiError
+from ai_engine_sdk.retry import EndpointClass, NO_RETRY, RetryPolicy, classify_endpoint
+from ai_engine_sdk.testing import FakeAgentverse
+
+NEW_MESSAGES_ROUTE = ("GET", "/v1beta1/engine/chat/sessions/{session}/new-messages")
+SUBMIT_ROUTE = ("POST", "/v1beta1/engine/chat/sessions/{session}/submit")
+FAST_RETRIES = {
+    endpoint_class: RetryPolicy(max_attempts=3, base_delay=0.001, max_delay=0.01)
+    for endpoint_class in (EndpointClass.POLL, EndpointClass.SUBMIT, EndpointClass.CATALOG_READ, EndpointClass.DELETE)
+}
+
+
+@pytest_asyncio.fixture
+async def ai_engine(fake_agentverse: FakeAgentverse) -> AiEngine:
+    options = {"api_base_url": fake_agentverse.url, "retry_policies": FAST_RETRIES}
+    async with AiEngine(api_key=fake_agentverse.api_key, options=options) as ai_engine:
+        yield ai_engine
+
+
+class TestRetry:
+    def test_classify_endpoint(self):
+        assert classify_endpoint("GET", "/v1beta1/engine/chat/sessions/s/new-messages?last_message_id=m") == EndpointClass.POLL
+        assert classify_endpoint("POST", "/v1beta1/engine/chat/sessions/s/submit") == EndpointClass.SUBMIT
+        assert classify_endpoint("POST", "/v1beta1/engine/chat/sessions") == EndpointClass.WRITE
+        assert classify_endpoint("GET", "/v1beta1/functions/") == EndpointClass.CATALOG_READ
+        assert classify_endpoint("DELETE", "/v1beta1/function-groups/g/") == EndpointClass.DELETE
+
+    def test_retry_after_overrides_backoff(self):
+        error = ApiError(429, "GET", "/", headers={"Retry-After": "3"})
+        assert RetryPolicy(jitter=False).get_delay(1, error) == 3
+        assert not RetryPolicy(max_retry_after=1).is_retriable(error)
+
+    @pytest.mark.asyncio
+    async def test_poll_is_retried_on_server_errors(self, fake_agentverse: FakeAgentverse, ai_engine: AiEngine):
+        session = await ai_engine.create_session(function_group="group")
+        fake_agentverse.inject_failures(502)
+        fake_agentverse.inject_failures(429, headers={"Retry-After": "0.01"})
+
+        assert await session.get_messages() == []
+        assert fake_agentverse.request_counts[NEW_MESSAGES_ROUTE] == 3
+
+    @pytest.mark.asyncio
+    async def test_non_retriable_errors_fail_immediately(self, fake_agentverse: FakeAgentverse, ai_engine: AiEngine):
+        session = await ai_engine.create_session(function_group="group")
+        fake_agentverse.inject_failures(404)
+
+        with pytest.raises(NotFoundError) as error:
+            await session.get_messages()
+        assert error.value.status == 404
+        assert b"Injected failure" in error.value.body
+        assert fake_agentverse.request_counts[NEW_MESSAGES_ROUTE] == 1
+
+    @pytest.mark.asyncio
+    async def test_retries_are_bounded(self, fake_agentverse: FakeAgentverse, ai_engine: AiEngine):
+        fake_agentverse.inject_failures(503, count=3)
+        with pytest.raises(ApiServerError):
+            await ai_engine.get_functions()
+        assert fake_agentverse.request_counts[("GET", "/v1beta1/functions/")] == 3
+
+    @pytest.mark.asyncio
+    async def test_submits_are_retried_with_the_same_message_id(self, fake_agentverse: FakeAgentverse, ai_engine: AiEngine):
+        session = await ai_engine.create_session(function_group="group")
+        fake_agentverse.inject_failures(500)
+        await session.start("objective")
+
+        assert fake_agentverse.request_counts[SUBMIT_ROUTE] == 2
+        assert len(fake_agentverse.sessions[session.session_id].submitted) == 1
+
+    @pytest.mark.asyncio
+    async def test_submits_without_message_id_are_not_retried(self, fake_agentverse: FakeAgentverse, ai_engine: AiEngine):
+        session = await ai_engine.create_session(function_group="group")
+        fake_agentverse.inject_failures(500)
+        with pytest.raises(ApiServerError):
+            await session.execute_function(function_ids=["f"], objective="objective")
+        assert fake_agentverse.request_counts[SUBMIT_ROUTE] == 1
+
+    @pytest.mark.asyncio
+    async def test_writes_are_not_retried_by_default(self, fake_agentverse: FakeAgentverse, ai_engine: AiEngine):
+        fake_agentverse.inject_failures(429)
+        with pytest.raises(RateLimitedError):
+            await ai_engine.create_session(function_group="group")
+
+    @pytest.mark.asyncio
+    async def test_policies_can_be_disabled(self, fake_agentverse: FakeAgentverse):
+        ai_engine = AiEngine(
+            api_key=fake_agentverse.api_key,
+            options={"api_base_url": fake_agentverse.url, "retry_policies": {"catalog_read": NO_RETRY}}
+        )
+        fake_agentverse.inject_failures(503)
+        with pytest.raises(ApiServerError):
+            await ai_engine.get_functions()
+        await ai_engine.aclose()
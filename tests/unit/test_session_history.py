@@ -0,0 +1,35 @@
+import pytest
+
+from ai_engine_sdk.session_history import MessageRetention, RecentIds, make_message_history
+
+
+class TestSessionHistory:
+    def test_full_history_keeps_everything(self):
+        history = make_message_history(MessageRetention.FULL, history_size=2)
+        for i in range(5):
+            history.append({"message_id": str(i)})
+        assert len(history) == 5
+
+    def test_ring_buffer_keeps_last_messages(self):
+        history = make_message_history("ring_buffer", history_size=2)
+        for i in range(5):
+            history.append({"message_id": str(i)})
+        assert [m["message_id"] for m in history] == ["3", "4"]
+
+    def test_cursor_only_keeps_nothing(self):
+        history = make_message_history(MessageRetention.CURSOR_ONLY, history_size=2)
+        history.append({"message_id": "0"})
+        assert len(history) == 0
+
+    def test_invalid_retention(self):
+        with pytest.raises(ValueError):
+            make_message_history("forever", history_size=2)
+
+    def test_recent_ids_forgets_oldest(self):
+        ids = RecentIds(max_size=3)
+        for i in range(5):
+            ids.add(str(i))
+        ids.add("4")
+        assert len(ids) == 3
+        assert "1" not in ids
+        assert all(str(i) in ids for i in range(2, 5))
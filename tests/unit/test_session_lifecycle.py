@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+
+from ai_engine_sdk import AiEngine
+from ai_engine_sdk.testing import FakeAgentverse
+
+
+def make_ai_engine(fake: FakeAgentverse, **lifecycle_options) -> AiEngine:
+    options = {"api_base_url": fake.url, "session_lifecycle": lifecycle_options or True}
+    return AiEngine(fake.api_key, options=options)
+
+
+class TestSessionLifecycle:
+    @pytest.mark.asyncio
+    async def test_session_context_manager_deletes_the_session(self, offline_ai_engine: AiEngine, fake_agentverse: FakeAgentverse):
+        function_group = next(iter(fake_agentverse.public_function_groups))
+        async with await offline_ai_engine.create_session(function_group) as session:
+            await session.start("Find a flight to warsaw.")
+        assert session.deleted
+        assert fake_agentverse.sessions[session.session_id].deleted
+
+    @pytest.mark.asyncio
+    async def test_tracks_live_sessions(self, fake_agentverse: FakeAgentverse):
+        function_group = next(iter(fake_agentverse.public_function_groups))
+        async with make_ai_engine(fake_agentverse) as ai_engine:
+            first = await ai_engine.create_session(function_group)
+            second = await ai_engine.create_session(function_group)
+            assert {s.session_id for s in ai_engine.session_lifecycle.live_sessions} == {first.session_id, second.session_id}
+
+            await first.delete()
+            assert [s.session_id for s in ai_engine.session_lifecycle.live_sessions] == [second.session_id]
+            await second.delete()
+
+        assert ai_engine.session_lifecycle.last_report.ok
+
+    @pytest.mark.asyncio
+    async def test_shutdown_deletes_and_reports_leaked_sessions(self, fake_agentverse: FakeAgentverse):
+        function_group = next(iter(fake_agentverse.public_function_groups))
+        async with make_ai_engine(fake_agentverse, record_origins=True) as ai_engine:
+            leaked = [await ai_engine.create_session(function_group) for _ in range(5)]
+
+        report = ai_engine.session_lifecycle.last_report
+        assert sorted(report.leaked) == sorted(session.session_id for session in leaked)
+        assert sorted(report.deleted) == sorted(report.leaked)
+        assert all("test_session_lifecycle.py" in report.origins[session.session_id] for session in leaked)
+        assert all(fake_agentverse.sessions[session.session_id].deleted for session in leaked)
+
+    @pytest.mark.asyncio
+    async def test_shutdown_gives_up_after_its_timeout(self, fake_agentverse: FakeAgentverse):
+        function_group = next(iter(fake_agentverse.public_function_groups))
+        async with make_ai_engine(fake_agentverse, shutdown_timeout=0.05) as ai_engine:
+            session = await ai_engine.create_session(function_group)
+            fake_agentverse.latency = 1.0
+
+        assert ai_engine.session_lifecycle.last_report.timed_out == [session.session_id]
+
+    @pytest.mark.asyncio
+    async def test_reaps_idle_sessions(self, fake_agentverse: FakeAgentverse):
+        function_group = next(iter(fake_agentverse.public_function_groups))
+        async with make_ai_engine(fake_agentverse, idle_timeout=0.05, reap_interval=0.02) as ai_engine:
+            idle = await ai_engine.create_session(function_group)
+            active = await ai_engine.create_session(function_group)
+            for _ in range(10):
+                await asyncio.sleep(0.02)
+                await active.get_messages()
+
+            assert idle.deleted
+            assert not active.deleted
+            await active.delete()
+
+        assert ai_engine.session_lifecycle.last_report.reaped == [idle.session_id]
+
+    @pytest.mark.asyncio
+    async def test_never_reaps_without_idle_timeout(self, fake_agentverse: FakeAgentverse):
+        function_group = next(iter(fake_agentverse.public_function_groups))
+        async with make_ai_engine(fake_agentverse) as ai_engine:
+            session = await ai_engine.create_session(function_group)
+            assert ai_engine.session_lifecycle.idle_timeout is None
+
+            assert await ai_engine.session_lifecycle.reap() == []
+            assert not session.deleted
+            await session.delete()
+
+        assert ai_engine.session_lifecycle.last_report.ok
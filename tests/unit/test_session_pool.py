@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+
+from ai_engine_sdk import AiEngine, InsufficientCreditsError
+from ai_engine_sdk.testing import FakeAgentverse
+
+SESSIONS_ROUTE = ("POST", "/v1beta1/engine/chat/sessions")
+
+
+@pytest_asyncio.fixture
+async def pooled_ai_engine(fake_agentverse: FakeAgentverse) -> AiEngine:
+    options = {"api_base_url": fake_agentverse.url, "session_pool": {"size": 2, "max_idle": 60}}
+    async with AiEngine(fake_agentverse.api_key, options=options) as ai_engine:
+        yield ai_engine
+
+
+def live_sessions(fake: FakeAgentverse) -> int:
+    return sum(1 for session in fake.sessions.values() if not session.deleted)
+
+
+class TestSessionPool:
+    @pytest.mark.asyncio
+    async def test_serves_warmed_sessions_without_requests(self, pooled_ai_engine: AiEngine, fake_agentverse: FakeAgentverse):
+        function_group = next(iter(fake_agentverse.public_function_groups))
+        await pooled_ai_engine.session_pool.warm(function_group, {"email": "user@example.com"})
+        assert fake_agentverse.request_counts[SESSIONS_ROUTE] == 2
+
+        session = await pooled_ai_engine.create_session(function_group, {"email": "user@example.com"})
+        assert session.session_id in fake_agentverse.sessions
+        assert fake_agentverse.sessions[session.session_id].email == "user@example.com"
+        assert pooled_ai_engine.session_pool.hits == 1
+
+        await asyncio.sleep(0.1)  # Background refill.
+        assert pooled_ai_engine.session_pool.idle_count(function_group, {"email": "user@example.com"}) == 2
+
+    @pytest.mark.asyncio
+    async def test_pools_keys_from_their_first_use(self, pooled_ai_engine: AiEngine, fake_agentverse: FakeAgentverse):
+        function_group = next(iter(fake_agentverse.public_function_groups))
+        opts = {"email": "", "model": "talkative-01"}
+        first = await pooled_ai_engine.create_session(function_group, opts)
+        assert pooled_ai_engine.session_pool.misses == 1
+        assert fake_agentverse.sessions[first.session_id].model == "talkative-01"
+
+        await asyncio.sleep(0.1)
+        second = await pooled_ai_engine.create_session(function_group, opts)
+        assert pooled_ai_engine.session_pool.hits == 1
+        assert fake_agentverse.sessions[second.session_id].model == "talkative-01"
+        # Other keys have their own sessions.
+        assert pooled_ai_engine.session_pool.idle_count(function_group, {"email": ""}) == 0
+
+    @pytest.mark.asyncio
+    async def test_replaces_stale_sessions(self, fake_agentverse: FakeAgentverse):
+        function_group = next(iter(fake_agentverse.public_function_groups))
+        options = {"api_base_url": fake_agentverse.url, "session_pool": {"size": 1, "max_idle": 0.05}}
+        async with AiEngine(fake_agentverse.api_key, options=options) as ai_engine:
+            await ai_engine.session_pool.warm(function_group, {"email": ""})
+            (stale_id,) = fake_agentverse.sessions
+            await asyncio.sleep(0.1)
+
+            session = await ai_engine.create_session(function_group, {"email": ""})
+            assert session.session_id != stale_id
+            await asyncio.sleep(0.1)
+            assert fake_agentverse.sessions[stale_id].deleted
+
+    @pytest.mark.asyncio
+    async def test_closing_deletes_the_idle_sessions(self, fake_agentverse: FakeAgentverse):
+        function_group = next(iter(fake_agentverse.public_function_groups))
+        options = {"api_base_url": fake_agentverse.url, "session_pool": {"size": 3}}
+        async with AiEngine(fake_agentverse.api_key, options=options) as ai_engine:
+            await ai_engine.session_pool.warm(function_group, {"email": ""})
+            session = await ai_engine.create_session(function_group, {"email": ""})
+            assert live_sessions(fake_agentverse) >= 3
+
+        # Only the session handed out is left.
+        assert live_sessions(fake_agentverse) == 1
+        assert not fake_agentverse.sessions[session.session_id].deleted
+
+    @pytest.mark.asyncio
+    async def test_idle_sessions_are_charged_when_handed_out(self, fake_agentverse: FakeAgentverse):
+        function_group = next(iter(fake_agentverse.public_function_groups))
+        fake_agentverse.used_credit = fake_agentverse.total_credit - 2
+        options = {
+            "api_base_url": fake_agentverse.url,
+            "session_pool": {"size": 4, "max_idle": 60},
+            "credit_guard": {"models": ["next-gen"]},
+        }
+        async with AiEngine(fake_agentverse.api_key, options=options) as ai_engine:
+            opts = {"email": "", "model": "next-gen"}
+            await ai_engine.session_pool.warm(function_group, opts)
+            # Pre-warming doesn't use up the credit...
+            assert ai_engine.session_pool.idle_count(function_group, opts) == 4
+            assert ai_engine._credit_guard.available_credits == 2
+
+            # ...handing the sessions out does.
+            for _ in range(2):
+                await ai_engine.create_session(function_group, opts)
+            assert ai_engine._credit_guard.available_credits == 0
+            assert ai_engine._credit_guard.model_tokens("next-gen") == fake_agentverse.model_tokens["next-gen"] - 2
+
+            with pytest.raises(InsufficientCreditsError):
+                await ai_engine.create_session(function_group, opts)
+            assert ai_engine.session_pool.hits == 2
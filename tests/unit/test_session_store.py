@@ -0,0 +1,110 @@
+import pytest
+
+from ai_engine_sdk import (
+    AiEngine,
+    FileSessionStore,
+    MemorySessionStore,
+    SessionSnapshot,
+    SessionStore,
+    SQLiteSessionStore,
+)
+from ai_engine_sdk.testing import FakeAgentverse
+
+
+@pytest.fixture(params=["memory", "file", "sqlite"])
+def session_store(request, tmp_path) -> SessionStore:
+    if request.param == "memory":
+        return MemorySessionStore()
+    if request.param == "file":
+        return FileSessionStore(tmp_path / "sessions")
+    return SQLiteSessionStore(tmp_path / "sessions.db")
+
+
+class TestSessionStore:
+    @pytest.mark.asyncio
+    async def test_save_load_and_delete(self, session_store: SessionStore):
+        snapshot = SessionSnapshot(session_id="s1", function_group="g1", last_message_id="m1")
+        await session_store.save(snapshot)
+        await session_store.save(snapshot.model_copy(update={"last_message_id": "m2"}))
+
+        assert (await session_store.load("s1")).last_message_id == "m2"
+        assert [s.session_id for s in await session_store.list()] == ["s1"]
+
+        await session_store.delete("s1")
+        assert await session_store.load("s1") is None
+        assert await session_store.list() == []
+
+    @pytest.mark.asyncio
+    async def test_resume_session_after_restart(self, fake_agentverse: FakeAgentverse, session_store: SessionStore):
+        options = {"api_base_url": fake_agentverse.url, "session_store": session_store}
+        async with AiEngine(api_key=fake_agentverse.api_key, options=options) as ai_engine:
+            session = await ai_engine.create_session(function_group="group")
+            await session.start("Find a flight")
+            first_messages = []
+            while not first_messages:
+                first_messages = await session.get_messages()
+            await session.submit_task_selection(first_messages[-1], [first_messages[-1].options["0"]])
+            await session.commit()
+
+        # A new worker picks the conversation up where it was left.
+        async with AiEngine(api_key=fake_agentverse.api_key, options=options) as ai_engine:
+            resumed = await ai_engine.resume_session(session.session_id)
+            assert resumed.last_message_id == session.last_message_id
+
+            resumed_messages = []
+            while not resumed_messages:
+                resumed_messages = await resumed.get_messages()
+
+            seen_ids = {m.id for m in first_messages}
+            assert not seen_ids & {m.id for m in resumed_messages}
+
+            await resumed.delete()
+            assert await session_store.load(session.session_id) is None
+
+    @pytest.mark.asyncio
+    async def test_resume_refetches_the_messages_not_processed_before_a_crash(
+            self,
+            fake_agentverse: FakeAgentverse,
+            session_store: SessionStore
+    ):
+        options = {"api_base_url": fake_agentverse.url, "session_store": session_store}
+        async with AiEngine(api_key=fake_agentverse.api_key, options=options) as ai_engine:
+            session = await ai_engine.create_session(function_group="group")
+            await session.start("Find a flight")
+            fetched = []
+            while not fetched:
+                fetched = await session.get_messages()
+            # The worker crashes before handling the messages.
+
+        async with AiEngine(api_key=fake_agentverse.api_key, options=options) as ai_engine:
+            resumed = await ai_engine.resume_session(session.session_id)
+            refetched = await resumed.get_messages()
+            assert [m.id for m in refetched] == [m.id for m in fetched]
+
+            # Handled this time: the next poll commits them.
+            await resumed.submit_task_selection(refetched[-1], [refetched[-1].options["0"]])
+            await resumed.get_messages()
+            assert (await session_store.load(session.session_id)).last_message_id == str(refetched[-1].id)
+
+    @pytest.mark.asyncio
+    async def test_commits_the_cursor_moved_by_unknown_messages(
+            self,
+            fake_agentverse: FakeAgentverse,
+            session_store: SessionStore
+    ):
+        options = {"api_base_url": fake_agentverse.url, "session_store": session_store}
+        async with AiEngine(api_key=fake_agentverse.api_key, options=options) as ai_engine:
+            session = await ai_engine.create_session(function_group="group")
+            fake_agentverse.sessions[session.session_id].add_message({
+                "message_id": "unknown-message", "timestamp": "2024-01-01T00:00:00Z", "type": "from_the_future"
+            })
+            assert await session.get_messages() == []
+            assert session.last_message_id == "unknown-message"
+
+            await session.get_messages()
+            assert (await session_store.load(session.session_id)).last_message_id == "unknown-message"
+
+    @pytest.mark.asyncio
+    async def test_resume_unknown_session(self, offline_ai_engine: AiEngine):
+        with pytest.raises(KeyError):
+            await offline_ai_engine.resume_session("unknown")
@@ -0,0 +1,104 @@
+import os
+import subprocess
+import sys
+import textwrap
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from ai_engine_sdk import is_stop_message
+from ai_engine_sdk.api_models.agents_json_messages import ConfirmationMessage, TaskSelectionMessage
+from ai_engine_sdk.sync import SyncAiEngine, get_background_loop
+from ai_engine_sdk.testing import FakeAgentverse
+
+
+@pytest.fixture
+def fake_agentverse() -> FakeAgentverse:
+    # The fake server runs on the background loop too, the test itself is synchronous.
+    background_loop = get_background_loop()
+    fake = FakeAgentverse(seed=0)
+    background_loop.run(fake.__aenter__())
+    yield fake
+    background_loop.run(fake.__aexit__(None, None, None))
+
+
+@pytest.fixture
+def sync_ai_engine(fake_agentverse: FakeAgentverse) -> SyncAiEngine:
+    with SyncAiEngine(api_key=fake_agentverse.api_key, options={"api_base_url": fake_agentverse.url}, timeout=10) as ai_engine:
+        yield ai_engine
+
+
+class TestSyncAiEngine:
+    def test_conversation(self, sync_ai_engine: SyncAiEngine, fake_agentverse: FakeAgentverse):
+        session = sync_ai_engine.create_session(function_group="group")
+        session.start("Find a flight")
+        received = []
+        for message in session.stream(min_interval=0.01, idle_timeout=5):
+            received.append(message)
+            if isinstance(message, TaskSelectionMessage):
+                session.submit_task_selection(message, [message.options["0"]])
+            elif isinstance(message, ConfirmationMessage):
+                session.submit_confirmation(message)
+
+        assert is_stop_message(received[-1])
+        session.delete()
+        assert fake_agentverse.sessions[session.session_id].deleted
+
+    def test_calls_from_many_threads_share_the_loop(self, sync_ai_engine: SyncAiEngine):
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda _: sync_ai_engine.get_function_groups(), range(32)))
+
+        assert all({g.name for g in groups} == {"Fetch Verified", "My Functions"} for groups in results)
+        assert get_background_loop() is get_background_loop()
+
+
+def run_script(code: str) -> str:
+    return subprocess.run([sys.executable, "-c", textwrap.dedent(code)], check=True, capture_output=True, text=True,
+                          timeout=30).stdout
+
+
+class TestBackgroundLoopLifecycle:
+    def test_open_clients_are_closed_at_exit(self):
+        output = run_script("""
+            from ai_engine_sdk.client import AiEngine
+            from ai_engine_sdk.sync import SyncAiEngine
+
+            aclose = AiEngine.aclose
+
+            async def recording_aclose(self):
+                await aclose(self)
+                print("closed", flush=True)
+
+            AiEngine.aclose = recording_aclose
+            ai_engine = SyncAiEngine("api-key")
+        """)
+        assert output.split() == ["closed"]
+
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="Needs os.fork")
+    def test_clients_created_before_a_fork_work_in_the_child(self):
+        output = run_script("""
+            import os
+            from ai_engine_sdk.sync import SyncAiEngine
+            from ai_engine_sdk.testing import FakeAgentverse
+            from ai_engine_sdk.transport import InMemoryTransport
+
+            fake = FakeAgentverse(seed=0)
+            ai_engine = SyncAiEngine(fake.api_key, options={"transport": InMemoryTransport(fake.handle)}, timeout=5)
+            session = ai_engine.create_session(function_group="group")
+            print("parent", ai_engine.get_credits().availableCredits, flush=True)
+
+            pid = os.fork()
+            if pid == 0:
+                try:
+                    print("child", ai_engine.get_credits().availableCredits, flush=True)
+                    try:
+                        session.get_messages()
+                    except RuntimeError:
+                        print("session refused", flush=True)
+                    ai_engine.close()
+                finally:
+                    os._exit(0)
+            os.waitpid(pid, 0)
+            ai_engine.close()
+        """)
+        assert output.split("\n")[:3] == ["parent 1000", "child 1000", "session refused"]
@@ -0,0 +1,72 @@
+import pytest
+
+from ai_engine_sdk import AiEngine, is_task_selection_message
+from ai_engine_sdk.api_models.agents_json_messages import ConfirmationMessage
+from ai_engine_sdk.api_models.api_message import StopMessage
+from ai_engine_sdk.testing import FakeAgentverse
+from ai_engine_sdk.transport import (
+    AiohttpTransport,
+    HttpxTransport,
+    InMemoryTransport,
+    TransportResponse,
+    make_transport,
+)
+
+
+class TestMakeTransport:
+    def test_builds_the_named_transports(self):
+        assert isinstance(make_transport(), AiohttpTransport)
+        assert isinstance(make_transport("aiohttp", max_connections=10), AiohttpTransport)
+        assert isinstance(make_transport("http2", max_connections=10, max_connections_per_host=0), HttpxTransport)
+
+    def test_returns_transport_instances_as_is(self):
+        transport = InMemoryTransport(FakeAgentverse().handle)
+        assert make_transport(transport) is transport
+
+    def test_rejects_unknown_transports(self):
+        with pytest.raises(ValueError):
+            make_transport("carrier-pigeon")
+
+
+class TestInMemoryTransport:
+    @pytest.mark.asyncio
+    async def test_returns_the_response_of_the_handler(self):
+        calls = []
+
+        async def handler(method, url, headers, data):
+            calls.append((method, url, data))
+            return TransportResponse(status=201, headers={"X-Test": "1"}, body=b'{"ok": true}')
+
+        response = await InMemoryTransport(handler).request("POST", "http://api/things", data='{"a": 1}')
+        assert calls == [("POST", "http://api/things", '{"a": 1}')]
+        assert response.status == 201
+        assert response.header("x-test") == "1"
+        assert response.json() == {"ok": True}
+
+    @pytest.mark.asyncio
+    async def test_runs_a_conversation_without_sockets(self):
+        fake = FakeAgentverse(seed=0)  # Not started: no HTTP server.
+        options = {"api_base_url": "http://fake-agentverse", "transport": InMemoryTransport(fake.handle)}
+        async with AiEngine(fake.api_key, options=options) as ai_engine:
+            assert {group.name for group in await ai_engine.get_function_groups()} == {"Fetch Verified", "My Functions"}
+
+            session = await ai_engine.create_session(function_group=next(iter(fake.public_function_groups)))
+            await session.start("Find a flight to warsaw.")
+            async for message in session.stream(min_interval=0.01, idle_timeout=5):
+                if is_task_selection_message(message_type=message.type):
+                    await session.submit_task_selection(message, [message.options["0"]])
+                elif isinstance(message, ConfirmationMessage):
+                    await session.submit_confirmation(message)
+                elif isinstance(message, StopMessage):
+                    break
+            await session.delete()
+
+        assert fake.sessions[session.session_id].deleted
+
+
+class TestHttpxTransport:
+    @pytest.mark.asyncio
+    async def test_talks_to_http_1_servers(self, fake_agentverse: FakeAgentverse):
+        options = {"api_base_url": fake_agentverse.url, "transport": "http2"}
+        async with AiEngine(fake_agentverse.api_key, options=options) as ai_engine:
+            assert len(await ai_engine.get_functions()) == len(fake_agentverse.functions)